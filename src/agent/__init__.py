@@ -0,0 +1,22 @@
+"""AI 关卡生成模块"""
+
+from .backends import LLMBackend, StubBackend
+from .cache import LevelCache, cache_key
+from .pipeline import GenerationError, LevelPipeline, parse_world
+from .prompts import build_prompt, schema_version
+from .streaming import LevelStreamError, StreamingLevelBuilder, stream_level
+
+__all__ = [
+    "LLMBackend",
+    "StubBackend",
+    "LevelCache",
+    "cache_key",
+    "GenerationError",
+    "LevelPipeline",
+    "parse_world",
+    "build_prompt",
+    "schema_version",
+    "LevelStreamError",
+    "StreamingLevelBuilder",
+    "stream_level"
+]
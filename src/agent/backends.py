@@ -0,0 +1,97 @@
+"""可插拔的大语言模型后端
+
+后端一次接收一批提示词并按顺序返回同样数量的文本。真实服务的客户端
+继承 LLMBackend 实现 complete；StubBackend 在本地确定性地生成关卡，
+用于离线测试和压测流水线本身的吞吐量。
+"""
+
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+import json
+import random
+from typing import AsyncIterator, List, Sequence
+from game.world import World
+
+
+class LLMBackend(ABC):
+    """模型后端基类；子类至少实现 complete，未实现时不能实例化"""
+
+    model = "base"
+    max_batch = 8  # 单次调用最多携带的提示词数
+
+    @abstractmethod
+    async def complete(self, prompts: Sequence[str]) -> List[str]:
+        """为每个提示词返回一段模型输出"""
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """以文本关卡格式流式输出，逐块产生 token（见 agent.streaming）
+
+        默认不支持流式的后端把 complete 的完整输出作为一块产生。
+        """
+        yield (await self.complete([prompt]))[0]
+
+
+def stub_level(seed: bytes) -> str:
+    """按种子确定性地生成一张带钥匙、门、宝物和怪物的关卡文本"""
+    rng = random.Random(seed)
+    width, height = rng.randint(8, 20), rng.randint(5, 10)
+    rows = [["墙"] * width]
+    for _ in range(height - 2):
+        rows.append(["墙"] + [("墙" if rng.random() < 0.1 else " ") for _ in range(width - 2)] + ["墙"])
+    rows.append(["墙"] * width)
+
+    rows[1][1] = "我"
+    free = [(x, y) for y in range(1, height - 1) for x in range(1, width - 1) if rows[y][x] == " "]
+    for symbol, (x, y) in zip("钥门宝怪", rng.sample(free, min(4, len(free)))):
+        rows[y][x] = symbol
+    return "\n".join("".join(row) for row in rows)
+
+
+class StubBackend(LLMBackend):
+    """确定性的本地假后端：同一提示词总是得到同一关卡
+
+    latency 模拟每次调用的固定往返延迟，per_item 模拟每个提示词的生成耗时，
+    token_delay 模拟流式输出中每个 token 的间隔。
+    """
+
+    def __init__(self, model: str = "stub", max_batch: int = 8,
+                 latency: float = 0.0, per_item: float = 0.0, token_delay: float = 0.0):
+        self.model = model
+        self.max_batch = max_batch
+        self.latency = latency
+        self.per_item = per_item
+        self.token_delay = token_delay
+        self.calls = 0
+        self.prompts = 0
+        self.tokens = 0
+
+    async def complete(self, prompts: Sequence[str]) -> List[str]:
+        self.calls += 1
+        self.prompts += len(prompts)
+        delay = self.latency + self.per_item * len(prompts)
+        if delay:
+            await asyncio.sleep(delay)
+        return [self.render(prompt) for prompt in prompts]
+
+    def _seed(self, prompt: str) -> bytes:
+        return hashlib.sha256(f"{self.model}\n{prompt}".encode("utf-8")).digest()
+
+    def render(self, prompt: str) -> str:
+        """一个提示词对应的输出：按 World Schema 编码的 JSON"""
+        world = World.from_text(stub_level(self._seed(prompt)))
+        return json.dumps(world.model_dump(mode="json"), ensure_ascii=False)
+
+    def render_text(self, prompt: str) -> str:
+        """一个提示词对应的文本关卡输出，带说明和代码块标记"""
+        return f"```\n{stub_level(self._seed(prompt))}\n```\n"
+
+    async def stream(self, prompt: str, chunk_size: int = 3) -> AsyncIterator[str]:
+        """把文本关卡输出切成每块 chunk_size 个字符的 token 逐块产生"""
+        self.calls += 1
+        text = self.render_text(prompt)
+        for start in range(0, len(text), chunk_size):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            self.tokens += 1
+            yield text[start:start + chunk_size]
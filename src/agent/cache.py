@@ -0,0 +1,72 @@
+"""按内容寻址的关卡缓存
+
+缓存键是 (主题, 模型, Schema 版本) 的摘要，值是校验通过的世界的二进制快照
+（game.snapshot）。内存中保留最近使用的条目，可选地落盘到目录中，
+重启后同样的请求不必再次调用模型。
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Optional
+
+
+def cache_key(prompt: str, model: str, schema_version: str) -> str:
+    """缓存键：三者任一变化都会得到不同的键"""
+    payload = json.dumps([prompt, model, schema_version], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LevelCache:
+    """内存 LRU + 可选磁盘目录的两级缓存"""
+
+    EXTENSION = ".sav"
+
+    def __init__(self, directory: Optional[str] = None, max_entries: int = 1024):
+        """directory 为 None 时只用内存"""
+        self.directory = directory
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.EXTENSION)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """查找快照数据，未命中时返回 None"""
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            return data
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """保存快照数据；磁盘文件先写临时文件再原子替换"""
+        self._remember(key, data)
+        if self.directory is None:
+            return
+        path = self._path(key)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _remember(self, key: str, data: bytes) -> None:
+        entries = self._entries
+        entries[key] = data
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
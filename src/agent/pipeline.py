@@ -0,0 +1,251 @@
+"""异步关卡生成流水线
+
+generate(主题) 先查缓存；未命中的请求进入队列，由调度任务合并成批次，
+在并发上限和速率限制内调用模型后端。输出按 World / GameMap 的 Schema
+校验后写入缓存，校验失败的请求会重试。相同主题的并发请求只调用一次模型。
+"""
+
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+from game import snapshot
+from game.game_map import GameMap
+from game.types import Player
+from game.world import World
+from .backends import LLMBackend
+from .cache import LevelCache, cache_key
+from .prompts import build_prompt, schema_version, warm
+
+
+# 模型输出的地图最多的格子数（与流式解析的默认宽高上限一致）
+MAX_CELLS = 256 * 256
+
+
+class GenerationError(ValueError):
+    """模型调用失败或输出无法通过校验"""
+
+
+def extract_json(text: str) -> dict:
+    """从模型输出中取出 JSON 对象，容忍前后的说明文字和代码块标记"""
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("输出中没有 JSON 对象")
+    data = json.loads(text[start:end + 1])
+    if not isinstance(data, dict):
+        raise ValueError("输出不是 JSON 对象")
+    return data
+
+
+def parse_world(text: str) -> World:
+    """按 World / GameMap 的 Schema 校验模型输出并创建世界
+
+    任何不合法的输出（包括构造模型时的其它异常）都以 ValueError 报告。
+    """
+    data = extract_json(text)
+    try:
+        map_data, player_data = data["game_map"], data["player"]
+    except KeyError as e:
+        raise ValueError(f"缺少字段: {e.args[0]}") from None
+    if not isinstance(map_data, dict):
+        raise ValueError("game_map 必须是对象")
+    try:
+        width, height = int(map_data["width"]), int(map_data["height"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("地图尺寸必须是整数") from None
+    if width <= 0 or height <= 0:
+        raise ValueError("地图尺寸必须为正数")
+    if width * height > MAX_CELLS:
+        raise ValueError(f"地图超过 {MAX_CELLS} 格")
+
+    try:
+        game_map = GameMap(**map_data)
+        player = Player.model_validate(player_data)
+        if not game_map.is_passable(player.position):
+            raise ValueError("玩家不在地图内的可通行位置")
+        return World(game_map=game_map, player=player,
+                     game_over=data.get("game_over", False), victory=data.get("victory", False))
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"{type(e).__name__}: {e}") from e
+
+
+class RateLimiter:
+    """令牌桶：平均每秒 rate 次，允许 burst 次突发"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class PipelineStats:
+    """流水线运行统计"""
+
+    __slots__ = ("requests", "cache_hits", "coalesced", "calls", "generated", "invalid", "failed")
+
+    def __init__(self):
+        self.requests = 0
+        self.cache_hits = 0
+        self.coalesced = 0  # 与进行中的相同请求合并
+        self.calls = 0  # 后端调用次数
+        self.generated = 0  # 后端返回的输出数
+        self.invalid = 0  # 未通过校验的输出数
+        self.failed = 0  # 最终失败的请求数
+
+
+# 队列中的请求: (缓存键, 主题, 剩余重试次数)
+_Request = Tuple[str, str, int]
+
+
+class LevelPipeline:
+    """批量、限速、带缓存的关卡生成流水线"""
+
+    def __init__(self, backend: LLMBackend, cache: Optional[LevelCache] = None,
+                 batch_size: Optional[int] = None, batch_window: float = 0.005,
+                 concurrency: int = 4, rate: Optional[float] = None, retries: int = 1):
+        """batch_window 为凑批等待的秒数，concurrency 为同时进行的后端调用数，
+        rate 为每秒最多的后端调用数（None 表示不限速）"""
+        self.backend = backend
+        self.cache = LevelCache() if cache is None else cache
+        self.batch_size = batch_size or backend.max_batch
+        self.batch_window = batch_window
+        self.retries = retries
+        self.stats = PipelineStats()
+        self._concurrency = concurrency
+        self._limiter = RateLimiter(rate, max(1, int(rate))) if rate else None
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._calls = set()
+        self._pending: Dict[str, asyncio.Future] = {}
+        warm()
+
+    async def __aenter__(self) -> 'LevelPipeline':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def key_for(self, prompt: str) -> str:
+        """主题对应的缓存键"""
+        return cache_key(prompt, self.backend.model, schema_version())
+
+    async def generate(self, prompt: str) -> World:
+        """为主题生成一个世界；每次返回独立的实例"""
+        stats = self.stats
+        stats.requests += 1
+        key = self.key_for(prompt)
+        data = self.cache.get(key)
+        if data is not None:
+            stats.cache_hits += 1
+            return snapshot.loads(data)
+
+        future = self._pending.get(key)
+        if future is None:
+            future = self._pending[key] = asyncio.get_running_loop().create_future()
+            self._start()
+            self._queue.put_nowait((key, prompt, self.retries))
+        else:
+            stats.coalesced += 1
+        data = await asyncio.shield(future)
+        return snapshot.loads(data)
+
+    async def generate_many(self, prompts: Sequence[str]) -> List[World]:
+        """并发生成多个主题的世界，结果与输入顺序一致"""
+        return list(await asyncio.gather(*(self.generate(prompt) for prompt in prompts)))
+
+    async def close(self) -> None:
+        """停止调度并等待进行中的后端调用结束"""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        if self._calls:
+            await asyncio.gather(*self._calls, return_exceptions=True)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(GenerationError("流水线已关闭"))
+        self._pending.clear()
+
+    def _start(self) -> None:
+        if self._dispatcher is None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self._concurrency)
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    def _drain(self, batch: List[_Request]) -> None:
+        queue = self._queue
+        while len(batch) < self.batch_size and not queue.empty():
+            batch.append(queue.get_nowait())
+
+    async def _dispatch(self) -> None:
+        """把队列中的请求合并成批次，在并发上限内派发后端调用"""
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            self._drain(batch)
+            if len(batch) < self.batch_size and self.batch_window > 0:
+                await asyncio.sleep(self.batch_window)
+                self._drain(batch)
+            await self._slots.acquire()
+            task = asyncio.create_task(self._call(batch))
+            self._calls.add(task)
+            task.add_done_callback(self._calls.discard)
+
+    async def _call(self, batch: List[_Request]) -> None:
+        stats = self.stats
+        try:
+            if self._limiter is not None:
+                await self._limiter.acquire()
+            try:
+                responses = await self.backend.complete([build_prompt(prompt) for _, prompt, _ in batch])
+                if len(responses) != len(batch):
+                    raise GenerationError(f"后端返回 {len(responses)} 个结果，应为 {len(batch)} 个")
+            except Exception as e:
+                for key, _, _ in batch:
+                    self._fail(key, e if isinstance(e, GenerationError) else GenerationError(f"后端调用失败: {e}"))
+                return
+            stats.calls += 1
+            stats.generated += len(batch)
+
+            # 逐项处理：任何一项出错都不影响同批的其它请求
+            for (key, prompt, retries), text in zip(batch, responses):
+                try:
+                    data = snapshot.dumps(parse_world(text))
+                    self.cache.put(key, data)
+                except ValueError as e:
+                    stats.invalid += 1
+                    if retries > 0:
+                        self._queue.put_nowait((key, prompt, retries - 1))
+                    else:
+                        self._fail(key, GenerationError(f"关卡校验失败: {e}"))
+                    continue
+                except Exception as e:
+                    self._fail(key, GenerationError(f"关卡处理失败: {e}"))
+                    continue
+                future = self._pending.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_result(data)
+        finally:
+            self._slots.release()
+
+    def _fail(self, key: str, error: Exception) -> None:
+        self.stats.failed += 1
+        future = self._pending.pop(key, None)
+        if future is not None and not future.done():
+            future.set_exception(error)
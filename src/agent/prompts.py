@@ -0,0 +1,41 @@
+"""关卡生成提示词：把用户主题与 World 的 JSON Schema、示例拼成模型输入
+
+Schema 与示例以紧凑 JSON 嵌入（节省 token），拼好的固定部分缓存在
+World 的素材缓存中（见 Text_BaseModel.cached_artifact），Schema 变化时自动重建。
+"""
+
+from game.base import warm_artifacts
+from game.world import World
+
+PROMPT_TEMPLATE = """你是一个文字冒险游戏的关卡设计师。请根据下面的主题设计一个关卡。
+
+主题: {theme}
+
+只输出一个 JSON 对象，不要输出任何解释。JSON 必须符合以下 Schema:
+{schema}
+
+示例:
+{example}
+"""
+
+
+def schema_version() -> str:
+    """World Schema 的摘要；Schema 变化时缓存键随之变化"""
+    return World.schema_version()
+
+
+def _prompt_parts():
+    head, tail = PROMPT_TEMPLATE.split("{theme}")
+    return head, tail.format(schema=World.get_schema_json(None), example=World.get_example_json(None))
+
+
+def build_prompt(theme: str) -> str:
+    """为一个主题生成完整提示词"""
+    head, tail = World.cached_artifact("prompt", _prompt_parts)
+    return head + theme + tail
+
+
+def warm() -> None:
+    """启动时预先生成提示词素材，避免首个请求承担构建开销"""
+    warm_artifacts((World,), (None,))
+    World.cached_artifact("prompt", _prompt_parts)
@@ -0,0 +1,168 @@
+"""流式解析模型输出的关卡文本
+
+模型的输出按 token 分块到达。StreamingLevelBuilder 把分块拼接成完整的行，
+每完成一行就校验并交给 LevelParser，已完成的行和玩家出生点在生成结束前
+即可使用；输出一旦不像关卡（未知字符过多、行过宽、多个玩家等）就立刻
+中止，省下后续 token 的时间和费用。尚未结束的行也会检查，一整行的闲聊
+不必等到换行才中止。关卡开始（代码块标记或第一行合法的关卡行）之前的
+说明文字会被跳过，但总长度不能超过 max_preamble 个字符。
+"""
+
+from typing import AsyncIterable, Callable, List, Mapping, Optional, Tuple
+from game.game_map import GameMap
+from game.level_parser import LevelParser, parse_level
+from game.tiles import PLAYER_SYMBOLS, TileProto
+from game.world import World
+
+# 代码块标记行，模型常用它包裹关卡文本
+FENCE = "```"
+
+
+class LevelStreamError(ValueError):
+    """模型输出不是合法的关卡文本"""
+
+
+class StreamingLevelBuilder:
+    """逐块接收关卡文本，逐行校验并解析"""
+
+    def __init__(self, legend: Optional[Mapping[str, TileProto]] = None,
+                 max_width: int = 256, max_height: int = 256, max_unknown: float = 0.25,
+                 max_preamble: int = 512):
+        """max_unknown 为一行中图例以外字符（空白除外）所占比例的上限，
+        max_preamble 为关卡之前可跳过的说明文字的字符数上限"""
+        self._parser = LevelParser(legend)
+        self.max_width = max_width
+        self.max_height = max_height
+        self.max_unknown = max_unknown
+        self.max_preamble = max_preamble
+        self._known = set(self._parser.legend) | PLAYER_SYMBOLS
+        self._buffer = ""
+        self._opened = False  # 出现过开头的代码块标记
+        self._closed = False  # 地图之后出现了结束的代码块标记
+        self._skipped = 0  # 已跳过的说明文字字符数
+        self.rows: List[str] = []
+
+    @property
+    def started(self) -> bool:
+        """关卡是否已经开始（之后的每一行都必须是合法的关卡行）"""
+        return self._opened or bool(self.rows)
+
+    @property
+    def player_start(self) -> Optional[Tuple[int, int]]:
+        """玩家出生点，尚未生成到时为 None"""
+        return self._parser.player_position
+
+    def feed(self, chunk: str) -> List[int]:
+        """接收一段输出，返回本次完成的行号"""
+        self._buffer += chunk
+        completed = []
+        if "\n" in chunk:
+            *lines, self._buffer = self._buffer.split("\n")
+            for line in lines:
+                if self._feed_line(line):
+                    completed.append(len(self.rows) - 1)
+        self._check_partial()
+        return completed
+
+    def _check_partial(self) -> None:
+        """检查尚未结束的行：无论后面来什么都不可能合法时立即中止"""
+        buffer = self._buffer
+        if self._closed:
+            # 关卡已结束，之后的输出直接丢弃
+            self._buffer = ""
+            return
+        error = self._partial_error(buffer)
+        if self.started:
+            if error:
+                raise LevelStreamError(error)
+        elif error and self._skipped + len(buffer) > self.max_preamble:
+            # 未结束的行可能是关卡的第一行，只有它不可能是关卡行时才计入说明文字
+            raise LevelStreamError(f"输出开头超过 {self.max_preamble} 个字符仍不是关卡")
+
+    def _partial_error(self, buffer: str) -> Optional[str]:
+        """未结束的行已经不可能是合法关卡行时返回原因"""
+        y = len(self.rows)
+        if len(buffer.rstrip("\r")) > self.max_width:
+            return f"第 {y + 1} 行超过 {self.max_width} 个字符"
+        unknown = sum(not char.isspace() and char not in self._known for char in buffer)
+        if unknown > self.max_unknown * self.max_width:
+            return f"第 {y + 1} 行不是关卡文本: {buffer.strip()[:20]}"
+        return None
+
+    def _feed_line(self, line: str) -> bool:
+        line = line.rstrip("\r")
+        stripped = line.strip()
+        if self._closed or not stripped:
+            return False
+        if stripped.startswith(FENCE):
+            # 开头的标记跳过，地图之后的标记表示关卡结束
+            self._closed = bool(self.rows)
+            self._opened = True
+            return False
+        if self.started:
+            self._validate(line)
+        else:
+            # 关卡之前的说明文字（如“好的，这是为你设计的关卡：”）跳过
+            try:
+                self._validate(line)
+            except LevelStreamError:
+                self._skipped += len(line)
+                if self._skipped > self.max_preamble:
+                    raise LevelStreamError(f"输出开头超过 {self.max_preamble} 个字符仍不是关卡") from None
+                return False
+        self._parser.feed_line(line)
+        self.rows.append(line)
+        return True
+
+    def _validate(self, line: str) -> None:
+        """校验一行：宽度、高度、未知字符比例与玩家数量"""
+        y = len(self.rows)
+        if y >= self.max_height:
+            raise LevelStreamError(f"关卡超过 {self.max_height} 行")
+        if len(line) > self.max_width:
+            raise LevelStreamError(f"第 {y + 1} 行超过 {self.max_width} 个字符")
+        symbols = [char for char in line if not char.isspace()]
+        unknown = sum(char not in self._known for char in symbols)
+        if unknown > self.max_unknown * len(symbols):
+            raise LevelStreamError(f"第 {y + 1} 行不是关卡文本: {line.strip()[:20]}")
+        players = sum(char in PLAYER_SYMBOLS for char in symbols)
+        if players > 1 or (players and self.player_start is not None):
+            raise LevelStreamError(f"第 {y + 1} 行出现了第二个玩家")
+
+    def preview(self) -> GameMap:
+        """用已完成的行构建地图，供生成过程中提前显示"""
+        if not self.rows:
+            raise LevelStreamError("还没有完成的行")
+        return parse_level(self.rows, self._parser.legend)[0]
+
+    def finish(self) -> World:
+        """处理最后一行并创建世界"""
+        if self._buffer:
+            self._feed_line(self._buffer)
+            self._buffer = ""
+        if not self.rows:
+            raise LevelStreamError("输出中没有关卡")
+        if self.player_start is None:
+            raise LevelStreamError("关卡中没有玩家")
+        game_map, player = self._parser.finish()
+        return World(game_map=game_map, player=player)
+
+
+async def stream_level(chunks: AsyncIterable[str], builder: Optional[StreamingLevelBuilder] = None,
+                       on_rows: Optional[Callable[[StreamingLevelBuilder, List[int]], None]] = None) -> World:
+    """消费分块输出并返回世界；on_rows 在每次有新行完成时调用
+
+    校验失败时关闭输出流（对异步生成器调用 aclose），让上游停止生成。
+    """
+    builder = builder or StreamingLevelBuilder()
+    try:
+        async for chunk in chunks:
+            completed = builder.feed(chunk)
+            if completed and on_rows is not None:
+                on_rows(builder, completed)
+    except LevelStreamError:
+        close = getattr(chunks, "aclose", None)
+        if close is not None:
+            await close()
+        raise
+    return builder.finish()
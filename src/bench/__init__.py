@@ -0,0 +1 @@
+"""游戏引擎性能基准测试"""
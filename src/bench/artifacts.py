@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""提示词素材缓存与紧凑 JSON 的收益
+
+对比每次重新生成 schema / 示例 JSON 与读取缓存的耗时，以及缩进 JSON
+与紧凑 JSON 的字节数和序列化耗时。
+
+运行: python -m bench.artifacts [循环次数]
+"""
+
+import json
+import sys
+import timeit
+
+from agent.prompts import PROMPT_TEMPLATE, build_prompt
+from bench.position import per_call
+from game.world import World
+
+
+def uncached_prompt(theme: str) -> str:
+    """旧做法：每次都重新生成 schema 与示例"""
+    schema = json.dumps(World.model_json_schema(), indent=2, ensure_ascii=False)
+    example = json.dumps(World.get_example_instance().model_dump(), indent=2, ensure_ascii=False)
+    return PROMPT_TEMPLATE.format(theme=theme, schema=schema, example=example)
+
+
+def main(number: int = 200) -> None:
+    slow, fast = per_call(lambda: uncached_prompt("雪山"), number), per_call(lambda: build_prompt("雪山"), number * 100)
+    print(f"拼装提示词（每次重建）: {slow / 1000:9.1f}µs  {len(uncached_prompt('雪山').encode('utf-8')):6d} 字节")
+    print(f"拼装提示词（缓存+紧凑）: {fast / 1000:9.1f}µs  {len(build_prompt('雪山').encode('utf-8')):6d} 字节"
+          f"  快 {slow / fast:,.0f} 倍")
+
+    world = World.get_example_instance()
+    for label, indent in (("缩进", 2), ("紧凑", None)):
+        size = len(world.model_dump_json(indent).encode("utf-8"))
+        elapsed = per_call(lambda: world.model_dump_json(indent), number * 10)
+        print(f"model_dump_json {label}: {elapsed / 1000:9.1f}µs  {size:6d} 字节")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
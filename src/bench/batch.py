@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""批量模拟与标量循环的性能对比
+
+运行: python -m bench.batch [世界数量] [指令数量]
+"""
+
+import random
+import sys
+import time
+
+from game.batch import BatchRunner, run_scalar
+from game.world import World
+
+
+def make_level(size: int, rng: random.Random) -> str:
+    """生成带围墙、随机障碍和少量物品的关卡文本"""
+    rows = []
+    for y in range(size):
+        row = []
+        for x in range(size):
+            if x in (0, size - 1) or y in (0, size - 1):
+                row.append("#")
+            elif (x, y) == (1, 1):
+                row.append("@")
+            else:
+                row.append(rng.choices("# KTD", weights=(15, 80, 2, 2, 1))[0])
+        rows.append("".join(row))
+    return "\n".join(rows)
+
+
+def main(world_count: int = 1000, command_count: int = 200, size: int = 32) -> None:
+    rng = random.Random(42)
+    levels = [make_level(size, rng) for _ in range(world_count)]
+    # 脚本以移动为主，偶尔交互
+    words = ["上", "下", "左", "右", "互动"]
+    weights = [24, 24, 24, 24, 4]
+    streams = [rng.choices(words, weights, k=command_count) for _ in range(world_count)]
+
+    worlds = [World.from_text(text) for text in levels]
+    start = time.perf_counter()
+    scalar = run_scalar(worlds, streams)
+    scalar_time = time.perf_counter() - start
+
+    worlds = [World.from_text(text) for text in levels]
+    start = time.perf_counter()
+    batch = BatchRunner(worlds).run(streams)
+    batch_time = time.perf_counter() - start
+
+    assert scalar == batch, "批量结果与标量结果不一致"
+    total = world_count * command_count
+    print(f"世界数: {world_count}, 每个世界指令数: {command_count}, 地图: {size}x{size}")
+    print(f"标量循环: {scalar_time:.3f}s ({total / scalar_time:,.0f} 指令/秒)")
+    print(f"批量模拟: {batch_time:.3f}s ({total / batch_time:,.0f} 指令/秒)")
+    print(f"加速比: {scalar_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
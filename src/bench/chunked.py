@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""区块化地图：玩家一直向前走时的单步耗时与内存峰值
+
+走得越远，生成和换出的区块越多，但常驻内存应当保持在预算之内。
+
+运行: python -m bench.chunked [步数...]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from game.chunked import ChunkedMap
+from game.level_parser import LevelParser
+
+
+def generate(cx: int, cy: int, size: int):
+    """随机墙壁，少量宝物"""
+    rng = random.Random(cx * 100003 + cy)
+    rows = ["".join(rng.choice("#.......") for _ in range(size)) for _ in range(size)]
+    for _ in range(size // 4):
+        y, x = rng.randrange(size), rng.randrange(size)
+        rows[y] = rows[y][:x] + "T" + rows[y][x + 1:]
+    parser = LevelParser()
+    parser.feed(rows)
+    return parser.finish_tiles()
+
+
+def walk(steps: int, budget: int) -> None:
+    with ChunkedMap(chunk_size=64, memory_budget=budget, generator=generate) as world_map:
+        tracemalloc.start()
+        start = time.perf_counter()
+        x = y = 0
+        for step in range(steps):
+            # 斜向前进，每走一步渲染一次 40x20 的视口
+            x += 1
+            y += step & 1
+            world_map.is_passable_xy(x, y)
+            world_map.render_region(x - 20, y - 10, x + 20, y + 10)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats = world_map.stats
+        print(f"{steps:>8} 步  {elapsed / steps * 1e6:8.1f} us/步  内存峰值 {peak / 1024:8.0f} KB  "
+              f"常驻 {world_map.resident_chunks:3} 块  生成 {stats.generated:5}  换出 {stats.evicted:5}")
+
+
+def main(*steps: int) -> None:
+    budget = 1 << 20
+    print(f"区块 64x64，内存预算 {budget >> 10} KB")
+    for count in steps or (1000, 5000, 20000):
+        walk(count, budget)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
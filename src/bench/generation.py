@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""关卡生成流水线吞吐量：用本地假后端离线比较批量大小、并发数与缓存的效果
+
+假后端模拟每次调用的往返延迟和每个提示词的生成耗时，主题中有一部分重复，
+体现缓存与请求合并节省的调用。
+
+运行: python -m bench.generation [--requests 2000] [--unique 0.5] [--latency 0.05] [--per-item 0.002]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import List, Optional
+
+from agent import LevelPipeline, StubBackend
+
+
+async def run(themes: List[str], batch_size: int, concurrency: int, latency: float, per_item: float):
+    """返回 (每秒关卡数, 后端调用次数, 缓存命中与合并数)"""
+    backend = StubBackend(max_batch=batch_size, latency=latency, per_item=per_item)
+    async with LevelPipeline(backend, concurrency=concurrency) as pipeline:
+        start = time.perf_counter()
+        await pipeline.generate_many(themes)
+        seconds = time.perf_counter() - start
+        stats = pipeline.stats
+    return len(themes) / seconds, backend.calls, stats.cache_hits + stats.coalesced
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="关卡生成流水线吞吐量")
+    parser.add_argument("--requests", type=int, default=2000, help="请求数")
+    parser.add_argument("--unique", type=float, default=0.5, help="不重复主题所占比例")
+    parser.add_argument("--latency", type=float, default=0.05, help="每次调用的往返延迟（秒）")
+    parser.add_argument("--per-item", type=float, default=0.002, help="每个提示词的生成耗时（秒）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    unique = max(1, int(args.requests * args.unique))
+    themes = [f"主题{rng.randrange(unique)}" for _ in range(args.requests)]
+    print(f"{args.requests} 个请求，{unique} 个候选主题，延迟 {args.latency * 1000:.0f}ms"
+          f" + {args.per_item * 1000:.1f}ms/个")
+    for batch_size, concurrency in ((1, 1), (1, 8), (8, 8), (32, 8)):
+        rate, calls, saved = asyncio.run(run(themes, batch_size, concurrency, args.latency, args.per_item))
+        print(f"批量 {batch_size:3d} 并发 {concurrency:2d}: {rate:10,.0f} 关/秒  "
+              f"调用 {calls:5d} 次  缓存/合并 {saved} 个")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""关卡包的打开与随机读取耗时随关卡数量的变化
+
+运行: python -m bench.level_pack [关卡数...]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from game.level_pack import LevelPack, LevelPackWriter
+from game.world import World
+from bench.suite import make_level
+
+
+def main(*counts: int) -> None:
+    counts = counts or (1000, 10000)
+    rng = random.Random(3)
+    texts = [make_level(size, 0.2, rng) for size in (16, 24, 32, 48) for _ in range(25)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        for count in counts:
+            path = os.path.join(directory, f"levels_{count}.pack")
+            start = time.perf_counter()
+            with LevelPackWriter(path) as writer:
+                for i in range(count):
+                    writer.add_text(f"level-{i}", texts[i % len(texts)])
+            build_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            pack = LevelPack(path)
+            open_ms = (time.perf_counter() - start) * 1000
+
+            picks = [rng.randrange(count) for _ in range(300)]
+            loads = []
+            for index in picks:
+                start = time.perf_counter()
+                pack.load(index)
+                loads.append((time.perf_counter() - start) * 1e6)
+            parses = []
+            for index in picks[:100]:
+                text = texts[index % len(texts)]
+                start = time.perf_counter()
+                World.from_text(text)
+                parses.append((time.perf_counter() - start) * 1e6)
+            pack.close()
+
+            print(f"{count} 个关卡: 文件 {os.path.getsize(path) / 1024:.0f}KiB，打包 {build_s:.1f}s，"
+                  f"打开 {open_ms:.2f}ms，随机读取中位 {statistics.median(loads):.0f}us"
+                  f"（解析文本 {statistics.median(parses):.0f}us）")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
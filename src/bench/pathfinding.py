@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""寻路与怪物调度的性能测试
+
+运行: python -m bench.pathfinding [地图边长] [怪物数量]
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from game.pathfinding import astar, jps, MonsterScheduler, PathCache
+from game.world import World
+
+
+def make_level(size: int, monsters: int, rng: random.Random) -> str:
+    """生成带随机墙段和怪物的关卡文本"""
+    rows = [[" "] * size for _ in range(size)]
+    for _ in range(size * size // 12):
+        x, y = rng.randrange(size), rng.randrange(size)
+        dx, dy = rng.choice(((1, 0), (0, 1)))
+        for i in range(rng.randint(2, 8)):
+            if 0 <= x + dx * i < size and 0 <= y + dy * i < size:
+                rows[y + dy * i][x + dx * i] = "#"
+    for y in range(size):
+        rows[y][0] = rows[y][size - 1] = "#"
+    rows[0] = rows[size - 1] = ["#"] * size
+    free = [(x, y) for y in range(1, size - 1) for x in range(1, size - 1) if rows[y][x] == " "]
+    rng.shuffle(free)
+    px, py = free.pop()
+    rows[py][px] = "@"
+    for x, y in free[:monsters]:
+        rows[y][x] = "M"
+    return "\n".join("".join(row) for row in rows)
+
+
+def main(size: int = 200, monsters: int = 300) -> None:
+    rng = random.Random(7)
+    world = World.from_text(make_level(size, monsters, rng))
+    game_map = world.game_map
+    free = [(x, y) for y in range(size) for x in range(size) if game_map.is_passable_xy(x, y)]
+    queries = [(rng.choice(free), rng.choice(free)) for _ in range(50)]
+
+    for name, algorithm in (("A*", astar), ("JPS", jps)):
+        start = time.perf_counter()
+        lengths = [len(algorithm(game_map, s, g) or ()) for s, g in queries]
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {len(queries)} 次查询 {elapsed * 1000:.1f}ms，平均 {elapsed / len(queries) * 1000:.2f}ms，"
+              f"总路径长度 {sum(lengths)}")
+
+    # NPC 反复前往少数几个目标：同一终点的路径后缀都能命中缓存
+    cache = PathCache(game_map)
+    goals = [rng.choice(free) for _ in range(5)]
+    start = time.perf_counter()
+    for _ in range(2000):
+        cache.get_path(rng.choice(free[:200]), rng.choice(goals))
+    elapsed = time.perf_counter() - start
+    print(f"路径缓存: 2000 次查询 {elapsed * 1000:.1f}ms，命中 {cache.hits}，未命中 {cache.misses}")
+
+    scheduler = MonsterScheduler(world, budget_ms=5.0)
+    ticks = []
+    moved = deferred = 0
+    directions = ((1, 0), (-1, 0), (0, 1), (0, -1))
+    for tick in range(100):
+        if tick % 4 == 0:
+            world.player.move(*rng.choice(directions), world)
+        stats = scheduler.tick()
+        ticks.append(stats.elapsed_ms)
+        moved += stats.moved
+        deferred += stats.deferred
+    ticks.sort()
+    print(f"调度 {monsters} 个怪物 100 个周期: 中位 {statistics.median(ticks):.2f}ms，"
+          f"p99 {ticks[98]:.2f}ms，最大 {ticks[-1]:.2f}ms")
+    print(f"   移动 {moved} 次，顺延 {deferred} 次")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""位置类型与单步移动的微基准测试
+
+对比校验构造的 Position 与驻留的 Point，以及旧的移动路径（每步新建并校验
+Position，再经 GameMap 的 Position 接口检查）与当前 Player.move 的单步开销。
+
+运行: python -m bench.position [循环次数]
+"""
+
+import sys
+import timeit
+
+from game.types import Point, Position, point
+from game.world import World
+
+LEVEL = """
+##########
+#@       #
+#        #
+##########
+"""
+
+
+def legacy_move(world: World, dx: int, dy: int) -> str:
+    """旧实现：每步都校验构造 Position，并通过 GameMap 的 Position 接口检查"""
+    new_position = Position(x=world.player.position.x + dx, y=world.player.position.y + dy)
+    if world.game_over:
+        return "游戏已结束。"
+    if not world.game_map.is_valid_position(new_position):
+        return "无法移动到该位置。"
+    if not world.game_map.is_passable(new_position):
+        return "前方有障碍物。"
+    world.player.position = new_position
+    return "移动成功。"
+
+
+def per_call(stmt, number: int) -> float:
+    """单次调用耗时（纳秒），取三轮中的最好成绩"""
+    return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1e9
+
+
+def main(number: int = 100000) -> None:
+    print(f"构造 Position（校验）:   {per_call(lambda: Position(x=3, y=4), number):7.0f}ns")
+    print(f"Position.from_xy:        {per_call(lambda: Position.from_xy(3, 4), number):7.0f}ns")
+    print(f"Point(x, y):             {per_call(lambda: Point(3, 4), number):7.0f}ns")
+    print(f"point(x, y)（驻留）:     {per_call(lambda: point(3, 4), number):7.0f}ns")
+
+    world = World.from_text(LEVEL)
+    player = world.player
+
+    def walk_legacy():
+        legacy_move(world, 1, 0)
+        legacy_move(world, -1, 0)
+
+    def walk():
+        player.move(1, 0, world)
+        player.move(-1, 0, world)
+
+    def blocked_legacy():
+        legacy_move(world, 0, -1)
+
+    def blocked():
+        player.move(0, -1, world)
+
+    before = per_call(walk_legacy, number) / 2
+    after = per_call(walk, number) / 2
+    print(f"单步移动: 旧 {before:.0f}ns，新 {after:.0f}ns，加速 {before / after:.1f}x")
+    before = per_call(blocked_legacy, number)
+    after = per_call(blocked, number)
+    print(f"撞墙移动: 旧 {before:.0f}ns，新 {after:.0f}ns，加速 {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
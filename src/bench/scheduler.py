@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""回合调度器：大量实体行动下每回合的延迟
+
+每个实体每 1-16 回合行动一次（读取一次地图的通行性）。对比时间轮与
+只用 heapq 的优先队列，报告每回合耗时的分位数。
+
+运行: python -m bench.scheduler [实体数量...]
+"""
+
+import heapq
+import itertools
+import random
+import sys
+import time
+
+from bench.suite import make_level, summarize
+from game.scheduler import Scheduler
+from game.world import World
+
+TICKS = 300
+
+
+class HeapScheduler:
+    """对照组：所有行动放在一个按到期回合排序的堆中"""
+
+    def __init__(self):
+        self.now = 0
+        self.heap = []
+        self.seq = itertools.count()
+
+    def schedule(self, delay, action, interval=None):
+        heapq.heappush(self.heap, (self.now + delay, next(self.seq), action, interval))
+
+    def tick(self, world):
+        self.now = now = self.now + 1
+        heap = self.heap
+        executed = 0
+        while heap and heap[0][0] <= now:
+            _, _, action, interval = heapq.heappop(heap)
+            executed += 1
+            delay = action(world)
+            if delay is None:
+                delay = interval
+            if delay is not None:
+                heapq.heappush(heap, (now + delay, next(self.seq), action, interval))
+        return executed
+
+
+def make_action(x: int, y: int, period: int):
+    def act(world):
+        world.game_map.is_passable_xy(x, y)
+        return period
+    return act
+
+
+def run(world: World, scheduler, count: int, rng: random.Random):
+    size = world.game_map.width
+    for _ in range(count):
+        period = rng.randint(1, 16)
+        scheduler.schedule(rng.randint(1, period),
+                           make_action(rng.randrange(size), rng.randrange(size), period))
+    samples = []
+    executed = 0
+    for _ in range(TICKS):
+        start = time.perf_counter()
+        executed += scheduler.tick(world)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples), executed / TICKS
+
+
+def main(*counts: int) -> None:
+    world = World.from_text(make_level(200, 0.2, random.Random(1)))
+    print(f"{TICKS} 回合，每个实体每 1-16 回合行动一次")
+    for count in counts or (10000, 50000):
+        for name, factory in (("时间轮", Scheduler), ("堆", HeapScheduler)):
+            stats, per_tick = run(world, factory(), count, random.Random(count))
+            print(f"  {count:6} 个实体 {name:4}  每回合 {per_tick:7.0f} 个行动  "
+                  f"p50 {stats['p50_us'] / 1000:6.2f}ms  p99 {stats['p99_us'] / 1000:6.2f}ms  "
+                  f"最大 {stats['max_us'] / 1000:6.2f}ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
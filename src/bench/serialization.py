@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""推送给客户端的状态负载：各序列化器的编码耗时与体积
+
+负载包括服务器的单条指令响应（增量画面）、状态字典、对象表
+（Dict[Position, GameObject]）和完整世界；旧路径为 model_dump + json.dumps（缩进）。
+
+运行: python -m bench.serialization [循环次数]
+"""
+
+import json
+import random
+import sys
+
+from bench.position import per_call
+from bench.suite import make_level
+from game.serialization import SERIALIZERS, get_serializer
+from game.world import World
+from server.session import Session
+
+
+def legacy_dump(world: World) -> bytes:
+    """旧的 Text_BaseModel.model_dump_json：先生成字典再用标准库缩进输出"""
+    return json.dumps(world.model_dump(), indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def main(number: int = 2000) -> None:
+    world = World.from_text(make_level(40, 0.2, random.Random(0)))
+    session = Session(world)
+    session.hello()
+    payloads = {
+        "指令响应": session.handle("右"),
+        "状态": world.get_game_state(),
+        "对象表": dict(world.game_map.objects),
+        "完整世界": world,
+    }
+
+    print(f"{'负载':8s}" + "".join(f"{name:>16s}" for name in SERIALIZERS))
+    for label, payload in payloads.items():
+        loops = number if label != "完整世界" else max(1, number // 100)
+        cells = []
+        for name in SERIALIZERS:
+            serializer = get_serializer(name)
+            size = len(serializer.dumps(payload))
+            cells.append(f"{per_call(lambda: serializer.dumps(payload), loops) / 1000:8.1f}µs {size:5d}B")
+        print(f"{label:8s}" + "".join(f"{cell:>16s}" for cell in cells))
+
+    loops = max(1, number // 100)
+    print(f"旧路径 完整世界: {per_call(lambda: legacy_dump(world), loops) / 1000:8.1f}µs {len(legacy_dump(world))}B")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
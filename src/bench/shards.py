@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""分片池的多核扩展性：固定会话数，比较不同工作进程数下的指令吞吐量
+
+每轮为所有会话各发送一批指令，分片并行执行；理想情况下吞吐量随工作进程数
+（不超过 CPU 核心数）近似线性增长。
+
+运行: python -m bench.shards [--sessions 512] [--commands 20] [--rounds 20] [--workers 1 2 4]
+"""
+
+import argparse
+import os
+import random
+import time
+from typing import List, Optional
+
+from server.loadgen import COMMAND_MIX
+from server.shards import ShardPool
+from bench.suite import make_level
+
+
+def run(workers: int, level: str, sessions: int, commands: int, rounds: int, seed: int) -> float:
+    """返回 workers 个分片下的指令吞吐量（条/秒）"""
+    rng = random.Random(seed)
+    with ShardPool(workers) as pool:
+        for session_id in range(sessions):
+            pool.open_session(session_id, level)
+        batches = [{session_id: [rng.choice(COMMAND_MIX) for _ in range(commands)]
+                    for session_id in range(sessions)} for _ in range(rounds)]
+        start = time.perf_counter()
+        for batch in batches:
+            pool.run_batch(batch)
+        seconds = time.perf_counter() - start
+    return sessions * commands * rounds / seconds
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="分片池多核扩展性基准")
+    parser.add_argument("--sessions", type=int, default=512, help="会话总数")
+    parser.add_argument("--commands", type=int, default=20, help="每轮每个会话的指令数")
+    parser.add_argument("--rounds", type=int, default=20, help="轮数")
+    parser.add_argument("--size", type=int, default=40, help="关卡边长")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1))),
+                        help="要比较的工作进程数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args(argv)
+
+    level = make_level(args.size, 0.2, random.Random(args.seed))
+    print(f"CPU 核心数 {cores}，{args.sessions} 个会话，{args.size}x{args.size} 关卡")
+    baseline = None
+    for workers in args.workers:
+        rate = run(workers, level, args.sessions, args.commands, args.rounds, args.seed)
+        baseline = baseline or rate
+        print(f"{workers:3d} 个分片: {rate:12,.0f} 条/秒  加速比 {rate / baseline:.2f}x"
+              f"  效率 {rate / baseline / workers:.0%}")
+    if cores == 1:
+        print("本机只有一个核心，无法体现多进程扩展性")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""二进制快照与 JSON 存档的体积和速度对比
+
+运行: python -m bench.snapshot [地图边长...]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from game.game_map import GameMap
+from game.types import Player
+from game.world import World
+from bench.suite import make_level
+
+
+def json_save(world: World, path: str) -> int:
+    """旧的 JSON 存档路径：model_dump_json 写文件"""
+    data = world.model_dump_json().encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def json_load(path: str) -> World:
+    """从 JSON 存档重建世界（对象列表逐个 add_object）"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    game_map = GameMap(**data["game_map"])
+    return World(game_map=game_map, player=Player(**data["player"]),
+                 game_over=data["game_over"], victory=data["victory"])
+
+
+def timed(fn, *args):
+    """执行一次并返回 (结果, 毫秒)"""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(*sizes: int) -> None:
+    sizes = sizes or (50, 200, 500)
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            world = World.from_text(make_level(size, 0.2, random.Random(size)))
+            snapshot_path = os.path.join(directory, "world.sav")
+            json_path = os.path.join(directory, "world.json")
+
+            snapshot_size, snapshot_save_ms = timed(world.save, snapshot_path)
+            loaded, snapshot_load_ms = timed(World.load, snapshot_path)
+            assert loaded.render() == world.render()
+
+            json_size, json_save_ms = timed(json_save, world, json_path)
+            loaded, json_load_ms = timed(json_load, json_path)
+            assert loaded.render() == world.render()
+
+            print(f"{size}x{size}:")
+            print(f"   快照: {snapshot_size / 1024:10.1f}KiB  保存 {snapshot_save_ms:9.1f}ms  "
+                  f"读取 {snapshot_load_ms:9.1f}ms")
+            print(f"   JSON: {json_size / 1024:10.1f}KiB  保存 {json_save_ms:9.1f}ms  "
+                  f"读取 {json_load_ms:9.1f}ms")
+            print(f"   体积缩小 {json_size / snapshot_size:.0f}x，保存加速 {json_save_ms / snapshot_save_ms:.0f}x，"
+                  f"读取加速 {json_load_ms / snapshot_load_ms:.0f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
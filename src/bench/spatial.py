@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""空间索引与全表扫描的对比：半径内的怪物、最近的宝物、视口内的对象
+
+运行: python -m bench.spatial [地图边长...]
+"""
+
+import random
+import sys
+
+from bench.position import per_call
+from bench.suite import make_level
+from game.game_map import GameMap
+from game.types import GameObjectType, point
+
+
+def scan_radius(game_map: GameMap, x: int, y: int, radius: int):
+    """旧做法：扫描整个对象表"""
+    return [obj for obj in game_map.iter_entities() if obj.type == GameObjectType.MONSTER
+            and (obj.position.x - x) ** 2 + (obj.position.y - y) ** 2 <= radius * radius]
+
+
+def scan_nearest(game_map: GameMap, x: int, y: int):
+    treasures = [obj for obj in game_map.iter_entities() if obj.type == GameObjectType.TREASURE]
+    return min(treasures, key=lambda obj: (obj.position.x - x) ** 2 + (obj.position.y - y) ** 2, default=None)
+
+
+def scan_rect(game_map: GameMap, x0: int, y0: int, x1: int, y1: int):
+    return [obj for obj in game_map.iter_entities()
+            if x0 <= obj.position.x < x1 and y0 <= obj.position.y < y1]
+
+
+def main(*sizes: int) -> None:
+    sizes = sizes or (100, 300, 1000)
+    for size in sizes:
+        rng = random.Random(size)
+        game_map, _ = GameMap.from_text(make_level(size, 0.3, rng))
+        game_map.grid.spatial_index()
+        x, y = size // 2, size // 2
+        center = point(x, y)
+        number = max(20, 200000 // size)
+        print(f"{size}x{size}，{len(game_map.grid.entities)} 个稀疏对象:")
+        for label, scan, indexed in (
+            ("半径 8 内的怪物", lambda: scan_radius(game_map, x, y, 8),
+             lambda: game_map.objects_in_radius(center, 8, GameObjectType.MONSTER)),
+            ("最近的宝物", lambda: scan_nearest(game_map, x, y),
+             lambda: game_map.nearest_objects(center, GameObjectType.TREASURE)),
+            ("40x20 视口", lambda: scan_rect(game_map, x - 20, y - 10, x + 20, y + 10),
+             lambda: game_map.objects_in_rect(x - 20, y - 10, x + 20, y + 10)),
+        ):
+            slow, fast = per_call(scan, number // 10 + 1), per_call(indexed, number)
+            print(f"  {label:10s} 扫描 {slow / 1000:9.1f}µs  索引 {fast / 1000:7.1f}µs  快 {slow / fast:6.0f} 倍")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""冷启动耗时：在全新的解释器中执行导入或命令行工具，取多次运行的最小值与中位数
+
+运行: python -m bench.startup [--runs 10] [--profile 模块]
+      对比改动前后：在两个版本的 src 目录下分别运行
+      --profile 用 python -X importtime 列出该模块导入过程中最慢的子模块
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+LEVEL = "墙墙墙墙墙\n墙我钥宝门\n墙墙墙墙墙\n"
+
+# (说明, 要计时的语句)
+CASES = [
+    ("空解释器", "pass"),
+    ("import game", "import game"),
+    ("from game import GameObjectType", "from game import GameObjectType"),
+    ("from game import World", "from game import World"),
+    ("关卡校验", "from game.solver import main; main([{level!r}])"),
+]
+
+_TIMER = "import time; _t = time.perf_counter(); {stmt}; print(time.perf_counter() - _t)"
+
+
+def time_statement(stmt: str, runs: int) -> Tuple[float, float, float]:
+    """返回语句耗时的 (最小值, 中位数) 与整个进程耗时的中位数，单位毫秒"""
+    samples = []
+    processes = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", _TIMER.format(stmt=stmt)], capture_output=True,
+                                text=True, check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+        processes.append((time.perf_counter() - started) * 1000)
+        samples.append(float(output.stdout.strip().splitlines()[-1]) * 1000)
+    return min(samples), statistics.median(samples), statistics.median(processes)
+
+
+def profile(module: str, limit: int = 15) -> None:
+    """打印导入 module 时累计耗时最长的子模块"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(__file__)))
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    rows.sort(reverse=True)
+    print(f"{'累计':>9s} {'自身':>9s}  模块")
+    for cumulative_us, self_us, name in rows[:limit]:
+        print(f"{cumulative_us / 1000:7.1f}ms {self_us / 1000:7.1f}ms  {name}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="冷启动耗时")
+    parser.add_argument("--runs", type=int, default=10, help="每项运行次数")
+    parser.add_argument("--profile", metavar="模块", help="打印该模块的导入耗时分布")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        profile(args.profile)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        level = os.path.join(directory, "level.txt")
+        with open(level, "w", encoding="utf-8") as f:
+            f.write(LEVEL)
+        for label, stmt in CASES:
+            best, median, process = time_statement(stmt.format(level=level), args.runs)
+            print(f"{label:34s} 最小 {best:6.1f}ms  中位数 {median:6.1f}ms  整个进程 {process:6.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
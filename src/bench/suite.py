@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""游戏引擎基准测试套件
+
+在不同尺寸和对象密度的生成地图上测量引擎操作的吞吐量（ops/sec）、
+延迟分位数和峰值内存（tracemalloc），结果可保存为 JSON 基线，
+之后的运行与基线比较以发现性能回退。
+
+运行: python -m bench.suite [--sizes 10 50 200 1000 2000] [--densities 0.05 0.2]
+                            [--output 结果.json] [--baseline 基线.json]
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence
+
+from game.world import World
+
+DEFAULT_SIZES = (10, 50, 200, 1000, 2000)
+DEFAULT_DENSITIES = (0.05, 0.2)
+MIN_SIZE = 4
+
+# 随机对象的相对比例：墙占大头，其余为可交互对象和怪物
+OBJECT_WEIGHTS = {"#": 60, "D": 8, "K": 8, "T": 12, "M": 8, "N": 4}
+
+
+def make_level(size: int, density: float, rng: random.Random) -> str:
+    """生成边长为 size 的关卡，内部格子按 density 随机放置对象
+
+    玩家固定在 (1, 1)，右侧是一个 NPC（交互不改变地图），下方留空用于来回移动，
+    所以 size 至少为 MIN_SIZE。
+    """
+    if size < MIN_SIZE:
+        raise ValueError(f"地图边长至少为 {MIN_SIZE}: {size}")
+    symbols = list(OBJECT_WEIGHTS)
+    weights = list(OBJECT_WEIGHTS.values())
+    inner = size - 2
+    rows = ["#" * size]
+    for y in range(1, size - 1):
+        count = int(inner * density + rng.random())
+        row = [" "] * inner
+        for x, symbol in zip(rng.sample(range(inner), count), rng.choices(symbols, weights, k=count)):
+            row[x] = symbol
+        if y == 1:
+            row[0], row[1] = "@", "N"
+        elif y == 2:
+            row[0] = " "
+        rows.append("#" + "".join(row) + "#")
+    rows.append("#" * size)
+    return "\n".join(rows)
+
+
+# 每项操作至少采样的次数；单次很慢的操作最多再等 MAX_TIME 秒凑够样本
+MIN_RUNS = 10
+MAX_TIME = 10.0
+
+# 各分位数需要的最少样本数，不足时不报告（最近秩法下只是在重复报告最大值）
+PERCENTILE_MIN_RUNS = {"p90_us": 10, "p99_us": 100}
+
+
+def measure(operation: Callable[[], object], min_time: float, max_runs: int,
+            min_runs: int = MIN_RUNS, max_time: float = MAX_TIME) -> List[float]:
+    """反复执行操作直到累计 min_time 秒且至少 min_runs 次，返回每次耗时（秒）
+
+    最多执行 max_runs 次；累计超过 max_time 秒后即使不足 min_runs 次也停止。
+    """
+    samples = []
+    timer = time.perf_counter
+    start_time = timer()
+    deadline = start_time + min_time
+    cutoff = start_time + max(min_time, max_time)
+    while len(samples) < max_runs:
+        start = timer()
+        operation()
+        end = timer()
+        samples.append(end - start)
+        if end >= deadline and (len(samples) >= min_runs or end >= cutoff):
+            break
+    return samples
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """已排序样本的分位数（最近秩法）"""
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """汇总样本：吞吐量与微秒级延迟分位数，样本不足的分位数不出现在结果中"""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    stats = {
+        "runs": len(ordered),
+        "ops_per_sec": len(ordered) / total if total else float("inf"),
+        "mean_us": statistics.fmean(ordered) * 1e6,
+        "p50_us": percentile(ordered, 0.50) * 1e6,
+    }
+    for field, fraction in (("p90_us", 0.90), ("p99_us", 0.99)):
+        if len(ordered) >= PERCENTILE_MIN_RUNS[field]:
+            stats[field] = percentile(ordered, fraction) * 1e6
+    stats["max_us"] = ordered[-1] * 1e6
+    return stats
+
+
+def peak_memory(operation: Callable[[], object]) -> int:
+    """单次执行操作期间 tracemalloc 记录的峰值内存（字节）"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        operation()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def make_operations(level: str) -> Dict[str, Callable[[], object]]:
+    """为一张关卡准备各引擎操作；有状态的操作共享同一个世界"""
+    world = World.from_text(level)
+    player = world.player
+    world.render()
+
+    def move():
+        player.move(0, 1, world)
+        player.move(0, -1, world)
+
+    def move_render():
+        player.move(0, 1, world)
+        world.render()
+        player.move(0, -1, world)
+        world.render()
+
+    return {
+        "from_text": lambda: World.from_text(level),
+        "render": world.render,
+        "move": move,  # 一次往返，计为两步
+        "move_render": move_render,
+        "interact_forward": world.interact_forward,
+        "model_dump_json": world.model_dump_json,
+    }
+
+
+# 每次调用包含的操作次数
+OPERATION_WEIGHTS = {"move": 2, "move_render": 2}
+
+
+def run_suite(sizes: Sequence[int] = DEFAULT_SIZES, densities: Sequence[float] = DEFAULT_DENSITIES,
+              min_time: float = 0.2, max_runs: int = 10000, memory: bool = True,
+              operations: Optional[Sequence[str]] = None, min_runs: int = MIN_RUNS,
+              max_time: float = MAX_TIME, log=print) -> Dict:
+    """运行所有组合，返回可写入 JSON 的结果"""
+    results = {}
+    for size in sizes:
+        for density in densities:
+            level = make_level(size, density, random.Random(size * 1000 + int(density * 100)))
+            table = make_operations(level)
+            for name, operation in table.items():
+                if operations and name not in operations:
+                    continue
+                weight = OPERATION_WEIGHTS.get(name, 1)
+                samples = [sample / weight for sample in measure(operation, min_time, max_runs, min_runs, max_time)]
+                stats = summarize(samples)
+                if memory:
+                    stats["peak_bytes"] = peak_memory(operation)
+                key = f"{name}/{size}x{size}/d{density:g}"
+                results[key] = stats
+                log(format_row(key, stats))
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "min_time": min_time,
+            "min_runs": min_runs,
+        },
+        "results": results,
+    }
+
+
+def format_row(key: str, stats: Dict[str, float]) -> str:
+    """格式化单行结果"""
+    line = f"{key:<36} {stats['ops_per_sec']:>12,.1f} ops/s  p50 {stats['p50_us']:>10.1f}us"
+    for field in ("p90_us", "p99_us"):
+        value = f"{stats[field]:>10.1f}us" if field in stats else f"{'-':>12}"
+        line += f"  {field[:3]} {value}"
+    line += f"  ({stats['runs']} 次)"
+    if "peak_bytes" in stats:
+        line += f"  峰值 {stats['peak_bytes'] / 1024:>10.1f}KiB"
+    return line
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = 0.2, min_runs: int = MIN_RUNS) -> List[str]:
+    """与基线比较 p50 延迟和峰值内存，返回超出容差的回退描述
+
+    任一方样本少于 min_runs 次时不比较延迟，单次测量的抖动不算作回退。
+    """
+    regressions = []
+    for key, stats in current["results"].items():
+        old = baseline["results"].get(key)
+        if old is None:
+            continue
+        fields = [("peak_bytes", "B")]
+        if min(stats.get("runs", 0), old.get("runs", 0)) >= min_runs:
+            fields.insert(0, ("p50_us", "us"))
+        for field, unit in fields:
+            if field not in stats or field not in old or not old[field]:
+                continue
+            ratio = stats[field] / old[field]
+            if ratio > 1 + tolerance:
+                regressions.append(f"{key} {field}: {old[field]:.1f}{unit} -> {stats[field]:.1f}{unit} "
+                                   f"({(ratio - 1) * 100:+.0f}%)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="游戏引擎基准测试套件")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="地图边长")
+    parser.add_argument("--densities", type=float, nargs="+", default=list(DEFAULT_DENSITIES),
+                        help="内部格子的对象密度")
+    parser.add_argument("--operations", nargs="+", help="只运行指定的操作")
+    parser.add_argument("--min-time", type=float, default=0.2, help="每项操作的最少测量秒数")
+    parser.add_argument("--max-runs", type=int, default=10000, help="每项操作的最多执行次数")
+    parser.add_argument("--min-runs", type=int, default=MIN_RUNS,
+                        help="每项操作的最少执行次数，少于此数的结果不参与延迟比较")
+    parser.add_argument("--max-time", type=float, default=MAX_TIME,
+                        help="为凑够最少次数每项操作最多测量的秒数")
+    parser.add_argument("--no-memory", action="store_true", help="跳过 tracemalloc 峰值内存测量")
+    parser.add_argument("--output", help="把结果写入 JSON 文件（可作为之后的基线）")
+    parser.add_argument("--baseline", help="与之比较的基线 JSON 文件")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的相对回退幅度")
+    args = parser.parse_args(argv)
+    if min(args.sizes) < MIN_SIZE:
+        parser.error(f"地图边长至少为 {MIN_SIZE}")
+
+    report = run_suite(args.sizes, args.densities, args.min_time, args.max_runs,
+                       memory=not args.no_memory, operations=args.operations,
+                       min_runs=args.min_runs, max_time=args.max_time)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"结果已写入 {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance, min_runs=args.min_runs)
+        if regressions:
+            print(f"发现 {len(regressions)} 项回退（容差 {args.tolerance:.0%}）:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print("与基线相比没有回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
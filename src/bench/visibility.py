@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""视野计算：每回合为所有怪物计算视野的开销
+
+对比无缓存（每回合全部重算）、缓存命中（地图未变）以及开一扇门后的
+增量失效与整体清空。
+
+运行: python -m bench.visibility [怪物数量...]
+"""
+
+import random
+import sys
+import time
+
+from bench.suite import make_level
+from game.game_map import GameMap
+from game.types import GameObjectType, point
+from game.visibility import field_of_view
+
+SIZE = 200
+RADIUS = 8
+
+
+def tick(game_map: GameMap, origins) -> None:
+    cache = game_map.grid.fov_cache()
+    cache.get_many(origins, RADIUS)
+
+
+def timed(operation) -> float:
+    start = time.perf_counter()
+    operation()
+    return (time.perf_counter() - start) * 1000
+
+
+def main(*counts: int) -> None:
+    rng = random.Random(SIZE)
+    game_map, _ = GameMap.from_text(make_level(SIZE, 0.2, rng))
+    grid = game_map.grid
+    monsters = game_map.objects_of_type(GameObjectType.MONSTER)
+    doors = game_map.objects_of_type(GameObjectType.DOOR)
+    print(f"{SIZE}x{SIZE}，视野半径 {RADIUS}，{len(monsters)} 个怪物，{len(doors)} 扇门")
+
+    for count in counts or (100, 300, 600):
+        observers = rng.sample(monsters, min(count, len(monsters)))
+        origins = [(monster.position.x, monster.position.y) for monster in observers]
+        cold = timed(lambda: [field_of_view(grid, x, y, RADIUS) for x, y in origins])
+        grid.fov_cache().clear()
+        tick(game_map, origins)
+        warm = timed(lambda: tick(game_map, origins))
+
+        # 开一扇门：只重算看得到这扇门的视野
+        door = rng.choice(doors)
+        game_map.remove_object_at(door.position)
+        incremental = timed(lambda: tick(game_map, origins))
+        game_map.add_object(door)
+        grid.fov_cache().clear()
+        full = timed(lambda: tick(game_map, origins))
+        print(f"  {count:5} 个观察者  无缓存 {cold:7.1f}ms  命中 {warm:6.2f}ms  "
+              f"开门后增量 {incremental:6.2f}ms  清空重算 {full:7.1f}ms")
+
+    # 单次查询
+    x, y = origins[0]
+    start = time.perf_counter()
+    for _ in range(200):
+        game_map.has_line_of_sight(point(x, y), point(x + 6, y + 5))
+    print(f"  视线检查 {(time.perf_counter() - start) / 200 * 1e6:.1f}µs/次")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
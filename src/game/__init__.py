@@ -1,27 +1,46 @@
-"""AI文字游戏模块"""
-
-from .base import Text_BaseModel
-from .types import (
-    GameObjectType,
-    Direction,
-    Position,
-    GameObject,
-    Player,
-    GameCell,
-    InteractionResult
-)
-from .game_map import GameMap
-from .world import World
-
-__all__ = [
-    "Text_BaseModel",
-    "GameObjectType",
-    "Direction",
-    "Position",
-    "GameObject",
-    "Player",
-    "GameCell",
-    "InteractionResult",
-    "GameMap",
-    "World"
-]
\ No newline at end of file
+"""AI文字游戏模块
+
+导出的名字按需加载（模块级 __getattr__）：import game 不会加载 pydantic，
+只用到 GameObjectType 等枚举的工具也不必构建模型。
+"""
+
+import importlib
+
+# 导出名 -> 所在子模块
+_EXPORTS = {
+    "Text_BaseModel": ".base",
+    "GameObjectType": ".enums",
+    "Direction": ".enums",
+    "Position": ".types",
+    "Point": ".types",
+    "point": ".types",
+    "GameObject": ".types",
+    "Player": ".types",
+    "GameCell": ".types",
+    "InteractionResult": ".types",
+    "TileProto": ".tiles",
+    "GameMap": ".game_map",
+    "ChunkedMap": ".chunked",
+    "World": ".world",
+    "Event": ".events",
+    "EventType": ".events",
+    "EventBus": ".events",
+    "Scheduler": ".scheduler",
+    "RuleSet": ".rules",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
@@ -1,15 +1,77 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+import copy
+import hashlib
 import json
 
+_new_object = object.__new__
+_set_attribute = object.__setattr__
+
+# 紧凑 JSON 的分隔符（indent=None 时使用）
+COMPACT_SEPARATORS = (",", ":")
+
+# 每个模型类的提示词素材缓存: 类 -> (构建时的核心 schema, {名称: 值})
+# 模型被重建（model_rebuild）后核心 schema 对象会更换，缓存随之失效
+_artifacts: Dict[type, Tuple[object, Dict[str, object]]] = {}
+
+
+def _dumps(data, indent: Optional[int]) -> str:
+    if indent is None:
+        return json.dumps(data, ensure_ascii=False, separators=COMPACT_SEPARATORS)
+    return json.dumps(data, indent=indent, ensure_ascii=False)
+
+
+def warm_artifacts(classes: Iterable[type], indents: Iterable[Optional[int]] = (2, None)) -> None:
+    """预先计算各类的 schema、示例与版本，供启动时调用"""
+    indents = tuple(indents)
+    for cls in classes:
+        cls.schema_version()
+        for indent in indents:
+            cls.get_schema_json(indent)
+            cls.get_example_json(indent)
+
+
+def clear_artifacts() -> None:
+    """清空所有类的提示词素材缓存"""
+    _artifacts.clear()
+
+
 class Text_BaseModel(BaseModel):
     """
     自定义的 BaseModel 基类，提供通用的 schema 和示例方法
     """
+    # 校验与序列化器推迟到首次使用时构建，导入模型模块更快
+    model_config = ConfigDict(defer_build=True)
     
     @classmethod
-    def get_schema_json(cls) -> str:
-        """获取格式化的 JSON Schema"""
-        return json.dumps(cls.model_json_schema(), indent=2, ensure_ascii=False)
+    def cached_artifact(cls, name: str, build: Callable[[], object]):
+        """按名称取本类的缓存素材，首次访问时调用 build 计算
+
+        只依赖本类 schema 的结果（JSON Schema、示例、提示词片段）才适合缓存在这里。
+        """
+        if not cls.__pydantic_complete__:
+            cls.model_rebuild()
+        core_schema = cls.__pydantic_core_schema__
+        entry = _artifacts.get(cls)
+        if entry is None or entry[0] is not core_schema:
+            entry = _artifacts[cls] = (core_schema, {})
+        values = entry[1]
+        try:
+            return values[name]
+        except KeyError:
+            value = values[name] = build()
+            return value
+
+    @classmethod
+    def schema_version(cls) -> str:
+        """JSON Schema 的摘要，schema 变化时随之变化"""
+        return cls.cached_artifact("schema_version", lambda: hashlib.sha256(
+            cls.get_schema_json(None).encode("utf-8")).hexdigest()[:16])
+
+    @classmethod
+    def get_schema_json(cls, indent: Optional[int] = 2) -> str:
+        """获取 JSON Schema；indent 为 None 时输出紧凑格式"""
+        return cls.cached_artifact(("schema", indent), lambda: _dumps(cls.model_json_schema(), indent))
     
     @classmethod
     def get_example_instance(cls):
@@ -20,11 +82,63 @@ class Text_BaseModel(BaseModel):
         return cls()
     
     @classmethod
-    def get_example_json(cls) -> str:
-        """获取格式化的示例 JSON"""
-        example = cls.get_example_instance()
-        return json.dumps(example.model_dump(), indent=2, ensure_ascii=False)
-
-    def model_dump_json(self) -> str:
-        """获取格式化的 JSON"""
-        return json.dumps(self.model_dump(), indent=2, ensure_ascii=False)
\ No newline at end of file
+    def get_example_json(cls, indent: Optional[int] = 2) -> str:
+        """获取示例 JSON；indent 为 None 时输出紧凑格式"""
+        return cls.cached_artifact(("example", indent),
+                                   lambda: _dumps(cls.get_example_instance().model_dump(), indent))
+
+    def model_dump_json(self, indent: Optional[int] = 2) -> str:
+        """获取 JSON；默认缩进两格，indent 为 None 时输出紧凑格式
+
+        直接使用 pydantic-core 的序列化器，不经过 model_dump 生成的中间字典。
+        """
+        return self.__pydantic_serializer__.to_json(self, indent=indent).decode("utf-8")
+
+    @classmethod
+    def _from_trusted(cls, values: dict):
+        """用已知合法且完整的字段值直接创建实例，跳过校验和默认值处理
+
+        比 model_construct 快得多，只供引擎内部在热点路径上使用。
+        """
+        instance = _new_object(cls)
+        _set_attribute(instance, '__dict__', values)
+        _set_attribute(instance, '__pydantic_fields_set__', set(values))
+        _set_attribute(instance, '__pydantic_extra__', None)
+        _set_attribute(instance, '__pydantic_private__', None)
+        return instance
+
+    # 引擎内部状态放在 __slots__ 中而不是 PrivateAttr，以避开 pydantic 私有属性
+    # 较慢的 __getattr__ 查找；以下方法让这些槽参与复制与 pickle。
+    # 列在 __transient__ 中的槽（如打开的文件、监听器）不随副本传递，副本中为 None。
+    __transient__ = ()
+
+    def _slot_items(self):
+        """遍历子类 __slots__ 中声明的内部状态"""
+        transient = type(self).__transient__
+        for klass in type(self).__mro__:
+            for name in klass.__dict__.get('__slots__', ()):
+                if name.startswith('_') and not name.startswith('__') and hasattr(self, name):
+                    yield name, None if name in transient else getattr(self, name)
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state['__slots_state__'] = dict(self._slot_items())
+        return state
+
+    def __setstate__(self, state):
+        slots = state.pop('__slots_state__', {})
+        super().__setstate__(state)
+        for name, value in slots.items():
+            object.__setattr__(self, name, value)
+
+    def __copy__(self):
+        clone = super().__copy__()
+        for name, value in self._slot_items():
+            object.__setattr__(clone, name, value)
+        return clone
+
+    def __deepcopy__(self, memo=None):
+        clone = super().__deepcopy__(memo)
+        for name, value in self._slot_items():
+            object.__setattr__(clone, name, copy.deepcopy(value, memo))
+        return clone
@@ -0,0 +1,156 @@
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+from .types import Position
+from .world import World
+
+try:
+    import numpy as np
+except ImportError:  # 没有 NumPy 时退回逐个世界的标量循环
+    np = None
+
+
+# 指令编码：0 为空操作
+NOOP, UP, DOWN, LEFT, RIGHT, INTERACT = range(6)
+
+# 与 src/test.py 交互指令一致的指令词
+COMMAND_CODES: Dict[str, int] = {
+    "上": UP, "下": DOWN, "左": LEFT, "右": RIGHT,
+    "up": UP, "down": DOWN, "left": LEFT, "right": RIGHT,
+    "查": INTERACT, "互动": INTERACT, "interact": INTERACT,
+}
+
+# 各指令的位移 (dx, dy)
+COMMAND_DELTAS: Tuple[Tuple[int, int], ...] = ((0, 0), (0, -1), (0, 1), (-1, 0), (1, 0), (0, 0))
+
+
+class BatchResult(NamedTuple):
+    """单个世界的批量运行结果"""
+    state: dict
+    steps: int
+
+
+def encode_commands(commands: Iterable) -> List[int]:
+    """将指令词（或已编码的整数）转换为指令编码，未知指令视为空操作"""
+    return [command if isinstance(command, int) else COMMAND_CODES.get(command, NOOP)
+            for command in commands]
+
+
+def run_scalar(worlds: Sequence[World], streams: Sequence[Iterable]) -> List[BatchResult]:
+    """逐个世界执行指令的参考实现（走 Player.move / World.interact_forward）"""
+    results = []
+    for world, stream in zip(worlds, streams):
+        steps = 0
+        for code in encode_commands(stream):
+            if world.game_over:
+                break
+            steps += 1
+            if code == INTERACT:
+                world.interact_forward()
+            elif code != NOOP:
+                dx, dy = COMMAND_DELTAS[code]
+                world.player.move(dx, dy, world)
+        results.append(BatchResult(state=world.get_game_state(), steps=steps))
+    return results
+
+
+class BatchRunner:
+    """无界面批量模拟器：让 N 个世界按各自的指令流同步推进
+
+    所有地图的通行性被堆叠为 (N, H, W) 的布尔数组，移动用 NumPy 向量化判断；
+    交互会修改世界，仍逐个调用 World.interact_forward，并只刷新被交互的格子。
+    """
+
+    def __init__(self, worlds: Sequence[World]):
+        """用一组世界初始化批量模拟器"""
+        if np is None:
+            raise ImportError("BatchRunner 需要 NumPy，可改用 run_scalar")
+        self.worlds = list(worlds)
+        count = len(self.worlds)
+
+        self.widths = np.array([w.game_map.width for w in self.worlds], dtype=np.int64)
+        self.heights = np.array([w.game_map.height for w in self.worlds], dtype=np.int64)
+        max_width = int(self.widths.max()) if count else 1
+        max_height = int(self.heights.max()) if count else 1
+
+        # 超出各自地图范围的填充部分一律不可通行
+        self.passable = np.zeros((count, max_height, max_width), dtype=bool)
+        for i, world in enumerate(self.worlds):
+            self.passable[i, :world.game_map.height, :world.game_map.width] = self._passability(world)
+
+        self.xs = np.array([w.player.position.x for w in self.worlds], dtype=np.int64)
+        self.ys = np.array([w.player.position.y for w in self.worlds], dtype=np.int64)
+        self.over = np.array([w.game_over for w in self.worlds], dtype=bool)
+
+    @staticmethod
+    def _passability(world: World):
+        """读取一张地图的通行性位图"""
+        game_map = world.game_map
+        bitmap = np.frombuffer(game_map.passability_view(), dtype=np.uint8)
+        return bitmap.astype(bool).reshape(game_map.height, game_map.width)
+
+    def run(self, streams: Sequence[Iterable]) -> List[BatchResult]:
+        """同步执行每个世界的指令流，返回各世界的最终状态与执行步数"""
+        count = len(self.worlds)
+        if len(streams) != count:
+            raise ValueError("指令流数量必须与世界数量一致")
+
+        encoded = [encode_commands(stream) for stream in streams]
+        lengths = np.array([len(codes) for codes in encoded], dtype=np.int64)
+        total = int(lengths.max()) if count else 0
+        commands = np.zeros((count, total), dtype=np.int8)
+        for i, codes in enumerate(encoded):
+            commands[i, :len(codes)] = codes
+
+        deltas = np.array(COMMAND_DELTAS, dtype=np.int64)
+        index = np.arange(count)
+        steps = np.zeros(count, dtype=np.int64)
+        max_x = self.passable.shape[2] - 1
+        max_y = self.passable.shape[1] - 1
+
+        for t in range(total):
+            codes = commands[:, t]
+            active = ~self.over & (lengths > t)
+            steps += active
+
+            dx = deltas[codes, 0]
+            dy = deltas[codes, 1]
+            nx = self.xs + dx
+            ny = self.ys + dy
+            inside = (nx >= 0) & (nx < self.widths) & (ny >= 0) & (ny < self.heights)
+            ok = active & (codes != NOOP) & (codes != INTERACT) & inside
+            ok &= self.passable[index, np.clip(ny, 0, max_y), np.clip(nx, 0, max_x)]
+            self.xs = np.where(ok, nx, self.xs)
+            self.ys = np.where(ok, ny, self.ys)
+
+            for i in np.flatnonzero(active & (codes == INTERACT)):
+                self._interact(int(i))
+
+        for i, world in enumerate(self.worlds):
+            self._sync_player(i)
+
+        return [BatchResult(state=world.get_game_state(), steps=int(steps[i]))
+                for i, world in enumerate(self.worlds)]
+
+    def _sync_player(self, i: int) -> None:
+        """把数组中的玩家位置写回世界"""
+        world = self.worlds[i]
+        x, y = int(self.xs[i]), int(self.ys[i])
+        if world.player.position.x != x or world.player.position.y != y:
+            world.player.position = Position.from_xy(x, y)
+
+    def _interact(self, i: int) -> None:
+        """对单个世界执行交互并刷新受影响的格子"""
+        world = self.worlds[i]
+        self._sync_player(i)
+        world.interact_forward()
+
+        forward = world.forward_point()
+        if world.game_map.is_valid_position(forward):
+            self.passable[i, forward.y, forward.x] = world.game_map.is_passable(forward)
+        self.over[i] = world.game_over
+
+
+def run_batch(worlds: Sequence[World], streams: Sequence[Iterable]) -> List[BatchResult]:
+    """批量运行指令流；没有 NumPy 时退回标量循环"""
+    if np is None:
+        return run_scalar(worlds, streams)
+    return BatchRunner(worlds).run(streams)
@@ -0,0 +1,370 @@
+"""按区块加载的无限地图
+
+世界被划分为 chunk_size x chunk_size 的区块，每个区块是一个独立的 TileGrid。
+区块在首次访问时从区块仓库读取，仓库中没有时由生成器创建；常驻内存的区块
+超过内存预算时，最久未使用的区块写回仓库后释放，因此无论玩家走多远，
+内存占用都有上限。坐标没有边界，可以为负数。
+
+区块文件布局（小端序）:
+    头部      魔数 b"AICK"、格式版本、格子编码字节数
+    原型表    长度前缀的 UTF-8 JSON（同 game.snapshot）
+    格子数组  长度前缀的 zlib 压缩格子编码
+    对象表    长度前缀的 zlib 压缩 uint32 区块内一维下标
+    校验      之前所有字节的 CRC32
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+from .types import GameObject, Position, PositionLike
+from .tiles import TileProto
+from .tile_grid import TileGrid
+from .level_parser import ParsedLevel
+from .snapshot import compress_array, decompress_array, encode_palette, decode_palette, entity_indices
+
+CHUNK_MAGIC = b"AICK"
+CHUNK_VERSION = 1
+
+_HEADER = struct.Struct("<4sHBx")
+_LENGTH = struct.Struct("<I")
+_CRC = struct.Struct("<I")
+
+# 稀疏对象（GameObject、位置及表项）的近似内存占用，用于估算区块大小
+ENTITY_BYTES = 1536
+
+# 区块生成器: (区块 x, 区块 y, 区块边长) -> 区块内容，返回 None 表示空区块
+ChunkGenerator = Callable[[int, int, int], Optional[ParsedLevel]]
+ChunkKey = Tuple[int, int]
+
+
+def encode_chunk(grid: TileGrid) -> bytes:
+    """把区块编码为二进制数据"""
+    parts = [_HEADER.pack(CHUNK_MAGIC, CHUNK_VERSION, grid.tiles.itemsize)]
+    for section in (encode_palette(grid.palette), compress_array(grid.tiles),
+                    compress_array(entity_indices(grid))):
+        parts.append(_LENGTH.pack(len(section)))
+        parts.append(section)
+    data = b"".join(parts)
+    return data + _CRC.pack(zlib.crc32(data))
+
+
+def decode_chunk(data: bytes, size: int, origin: Tuple[int, int]) -> TileGrid:
+    """还原区块；origin 为区块左上角的世界坐标，稀疏对象按世界坐标还原"""
+    end = len(data) - _CRC.size
+    if end < _HEADER.size:
+        raise ValueError("区块数据不完整")
+    (crc,) = _CRC.unpack_from(data, end)
+    if zlib.crc32(data[:end]) != crc:
+        raise ValueError("区块校验失败，数据已损坏")
+    magic, version, itemsize = _HEADER.unpack_from(data)
+    if magic != CHUNK_MAGIC:
+        raise ValueError("不是区块数据")
+    if version > CHUNK_VERSION:
+        raise ValueError(f"不支持的区块版本: {version}")
+
+    sections = []
+    offset = _HEADER.size
+    for _ in range(3):
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        sections.append(data[offset:offset + length])
+        offset += length
+    palette_raw, tiles_raw, objects_raw = sections
+
+    palette = decode_palette(palette_raw)
+    tiles = decompress_array("B" if itemsize == 1 else "H", tiles_raw)
+    if len(tiles) != size * size:
+        raise ValueError("区块尺寸不符")
+    ox, oy = origin
+    entities = {}
+    for index in decompress_array("I", objects_raw):
+        y, x = divmod(index, size)
+        entities[(x, y)] = palette[tiles[index]].materialize(ox + x, oy + y)
+    return TileGrid(size, size, tiles, palette, entities)
+
+
+class ChunkStore(ABC):
+    """区块仓库接口：按区块坐标保存编码后的区块"""
+
+    @abstractmethod
+    def load(self, key: ChunkKey) -> Optional[bytes]:
+        """读取区块数据，不存在时返回 None"""
+
+    @abstractmethod
+    def save(self, key: ChunkKey, data: bytes) -> None:
+        """保存区块数据，覆盖已有的数据"""
+
+    def close(self) -> None:
+        pass
+
+
+class DirectoryChunkStore(ChunkStore):
+    """每个区块一个文件的磁盘仓库
+
+    directory 为 None 时使用临时目录，关闭时删除。
+    """
+
+    EXTENSION = ".chunk"
+
+    def __init__(self, directory: Optional[Union[str, os.PathLike]] = None):
+        self.temporary = directory is None
+        self.directory = tempfile.mkdtemp(prefix="chunks-") if directory is None else os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: ChunkKey) -> str:
+        return os.path.join(self.directory, f"{key[0]}_{key[1]}{self.EXTENSION}")
+
+    def load(self, key: ChunkKey) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def save(self, key: ChunkKey, data: bytes) -> None:
+        """先写临时文件再原子替换"""
+        path = self._path(key)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def close(self) -> None:
+        if self.temporary:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class ChunkStats:
+    """区块加载统计"""
+
+    __slots__ = ("generated", "loaded", "evicted", "saved")
+
+    def __init__(self):
+        self.generated = 0  # 由生成器创建的区块数
+        self.loaded = 0  # 从仓库读回的区块数
+        self.evicted = 0  # 被换出内存的区块数
+        self.saved = 0  # 写入仓库的区块数
+
+
+class ChunkedMap:
+    """区块化的无限地图，接口与 GameMap 的格子访问部分一致
+
+    常驻区块按最近使用顺序保存；新区块载入后若估算的内存占用超过
+    memory_budget 字节，就从最久未使用的区块开始换出（修改过或尚未入库的
+    区块先写回仓库），但始终保留最近使用的两个区块，使跨区块移动时
+    两端的区块都在内存中。
+    """
+
+    __slots__ = ("chunk_size", "shift", "mask", "memory_budget", "store", "generator",
+                 "chunks", "clean", "version", "stats")
+
+    def __init__(self, chunk_size: int = 64, memory_budget: int = 16 << 20,
+                 store: Optional[ChunkStore] = None, generator: Optional[ChunkGenerator] = None):
+        """chunk_size 会向上取整为 2 的幂；store 为 None 时使用临时目录"""
+        shift = max(0, (chunk_size - 1).bit_length())
+        self.shift = shift
+        self.chunk_size = 1 << shift
+        self.mask = self.chunk_size - 1
+        self.memory_budget = memory_budget
+        self.store = DirectoryChunkStore() if store is None else store
+        self.generator = generator
+        self.chunks: "OrderedDict[ChunkKey, TileGrid]" = OrderedDict()
+        # 常驻区块与仓库中内容一致时的版本号，不在表中表示尚未入库
+        self.clean: Dict[ChunkKey, int] = {}
+        self.version = 0
+        self.stats = ChunkStats()
+
+    def __enter__(self) -> 'ChunkedMap':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def chunk_key(self, x: int, y: int) -> ChunkKey:
+        """坐标所在区块的坐标"""
+        return x >> self.shift, y >> self.shift
+
+    def chunk(self, key: ChunkKey) -> TileGrid:
+        """获取区块，必要时从仓库读取或生成，并按内存预算换出其他区块"""
+        grid = self.chunks.get(key)
+        if grid is not None:
+            self.chunks.move_to_end(key)
+            return grid
+
+        size = self.chunk_size
+        origin = (key[0] << self.shift, key[1] << self.shift)
+        data = self.store.load(key)
+        if data is not None:
+            grid = decode_chunk(data, size, origin)
+            self.clean[key] = grid.version
+            self.stats.loaded += 1
+        else:
+            grid = self._generate(key, origin)
+            self.stats.generated += 1
+        self.chunks[key] = grid
+        self._evict()
+        return grid
+
+    def _generate(self, key: ChunkKey, origin: Tuple[int, int]) -> TileGrid:
+        size = self.chunk_size
+        level = None if self.generator is None else self.generator(key[0], key[1], size)
+        if level is None:
+            return TileGrid(size, size)
+        if (level.width, level.height) != (size, size):
+            raise ValueError(f"生成的区块尺寸为 {level.width}x{level.height}，应为 {size}x{size}")
+        ox, oy = origin
+        entities = {(x, y): proto.materialize(ox + x, oy + y) for (x, y), proto in level.entities.items()}
+        return TileGrid(size, size, level.tiles, level.palette, entities)
+
+    @staticmethod
+    def footprint(grid: TileGrid) -> int:
+        """区块内存占用的估算值（字节）"""
+        cells = len(grid.tiles)
+        size = cells * grid.tiles.itemsize + len(grid.passable) + len(grid.entities) * ENTITY_BYTES
+        if grid.neighbors is not None:
+            size += cells
+        return size
+
+    def memory_usage(self) -> int:
+        """常驻区块的估算内存占用（字节）"""
+        return sum(self.footprint(grid) for grid in self.chunks.values())
+
+    def _evict(self) -> None:
+        chunks = self.chunks
+        usage = self.memory_usage()
+        while usage > self.memory_budget and len(chunks) > 2:
+            key, grid = chunks.popitem(last=False)
+            usage -= self.footprint(grid)
+            self._write_back(key, grid)
+            self.clean.pop(key, None)
+            self.stats.evicted += 1
+
+    def _write_back(self, key: ChunkKey, grid: TileGrid) -> None:
+        if self.clean.get(key) != grid.version:
+            self.store.save(key, encode_chunk(grid))
+            self.clean[key] = grid.version
+            self.stats.saved += 1
+
+    def flush(self) -> None:
+        """把修改过的常驻区块写入仓库"""
+        for key, grid in self.chunks.items():
+            self._write_back(key, grid)
+
+    def close(self) -> None:
+        """写回全部区块并关闭仓库"""
+        self.flush()
+        self.chunks.clear()
+        self.clean.clear()
+        self.store.close()
+
+    @property
+    def resident_chunks(self) -> int:
+        """常驻内存的区块数"""
+        return len(self.chunks)
+
+    def _cell(self, x: int, y: int) -> Tuple[TileGrid, int, int]:
+        """坐标所在的区块与区块内坐标"""
+        return self.chunk((x >> self.shift, y >> self.shift)), x & self.mask, y & self.mask
+
+    def is_valid_position(self, position: PositionLike) -> bool:
+        """无限地图上任意整数坐标都有效"""
+        return True
+
+    def is_passable(self, position: PositionLike) -> bool:
+        """检查位置是否可通过"""
+        return self.is_passable_xy(position.x, position.y)
+
+    def is_passable_xy(self, x: int, y: int) -> bool:
+        """按整数坐标检查是否可通过"""
+        grid, lx, ly = self._cell(x, y)
+        return grid.passable[ly * grid.width + lx] == 1
+
+    def get_object_at(self, position: PositionLike) -> Optional[GameObject]:
+        """获取特定位置的对象"""
+        x, y = position.x, position.y
+        grid, lx, ly = self._cell(x, y)
+        entity = grid.entities.get((lx, ly))
+        if entity is not None:
+            return entity
+        code = grid.tiles[ly * grid.width + lx]
+        if code == 0:
+            return None
+        # 区块内的坐标是局部的，静态格子按世界坐标生成对象
+        return grid.palette[code].materialize(x, y)
+
+    def add_object(self, game_object: GameObject) -> bool:
+        """向地图添加对象"""
+        grid, lx, ly = self._cell(game_object.position.x, game_object.position.y)
+        proto = TileProto.from_object(game_object)
+        grid.set_cell(lx, ly, grid.intern(proto), None if proto.is_static else game_object)
+        self.version += 1
+        return True
+
+    def remove_object_at(self, position: PositionLike) -> bool:
+        """移除特定位置的对象"""
+        grid, lx, ly = self._cell(position.x, position.y)
+        if grid.tiles[ly * grid.width + lx] == 0:
+            return False
+        grid.set_cell(lx, ly, 0, None)
+        self.version += 1
+        return True
+
+    def move_object(self, from_pos: PositionLike, to_pos: PositionLike) -> bool:
+        """将对象从一个位置移动到另一个位置，可以跨越区块"""
+        source, sx, sy = self._cell(from_pos.x, from_pos.y)
+        target, tx, ty = self._cell(to_pos.x, to_pos.y)
+        code = source.tiles[sy * source.width + sx]
+        if code == 0:
+            return False
+        proto = source.palette[code]
+        entity = source.entities.get((sx, sy))
+
+        source.set_cell(sx, sy, 0, None)
+        if entity is not None:
+            if not isinstance(to_pos, Position):
+                to_pos = Position.from_xy(to_pos.x, to_pos.y)
+            entity.position = to_pos
+        # 两个区块的原型表各自独立，按原型重新取编码
+        target.set_cell(tx, ty, target.intern(proto), entity)
+        self.version += 1
+        return True
+
+    def get_region_symbols(self, y: int, x0: int, x1: int) -> List[str]:
+        """获取一行中 [x0, x1) 区间的显示符号，区间可以跨越多个区块"""
+        cells: List[str] = []
+        size, mask = self.chunk_size, self.mask
+        ly = y & mask
+        x = x0
+        while x < x1:
+            grid = self.chunk((x >> self.shift, y >> self.shift))
+            lx = x & mask
+            end = min(x1 - x + lx, size)
+            cells.extend(grid.region_symbols(ly, lx, end))
+            x += end - lx
+        return cells
+
+    def iter_rows(self, x0: int, y0: int, x1: int, y1: int) -> Iterator[List[str]]:
+        """逐行生成 [x0, x1) x [y0, y1) 区域的显示符号"""
+        for y in range(y0, y1):
+            yield self.get_region_symbols(y, x0, x1)
+
+    def render_region(self, x0: int, y0: int, x1: int, y1: int,
+                      player: Optional[PositionLike] = None) -> str:
+        """把 [x0, x1) x [y0, y1) 区域渲染为文本，可在 player 处覆盖玩家符号"""
+        lines = []
+        for y, cells in zip(range(y0, y1), self.iter_rows(x0, y0, x1, y1)):
+            if player is not None and y == player.y and x0 <= player.x < x1:
+                cells[player.x - x0] = "我"  # 玩家符号
+            lines.append("".join(cells))
+        return "\n".join(lines)
+
+    def render_viewport(self, center: PositionLike, width: int, height: int,
+                        player: Optional[PositionLike] = None) -> str:
+        """以 center 为中心渲染视口；无限地图没有边缘，视口不会被夹住"""
+        x0, y0 = center.x - width // 2, center.y - height // 2
+        return self.render_region(x0, y0, x0 + width, y0 + height, center if player is None else player)
@@ -0,0 +1,27 @@
+"""游戏枚举类型
+
+不依赖 pydantic，只需要枚举的工具（如关卡校验）导入本模块即可，无需构建模型。
+"""
+
+from enum import Enum
+
+
+class GameObjectType(str, Enum):
+    """游戏对象类型枚举"""
+    EMPTY = "empty"
+    WALL = "wall"
+    PLAYER = "player"
+    DOOR = "door"
+    KEY = "key"
+    MONSTER = "monster"
+    TREASURE = "treasure"
+    NPC = "npc"
+    ITEM = "item"
+
+
+class Direction(str, Enum):
+    """方向枚举"""
+    UP = "up"
+    DOWN = "down"
+    LEFT = "left"
+    RIGHT = "right"
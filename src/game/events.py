@@ -0,0 +1,77 @@
+"""世界事件与事件总线
+
+交互、实体行动等产生的状态变化以事件的形式发布。订阅者按事件类型登记，
+发布时只调用该类型（以及订阅全部事件）的处理函数。事件类型是字符串，
+内置类型见 EventType，生成的剧本可以使用自定义类型。
+"""
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .types import GameObject, PositionLike
+
+
+class EventType:
+    """内置事件类型（普通字符串常量，便于与剧本中的自定义类型混用）"""
+    DOOR_OPENED = "door_opened"
+    DOOR_LOCKED = "door_locked"
+    KEY_PICKED = "key_picked"
+    TREASURE_PICKED = "treasure_picked"
+    GOLD_CHANGED = "gold_changed"
+    NPC_TALKED = "npc_talked"
+    PLAYER_DEFEATED = "player_defeated"
+    INTERACTION_FAILED = "interaction_failed"
+    ENTITY_MOVED = "entity_moved"
+    VICTORY = "victory"
+
+
+class Event(NamedTuple):
+    """一次状态变化；message 为给玩家看的描述"""
+    type: str
+    message: str = ""
+    source: Optional['GameObject'] = None
+    position: Optional['PositionLike'] = None
+    data: Optional[Dict[str, Any]] = None
+
+
+Handler = Callable[[Event], None]
+
+
+class EventBus:
+    """按事件类型分发的同步事件总线"""
+
+    __slots__ = ("_handlers", "_any", "published")
+
+    def __init__(self):
+        # 处理函数以元组保存，发布过程中增删订阅不影响本次分发
+        self._handlers: Dict[str, Tuple[Handler, ...]] = {}
+        self._any: Tuple[Handler, ...] = ()
+        self.published = 0
+
+    def subscribe(self, event_type: Optional[str], handler: Handler) -> Callable[[], None]:
+        """订阅某类事件（None 表示全部事件），返回取消订阅的函数"""
+        if event_type is None:
+            self._any += (handler,)
+        else:
+            self._handlers[event_type] = self._handlers.get(event_type, ()) + (handler,)
+
+        def unsubscribe() -> None:
+            if event_type is None:
+                self._any = tuple(h for h in self._any if h is not handler)
+                return
+            handlers = tuple(h for h in self._handlers.get(event_type, ()) if h is not handler)
+            if handlers:
+                self._handlers[event_type] = handlers
+            else:
+                self._handlers.pop(event_type, None)
+
+        return unsubscribe
+
+    def publish(self, event: Event) -> Event:
+        """把事件分发给订阅者，返回事件本身"""
+        self.published += 1
+        for handler in self._handlers.get(event.type, ()):
+            handler(event)
+        for handler in self._any:
+            handler(event)
+        return event
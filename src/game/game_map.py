@@ -1,29 +1,74 @@
-from typing import List, Dict, Optional, Tuple
-from pydantic import Field
-from .types import GameObject, GameObjectType, Position, GameCell, Player
+from array import array
+from collections.abc import Mapping
+from typing import List, Dict, FrozenSet, Iterable, Iterator, Optional, Tuple, Union
+from pydantic import Field, model_serializer
+from .types import GameObject, GameObjectType, Position, PositionLike, GameCell, Player
+from .tiles import TileProto, EMPTY_TILE
+from .tile_grid import TileGrid, NEIGHBOR_UP, NEIGHBOR_DOWN, NEIGHBOR_LEFT, NEIGHBOR_RIGHT
 from .base import Text_BaseModel
+from .visibility import line_of_sight
+
+
+class ObjectsView(Mapping):
+    """按位置访问地图对象的只读视图，兼容旧的 objects 字典用法"""
+
+    def __init__(self, game_map: 'GameMap'):
+        self._map = game_map
+
+    def __getitem__(self, position: Position) -> GameObject:
+        game_object = self._map.get_object_at(position)
+        if game_object is None:
+            raise KeyError(position)
+        return game_object
+
+    def __contains__(self, position: object) -> bool:
+        if not isinstance(position, Position):
+            return False
+        return self._map.get_object_at(position) is not None
+
+    def __iter__(self) -> Iterator[Position]:
+        for game_object in self._map.iter_objects():
+            yield game_object.position
+
+    def __len__(self) -> int:
+        return self._map.object_count()
 
 
 class GameMap(Text_BaseModel):
-    """用于管理关卡数据的游戏地图类"""
+    """用于管理关卡数据的游戏地图类
+
+    格子类型以原型编码的形式保存在一维数组中，只有可交互或可移动的对象
+    才会以完整的 GameObject 保存在稀疏对象表里。cells 视图按需生成。
+    """
+
+    __slots__ = ('_grid',)
 
     width: int = Field(description="地图宽度")
     height: int = Field(description="地图高度")
-    cells: List[List[GameCell]] = Field(description="地图格子")
-    objects: Dict[Position, GameObject] = Field(default_factory=dict, description="地图上的对象")
-
-    def __init__(self, width: int, height: int, **data):
-        """初始化游戏地图"""
-        # 创建空格子
-        cells = []
-        for y in range(height):
-            row = []
-            for x in range(width):
-                cell = GameCell(position=Position(x=x, y=y))
-                row.append(cell)
-            cells.append(row)
-
-        super().__init__(width=width, height=height, cells=cells, **data)
+
+    def __init__(self, width: int, height: int, objects=None, grid: Optional[TileGrid] = None, **data):
+        """初始化游戏地图；grid 为已构建好的底层存储"""
+        super().__init__(width=width, height=height, **data)
+        if grid is None:
+            grid = TileGrid(width, height)
+        elif (grid.width, grid.height) != (width, height):
+            raise ValueError("存储尺寸与地图尺寸不符")
+        object.__setattr__(self, '_grid', grid)
+
+        if objects:
+            if isinstance(objects, Mapping):
+                objects = objects.values()
+            for game_object in objects:
+                if not isinstance(game_object, GameObject):
+                    game_object = GameObject.model_validate(game_object)
+                self.add_object(game_object)
+
+    @model_serializer(mode="wrap")
+    def _serialize(self, handler):
+        """序列化时附带对象列表（每个对象自带位置）"""
+        data = handler(self)
+        data["objects"] = [game_object.model_dump() for game_object in self.iter_objects()]
+        return data
 
     @classmethod
     def get_example_instance(cls) -> 'GameMap':
@@ -61,167 +106,253 @@ class GameMap(Text_BaseModel):
 
         return game_map
 
+    @property
+    def grid(self) -> TileGrid:
+        """底层存储引擎，供寻路等热点路径按整数坐标访问"""
+        return self._grid
+
+    @property
+    def cells(self) -> List[List[GameCell]]:
+        """按需生成的格子视图（只读，修改请使用地图接口）"""
+        grid = self._grid
+        if grid.cells_cache is None:
+            cells = []
+            for y in range(self.height):
+                row = []
+                for x in range(self.width):
+                    row.append(GameCell(
+                        position=Position(x=x, y=y),
+                        game_object=grid.object_at(x, y)
+                    ))
+                cells.append(row)
+            grid.cells_cache = cells
+        return grid.cells_cache
+
+    @property
+    def objects(self) -> ObjectsView:
+        """按位置访问对象的只读视图"""
+        return ObjectsView(self)
+
+    @property
+    def palette(self) -> Tuple[TileProto, ...]:
+        """格子编码对应的原型表"""
+        return tuple(self._grid.palette)
+
+    def tiles_view(self) -> memoryview:
+        """按行优先排列的格子编码只读视图"""
+        return memoryview(self._grid.tiles).toreadonly()
+
+    def passability_view(self) -> memoryview:
+        """按行优先排列的通行性位图只读视图（1 表示可通过），随地图变化增量维护"""
+        return memoryview(self._grid.passable).toreadonly()
+
+    def neighbor_index(self) -> memoryview:
+        """四邻接掩码的只读视图，首次调用时生成，之后随地图变化增量维护
+
+        每个格子一个字节，位 NEIGHBOR_UP/DOWN/LEFT/RIGHT 表示对应方向的相邻格子可通过。
+        """
+        grid = self._grid
+        if grid.neighbors is None:
+            grid.build_neighbors()
+        return memoryview(grid.neighbors).toreadonly()
+
+    @property
+    def version(self) -> int:
+        """地图版本号，每次格子变化时递增"""
+        return self._grid.version
+
+    @property
+    def passability_version(self) -> int:
+        """通行性版本号，只在某个格子的可通过状态改变时递增"""
+        return self._grid.passability_version
+
+    @property
+    def terrain_version(self) -> int:
+        """地形版本号，只在墙、门等非移动对象改变通行性时递增，用作寻路缓存的键"""
+        return self._grid.terrain_version
+
+    def row_version(self, y: int) -> int:
+        """指定行最后一次变化时的地图版本号"""
+        return self._grid.row_versions[y]
+
+    def get_row_text(self, y: int) -> str:
+        """获取一行的渲染文本（按行缓存，格子变化时失效）"""
+        return self._grid.row_text(y)
+
+    def get_region_symbols(self, y: int, x0: int, x1: int) -> List[str]:
+        """获取一行中 [x0, x1) 区间的显示符号，只读取区间内的格子"""
+        return self._grid.region_symbols(y, x0, x1)
+
     def is_valid_position(self, position: Position) -> bool:
         """检查位置是否在地图边界内有效"""
         return 0 <= position.x < self.width and 0 <= position.y < self.height
 
     def get_object_at(self, position: Position) -> Optional[GameObject]:
         """获取特定位置的对象"""
-        return self.objects.get(position)
+        grid = self._grid
+        x, y = position.x, position.y
+        if not (0 <= x < grid.width and 0 <= y < grid.height):
+            return None
+        return grid.object_at(x, y)
 
     def add_object(self, game_object: GameObject) -> bool:
-        """向地图添加对象"""
-        if not self.is_valid_position(game_object.position):
+        """向地图添加对象
+
+        对象的类型、名称、符号、可交互和可通过在添加时登记为格子原型；之后修改
+        这些字段需要调用 update_object 才会影响显示和通行性。
+        """
+        grid = self._grid
+        x, y = game_object.position.x, game_object.position.y
+        if not (0 <= x < grid.width and 0 <= y < grid.height):
+            return False
+
+        proto = TileProto.from_object(game_object)
+        code = grid.intern(proto)
+        grid.set_cell(x, y, code, None if proto.is_static else game_object)
+        return True
+
+    def update_object(self, game_object: GameObject) -> bool:
+        """对象的符号、可通过等字段修改后重新登记格子原型；对象不在地图上时返回 False"""
+        grid = self._grid
+        x, y = game_object.position.x, game_object.position.y
+        if not (0 <= x < grid.width and 0 <= y < grid.height) or grid.entities.get((x, y)) is not game_object:
             return False
 
-        self.objects[game_object.position] = game_object
-        self.cells[game_object.position.y][game_object.position.x].game_object = game_object
+        proto = TileProto.from_object(game_object)
+        grid.set_cell(x, y, grid.intern(proto), None if proto.is_static else game_object)
         return True
 
     def remove_object_at(self, position: Position) -> bool:
         """移除特定位置的对象"""
-        if position in self.objects:
-            del self.objects[position]
-            self.cells[position.y][position.x].game_object = None
-            return True
-        return False
+        grid = self._grid
+        x, y = position.x, position.y
+        if not (0 <= x < grid.width and 0 <= y < grid.height):
+            return False
+        if grid.tiles[y * grid.width + x] == 0:
+            return False
+
+        grid.set_cell(x, y, 0, None)
+        return True
 
     def move_object(self, from_pos: Position, to_pos: Position) -> bool:
         """将对象从一个位置移动到另一个位置"""
         if not self.is_valid_position(to_pos):
             return False
 
-        if from_pos in self.objects:
-            game_object = self.objects[from_pos]
-            del self.objects[from_pos]
+        game_object = self.get_object_at(from_pos)
+        if game_object is None:
+            return False
 
-            # 更新旧格子
-            self.cells[from_pos.y][from_pos.x].game_object = None
+        grid = self._grid
+        code = grid.code_at(from_pos.x, from_pos.y)
+        entity = grid.entities.get((from_pos.x, from_pos.y))
 
-            # 更新对象位置
-            game_object.position = to_pos
+        # 更新旧格子
+        grid.set_cell(from_pos.x, from_pos.y, 0, None)
 
-            # 添加到新位置
-            self.objects[to_pos] = game_object
-            self.cells[to_pos.y][to_pos.x].game_object = game_object
+        # 更新对象位置
+        game_object.position = to_pos
 
-            return True
-        return False
+        # 添加到新位置
+        grid.set_cell(to_pos.x, to_pos.y, code, entity)
+        return True
 
     def is_passable(self, position: Position) -> bool:
         """检查位置是否可通过"""
-        if not self.is_valid_position(position):
+        grid = self._grid
+        x, y = position.x, position.y
+        if not (0 <= x < grid.width and 0 <= y < grid.height):
             return False
-
-        game_object = self.get_object_at(position)
-        if game_object is None:
-            return True
-
-        return game_object.passable
+        return grid.passable[y * grid.width + x] == 1
+
+    def is_passable_xy(self, x: int, y: int) -> bool:
+        """按整数坐标检查是否可通过，不需要创建 Position"""
+        grid = self._grid
+        return 0 <= x < grid.width and 0 <= y < grid.height and grid.passable[y * grid.width + x] == 1
+
+    def passable_neighbors(self, x: int, y: int) -> List[Tuple[int, int]]:
+        """按整数坐标获取可通过的相邻格子"""
+        grid = self._grid
+        if grid.neighbors is None:
+            grid.build_neighbors()
+        mask = grid.neighbors[y * grid.width + x]
+        result = []
+        if mask & NEIGHBOR_UP:
+            result.append((x, y - 1))
+        if mask & NEIGHBOR_DOWN:
+            result.append((x, y + 1))
+        if mask & NEIGHBOR_LEFT:
+            result.append((x - 1, y))
+        if mask & NEIGHBOR_RIGHT:
+            result.append((x + 1, y))
+        return result
+
+    def iter_objects(self) -> Iterator[GameObject]:
+        """按行优先顺序遍历地图上的所有对象"""
+        grid = self._grid
+        width = grid.width
+        for index, code in enumerate(grid.tiles):
+            if code:
+                yield grid.object_at(index % width, index // width)
+
+    def iter_entities(self) -> Iterator[GameObject]:
+        """遍历稀疏对象表中的对象（可交互或可移动的对象，不含静态格子）"""
+        return iter(list(self._grid.entities.values()))
+
+    def objects_of_type(self, obj_type: GameObjectType) -> List[GameObject]:
+        """稀疏对象表中某类型的全部对象"""
+        return self._grid.spatial_index().of_type(obj_type)
+
+    def objects_in_rect(self, x0: int, y0: int, x1: int, y1: int,
+                        obj_type: Optional[GameObjectType] = None) -> List[GameObject]:
+        """[x0, x1) x [y0, y1) 范围内的稀疏对象（如视口中的对象），按行列排序"""
+        return self._grid.spatial_index().in_rect(x0, y0, x1, y1, obj_type)
+
+    def objects_in_radius(self, center: PositionLike, radius: float,
+                          obj_type: Optional[GameObjectType] = None) -> List[GameObject]:
+        """与 center 的欧氏距离不超过 radius 的稀疏对象，由近到远排列"""
+        return self._grid.spatial_index().in_radius(center.x, center.y, radius, obj_type)
+
+    def nearest_objects(self, center: PositionLike, obj_type: Optional[GameObjectType] = None,
+                        k: int = 1, max_radius: Optional[float] = None) -> List[GameObject]:
+        """离 center 最近的 k 个稀疏对象，由近到远排列"""
+        return self._grid.spatial_index().nearest(center.x, center.y, obj_type, k, max_radius)
+
+    def is_opaque_xy(self, x: int, y: int) -> bool:
+        """按整数坐标检查是否遮挡视线，地图外视为遮挡"""
+        return self._grid.is_opaque(x, y)
+
+    def field_of_view(self, center: PositionLike, radius: int) -> FrozenSet[Tuple[int, int]]:
+        """从 center 出发、半径 radius 内可见的格子坐标 (x, y)，按地图遮挡版本缓存"""
+        return self._grid.fov_cache().get(center.x, center.y, radius)
+
+    def has_line_of_sight(self, a: PositionLike, b: PositionLike) -> bool:
+        """两点之间的视线是否不被墙或门遮挡"""
+        return line_of_sight(self._grid, a.x, a.y, b.x, b.y)
+
+    def object_count(self) -> int:
+        """地图上的对象数量"""
+        tiles = self._grid.tiles
+        return len(tiles) - tiles.count(0)
 
     def get_render_data(self) -> List[List[str]]:
         """获取用于显示的渲染数据"""
-        render_data = []
-        for y in range(self.height):
-            row = []
-            for x in range(self.width):
-                position = Position(x=x, y=y)
-                game_object = self.get_object_at(position)
+        grid = self._grid
+        return [grid.region_symbols(y, 0, grid.width) for y in range(grid.height)]
 
-                if game_object:
-                    row.append(game_object.symbol)
-                else:
-                    row.append(" ")  # 空白空间
-            render_data.append(row)
+    @classmethod
+    def from_tiles(cls, width: int, height: int, tiles: array, palette: List[TileProto],
+                   entities: Optional[Dict[Tuple[int, int], GameObject]] = None) -> 'GameMap':
+        """用已编码的格子数组批量构建地图"""
+        if len(tiles) != width * height:
+            raise ValueError("格子数组长度与地图尺寸不符")
+        if not palette or palette[0] != EMPTY_TILE:
+            raise ValueError("原型表的编码 0 必须是空格子")
 
-        return render_data
+        return cls(width=width, height=height, grid=TileGrid(width, height, tiles, palette, entities))
 
     @classmethod
-    def from_text(cls, map_text: str) -> Tuple['GameMap', Optional[Player]]:
-        """从文本表示创建游戏地图"""
-        lines = map_text.strip().split('\n')
-
-        # 移除空行
-        lines = [line for line in lines if line.strip()]
-
-        if not lines:
-            raise ValueError("地图文本为空")
-
-        # 计算尺寸（每个字符是单独的格子）
-        height = len(lines)
-        width = max(len(line) for line in lines)
-
-        game_map = cls(width=width, height=height)
-
-        # 字符到对象类型的映射（使用单个字符）
-        char_map = {
-            "#": GameObjectType.WALL,
-            "@": GameObjectType.PLAYER,
-            "D": GameObjectType.DOOR,
-            "K": GameObjectType.KEY,
-            "M": GameObjectType.MONSTER,
-            "T": GameObjectType.TREASURE,
-            "N": GameObjectType.NPC,
-        }
-
-        # 用于原始测试的中文字符映射
-        chinese_map = {
-            "墙": GameObjectType.WALL,
-            "我": GameObjectType.PLAYER,
-            "门": GameObjectType.DOOR,
-            "钥": GameObjectType.KEY,
-            "怪": GameObjectType.MONSTER,
-            "宝": GameObjectType.TREASURE,
-            "人": GameObjectType.NPC,
-        }
-
-        player = None
-
-        for y, line in enumerate(lines):
-            for x, char in enumerate(line):
-                if not char.strip():
-                    continue
-
-                pos = Position(x=x, y=y)
-
-                # 先尝试中文字符映射
-                if char in chinese_map:
-                    obj_type = chinese_map[char]
-
-                    if obj_type == GameObjectType.PLAYER:
-                        # 单独创建玩家
-                        player = Player(position=pos)
-                    else:
-                        # 创建游戏对象
-                        game_object = GameObject(
-                            type=obj_type,
-                            name=obj_type.value,
-                            symbol=char,
-                            position=pos,
-                            interactive=obj_type in [GameObjectType.DOOR, GameObjectType.KEY,
-                                                   GameObjectType.TREASURE, GameObjectType.NPC],
-                            passable=obj_type in [GameObjectType.EMPTY, GameObjectType.PLAYER]
-                        )
-                        game_map.add_object(game_object)
-
-                # 尝试英文字符映射
-                elif char in char_map:
-                    obj_type = char_map[char]
-
-                    if obj_type == GameObjectType.PLAYER:
-                        # 单独创建玩家
-                        player = Player(position=pos)
-                    else:
-                        # 创建游戏对象
-                        game_object = GameObject(
-                            type=obj_type,
-                            name=obj_type.value,
-                            symbol=char,
-                            position=pos,
-                            interactive=obj_type in [GameObjectType.DOOR, GameObjectType.KEY,
-                                                   GameObjectType.TREASURE, GameObjectType.NPC],
-                            passable=obj_type in [GameObjectType.EMPTY, GameObjectType.PLAYER]
-                        )
-                        game_map.add_object(game_object)
-
-        return game_map, player
\ No newline at end of file
+    def from_text(cls, map_text: Union[str, Iterable[str]]) -> Tuple['GameMap', Optional[Player]]:
+        """从文本表示创建游戏地图，也接受文本行的可迭代对象或文件对象"""
+        from .level_parser import parse_level
+        return parse_level(map_text)
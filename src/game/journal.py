@@ -0,0 +1,388 @@
+"""World 的增量日志：自动存档、撤销与重做
+
+日志是只追加的帧序列，每帧为 <长度, CRC32> 头加一个字节的帧类型和负载:
+    CHECKPOINT    完整快照（game.snapshot 格式），之后的帧都以它为起点
+    HISTORY       已包含在检查点中的步骤，只用于恢复撤销栈，重放时不执行
+    REDO_HISTORY  检查点时重做栈中的步骤
+    STEP          一步操作的增量（移动、交互或地图修改）
+    UNDO / REDO   撤销或重做一步
+
+一步操作编码为若干条增量记录（格子编码变化、玩家位置变化、字段新旧值、
+新登记的格子原型），每条同时保存旧值和新值，因此撤销与重做都只需应用这一步。
+一次移动只占二十几个字节，而不是整份快照。
+"""
+
+import json
+import os
+import struct
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Iterator, List, Optional, Tuple, Union
+from .types import GameObjectType, Position
+from .tiles import TileProto
+from .world import World
+from . import snapshot
+
+# 帧类型
+FRAME_CHECKPOINT = 1
+FRAME_HISTORY = 2
+FRAME_REDO_HISTORY = 3
+FRAME_STEP = 4
+FRAME_UNDO = 5
+FRAME_REDO = 6
+
+# 增量记录类型
+OP_CELL = 1  # (OP_CELL, x, y, 旧编码, 新编码)
+OP_POSITION = 2  # (OP_POSITION, 旧 x, 旧 y, 新 x, 新 y)
+OP_FIELD = 3  # (OP_FIELD, 字段编号, 旧值, 新值)
+OP_PROTO = 4  # (OP_PROTO, 编码, 原型)
+
+# 记录的字段：玩家字段在前，世界字段在后
+PLAYER_FIELDS = ("gold", "has_key", "health", "max_health", "inventory")
+WORLD_FIELDS = ("game_over", "victory")
+FIELDS = PLAYER_FIELDS + WORLD_FIELDS
+
+_FRAME = struct.Struct("<II")
+_CELL = struct.Struct("<BiiHH")
+_POSITION = struct.Struct("<Biiii")
+_BLOB = struct.Struct("<BHI")  # 记录类型, 字段编号或原型编码, JSON 长度
+
+Step = Tuple[tuple, ...]
+
+
+def encode_step(step: Step) -> bytes:
+    """把一步操作编码为字节"""
+    parts = []
+    for op in step:
+        kind = op[0]
+        if kind == OP_CELL:
+            parts.append(_CELL.pack(*op))
+        elif kind == OP_POSITION:
+            parts.append(_POSITION.pack(*op))
+        elif kind == OP_FIELD:
+            blob = json.dumps([op[2], op[3]], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            parts.append(_BLOB.pack(OP_FIELD, op[1], len(blob)))
+            parts.append(blob)
+        else:
+            proto = op[2]
+            blob = json.dumps([proto.type.value, proto.name, proto.symbol, proto.interactive, proto.passable],
+                              ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            parts.append(_BLOB.pack(OP_PROTO, op[1], len(blob)))
+            parts.append(blob)
+    return b"".join(parts)
+
+
+def decode_step(data: bytes) -> Step:
+    """从字节还原一步操作"""
+    ops = []
+    offset = 0
+    while offset < len(data):
+        kind = data[offset]
+        if kind == OP_CELL:
+            ops.append(_CELL.unpack_from(data, offset))
+            offset += _CELL.size
+        elif kind == OP_POSITION:
+            ops.append(_POSITION.unpack_from(data, offset))
+            offset += _POSITION.size
+        elif kind in (OP_FIELD, OP_PROTO):
+            _, key, length = _BLOB.unpack_from(data, offset)
+            offset += _BLOB.size
+            value = json.loads(data[offset:offset + length])
+            offset += length
+            if kind == OP_FIELD:
+                ops.append((OP_FIELD, key, value[0], value[1]))
+            else:
+                obj_type, name, symbol, interactive, passable = value
+                ops.append((OP_PROTO, key, TileProto(GameObjectType(obj_type), name, symbol, interactive, passable)))
+        else:
+            raise ValueError(f"未知的增量记录类型: {kind}")
+    return tuple(ops)
+
+
+def _frame(kind: int, payload: bytes = b"") -> bytes:
+    """带长度和校验的帧"""
+    body = bytes((kind,)) + payload
+    return _FRAME.pack(len(body), zlib.crc32(body)) + body
+
+
+def read_frames(data: bytes) -> Tuple[List[Tuple[int, bytes]], int]:
+    """解析帧序列，遇到截断或校验失败的帧即停止；返回 (帧列表, 有效字节数)"""
+    frames = []
+    offset = 0
+    while offset + _FRAME.size <= len(data):
+        length, crc = _FRAME.unpack_from(data, offset)
+        start = offset + _FRAME.size
+        body = data[start:start + length]
+        if length == 0 or len(body) < length or zlib.crc32(body) != crc:
+            break
+        frames.append((body[0], body[1:]))
+        offset = start + length
+    return frames, offset
+
+
+class Journal:
+    """挂接在 World 上的增量日志
+
+    移动、交互和地图修改会被记录为一步操作；步骤保存在内存中的撤销栈里，
+    如果指定了文件，还会追加写入日志文件。每 checkpoint_every 步把日志压缩为
+    一个新的检查点（附带撤销历史），崩溃后可用 Journal.recover 从文件恢复。
+    """
+
+    def __init__(self, world: World, path: Optional[Union[str, os.PathLike]] = None,
+                 checkpoint_every: int = 1000, history: int = 1000):
+        """挂接到世界；给出 path 时新建日志文件并写入初始检查点"""
+        if world.journal is not None:
+            raise ValueError("世界已挂接日志")
+        self.world = world
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self._done: Deque[Step] = deque(maxlen=history)
+        self._undone: Deque[Step] = deque(maxlen=history)
+        self._step: Optional[list] = None
+        self._pending: list = []
+        self._before: Optional[tuple] = None
+        self._replaying = False
+        self._file = None
+        self.steps_since_checkpoint = 0
+        self._attach()
+        if path is not None:
+            self.checkpoint()
+
+    def _attach(self) -> None:
+        """登记到世界和地图存储"""
+        self._palette_size = len(self.world.game_map.grid.palette)
+        object.__setattr__(self.world, '_journal', self)
+        self.world.game_map.grid.listener = self._on_cell
+
+    def close(self) -> None:
+        """写出未完成的记录，关闭文件并从世界上摘下"""
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.world.journal is self:
+            object.__setattr__(self.world, '_journal', None)
+        if self.world.game_map.grid.listener == self._on_cell:
+            self.world.game_map.grid.listener = None
+
+    def __enter__(self) -> 'Journal':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---- 记录 ----
+
+    def _on_cell(self, x: int, y: int, old: int, new: int) -> None:
+        """地图存储的格子写入监听器"""
+        if self._replaying:
+            return
+        ops = self._step if self._step is not None else self._pending
+        palette = self.world.game_map.grid.palette
+        while self._palette_size < len(palette):
+            ops.append((OP_PROTO, self._palette_size, palette[self._palette_size]))
+            self._palette_size += 1
+        ops.append((OP_CELL, x, y, old, new))
+
+    def _capture(self) -> tuple:
+        """记录步骤开始前的玩家与世界字段"""
+        world = self.world
+        player = world.player
+        return (player.position, player.gold, player.has_key, player.health, player.max_health,
+                list(player.inventory), world.game_over, world.victory)
+
+    def begin(self) -> None:
+        """开始一步操作：之后的地图修改和字段变化归入这一步"""
+        self.flush()
+        self._step = []
+        self._before = self._capture()
+
+    @contextmanager
+    def step(self) -> Iterator[None]:
+        """把块内的修改记为一步；已在一步之内时并入外层的步骤
+
+        步骤外的地图修改只暂存在内存中，直到下一步开始或 flush() 才写入文件，
+        会修改地图的操作（交互、回合推进）都应放在步骤内，崩溃后才能恢复。
+        """
+        if self._step is not None:
+            yield
+            return
+        self.begin()
+        try:
+            yield
+        finally:
+            self.end()
+
+    def end(self) -> None:
+        """结束一步操作，比较字段变化并提交"""
+        step, before = self._step, self._before
+        self._step = self._before = None
+        after = self._capture()
+        if before[0] != after[0]:
+            step.append((OP_POSITION, before[0].x, before[0].y, after[0].x, after[0].y))
+        for index, (old, new) in enumerate(zip(before[1:], after[1:])):
+            if old != new:
+                step.append((OP_FIELD, index, old, new))
+        if step:
+            self._commit(tuple(step))
+
+    def record_move(self, old: Position, new: Position) -> None:
+        """记录玩家移动（World.move_player_to 调用）"""
+        if self._replaying:
+            return
+        if self._step is not None:
+            # 在步骤内发生的移动由 end() 比较得出
+            return
+        self.flush()
+        self._commit(((OP_POSITION, old.x, old.y, new.x, new.y),))
+
+    def flush(self) -> None:
+        """把步骤外发生的地图修改（如怪物移动）合并为一步提交"""
+        if self._pending:
+            step = tuple(self._pending)
+            self._pending = []
+            self._commit(step)
+
+    def _commit(self, step: Step) -> None:
+        self._done.append(step)
+        self._undone.clear()
+        self._write(FRAME_STEP, encode_step(step))
+        self.steps_since_checkpoint += 1
+        if self._file is not None and self.checkpoint_every and self.steps_since_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+
+    def _write(self, kind: int, payload: bytes = b"") -> None:
+        if self._file is not None:
+            self._file.write(_frame(kind, payload))
+            self._file.flush()
+
+    # ---- 撤销与重做 ----
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._done or self._pending)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._undone)
+
+    def undo(self) -> bool:
+        """撤销最近一步，返回是否有可撤销的步骤"""
+        self.flush()
+        if not self._done:
+            return False
+        step = self._done.pop()
+        self._apply(step, forward=False)
+        self._undone.append(step)
+        self._write(FRAME_UNDO)
+        return True
+
+    def redo(self) -> bool:
+        """重做最近撤销的一步，返回是否有可重做的步骤"""
+        self.flush()
+        if not self._undone:
+            return False
+        step = self._undone.pop()
+        self._apply(step, forward=True)
+        self._done.append(step)
+        self._write(FRAME_REDO)
+        return True
+
+    def _apply(self, step: Step, forward: bool) -> None:
+        """正向或反向应用一步操作，期间的修改不再被记录"""
+        world = self.world
+        player = world.player
+        grid = world.game_map.grid
+        self._replaying = True
+        try:
+            for op in (step if forward else reversed(step)):
+                kind = op[0]
+                if kind == OP_CELL:
+                    _, x, y, old, new = op
+                    code = new if forward else old
+                    proto = grid.palette[code]
+                    grid.set_cell(x, y, code, None if proto.is_static else proto.materialize(x, y))
+                elif kind == OP_POSITION:
+                    _, old_x, old_y, new_x, new_y = op
+                    player.position = Position.from_xy(new_x, new_y) if forward else Position.from_xy(old_x, old_y)
+                elif kind == OP_FIELD:
+                    _, index, old, new = op
+                    value = new if forward else old
+                    if FIELDS[index] == "inventory":
+                        value = list(value)
+                    target = player if index < len(PLAYER_FIELDS) else world
+                    setattr(target, FIELDS[index], value)
+                elif forward and grid.intern(op[2]) != op[1]:
+                    raise ValueError("日志中的原型编码与地图不一致")
+        finally:
+            self._replaying = False
+        self._palette_size = len(grid.palette)
+
+    # ---- 检查点与恢复 ----
+
+    def checkpoint(self) -> None:
+        """把日志文件压缩为当前状态的快照加撤销历史（写临时文件后原子替换）"""
+        if self.path is None:
+            return
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        temp_path = f"{os.fspath(self.path)}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(_frame(FRAME_CHECKPOINT, snapshot.dumps(self.world)))
+            for step in self._done:
+                f.write(_frame(FRAME_HISTORY, encode_step(step)))
+            for step in self._undone:
+                f.write(_frame(FRAME_REDO_HISTORY, encode_step(step)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+        self._file = open(self.path, "ab")
+        self.steps_since_checkpoint = 0
+
+    @classmethod
+    def recover(cls, path: Union[str, os.PathLike], checkpoint_every: int = 1000,
+                history: int = 1000) -> 'Journal':
+        """从日志文件恢复：载入最后一个检查点并重放其后的步骤
+
+        文件末尾因崩溃而不完整的帧会被截掉；返回挂接在恢复出的世界上的日志，
+        可以继续追加记录，撤销栈也一并恢复。
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        frames, valid = read_frames(data)
+        last = max((i for i, (kind, _) in enumerate(frames) if kind == FRAME_CHECKPOINT), default=None)
+        if last is None:
+            raise ValueError("日志中没有检查点")
+
+        journal = cls(snapshot.loads(frames[last][1]), None, checkpoint_every, history)
+        for kind, payload in frames[last + 1:]:
+            if kind == FRAME_HISTORY:
+                journal._done.append(decode_step(payload))
+            elif kind == FRAME_REDO_HISTORY:
+                journal._undone.append(decode_step(payload))
+            elif kind == FRAME_STEP:
+                step = decode_step(payload)
+                journal._apply(step, forward=True)
+                journal._done.append(step)
+                journal._undone.clear()
+                journal.steps_since_checkpoint += 1
+            elif kind == FRAME_UNDO and journal._done:
+                step = journal._done.pop()
+                journal._apply(step, forward=False)
+                journal._undone.append(step)
+            elif kind == FRAME_REDO and journal._undone:
+                step = journal._undone.pop()
+                journal._apply(step, forward=True)
+                journal._done.append(step)
+
+        if valid < len(data):
+            with open(path, "r+b") as f:
+                f.truncate(valid)
+        journal.path = path
+        journal._file = open(path, "ab")
+        return journal
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""关卡包：把大量关卡以紧凑的格子编码存放在一个文件里，通过内存映射随机读取
+
+布局（小端序）:
+    头部      魔数 b"AIWP"、格式版本、关卡数、原型表/名称/索引的偏移
+    关卡数据  每个关卡: 宽、高、原型表编号、格子编码字节数、玩家坐标，
+              以及 zlib 压缩的格子编码和稀疏对象下标
+    原型表    所有关卡共用的原型表列表（JSON），通常只有默认图例一份
+    名称      UTF-8 拼接的关卡名
+    索引      每个关卡一条定长记录: 偏移、长度、尺寸、对象统计、可解性
+
+打开关卡包只读取头部和原型表，索引记录按下标直接定位，因此打开时间和
+单个关卡的读取时间与关卡包大小无关。
+
+运行: python -m game.level_pack build <输出文件> <关卡目录> [--solve]
+      python -m game.level_pack info <关卡包>
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Union
+from .types import GameObjectType, Player, Position
+from .tiles import TileProto
+from .game_map import GameMap
+from .world import World
+from .snapshot import build_map, compress_array, decompress_array, entity_indices, palette_from_rows, palette_rows
+from .solver import solve_level, solve_many
+
+MAGIC = b"AIWP"
+PACK_VERSION = 1
+
+# 与 World.from_text 一致：关卡中没有玩家时的默认出生点
+DEFAULT_START = (1, 1)
+
+_HEADER = struct.Struct("<4sHHIQQQ")  # 魔数, 版本, 标志, 关卡数, 原型表/名称/索引偏移
+_LEVEL = struct.Struct("<IIHBxiiII")  # 宽, 高, 原型表编号, 编码字节数, 玩家 x/y, 格子/对象数据长度
+_ENTRY = struct.Struct("<QIIIIIIIIbxxxiII")  # 偏移, 长度, 宽, 高, 对象数, 钥匙/门/宝物/怪物数, 可解性, 最短步数, 名称偏移/长度
+
+# 可解性：未检查、不可通关、可通关
+UNKNOWN, UNSOLVABLE, SOLVABLE = -1, 0, 1
+
+
+class LevelInfo(NamedTuple):
+    """关卡包中一个关卡的元数据（来自索引，不读取关卡数据）"""
+    index: int
+    name: str
+    width: int
+    height: int
+    objects: int
+    keys: int
+    doors: int
+    treasures: int
+    monsters: int
+    solvable: Optional[bool]  # None 表示打包时未检查，或检查超出了搜索预算
+    path_length: Optional[int]
+
+
+class LevelPackWriter:
+    """顺序写入关卡包；关卡数据先写，索引在 close() 时写到文件末尾"""
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        """创建（覆盖）关卡包文件"""
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, PACK_VERSION, 0, 0, 0, 0, 0))
+        self._palettes: List[List[TileProto]] = []
+        self._palette_ids: Dict[tuple, int] = {}
+        self._names = bytearray()
+        self._entries: List[bytes] = []
+
+    def __enter__(self) -> 'LevelPackWriter':
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, name: str, game_map: GameMap, player: Optional[Player] = None,
+            solvable: Optional[bool] = None, path_length: Optional[int] = None) -> int:
+        """写入一个关卡，返回其编号"""
+        grid = game_map.grid
+        palette_key = tuple(grid.palette)
+        palette_id = self._palette_ids.get(palette_key)
+        if palette_id is None:
+            palette_id = self._palette_ids[palette_key] = len(self._palettes)
+            self._palettes.append(list(grid.palette))
+
+        px, py = (player.position.x, player.position.y) if player is not None else DEFAULT_START
+        tiles = compress_array(grid.tiles)
+        indices = compress_array(entity_indices(grid))
+        offset = self._file.tell()
+        self._file.write(_LEVEL.pack(grid.width, grid.height, palette_id, grid.tiles.itemsize,
+                                     px, py, len(tiles), len(indices)))
+        self._file.write(tiles)
+        self._file.write(indices)
+
+        counts = {obj_type: 0 for obj_type in (GameObjectType.KEY, GameObjectType.DOOR,
+                                               GameObjectType.TREASURE, GameObjectType.MONSTER)}
+        for game_object in grid.entities.values():
+            if game_object.type in counts:
+                counts[game_object.type] += 1
+
+        encoded_name = name.encode("utf-8")
+        self._entries.append(_ENTRY.pack(
+            offset, self._file.tell() - offset, grid.width, grid.height, len(grid.entities),
+            counts[GameObjectType.KEY], counts[GameObjectType.DOOR],
+            counts[GameObjectType.TREASURE], counts[GameObjectType.MONSTER],
+            UNKNOWN if solvable is None else int(solvable),
+            -1 if path_length is None else path_length,
+            len(self._names), len(encoded_name)
+        ))
+        self._names += encoded_name
+        return len(self._entries) - 1
+
+    def add_text(self, name: str, map_text, solve: bool = False) -> int:
+        """解析关卡文本后写入；solve 为真时同时检查可解性"""
+        game_map, player = GameMap.from_text(map_text)
+        solvable = path_length = None
+        if solve:
+            result = solve_level(game_map, player, name)
+            solvable, path_length = result.solvable, result.path_length
+        return self.add(name, game_map, player, solvable, path_length)
+
+    def close(self) -> None:
+        """写出原型表、名称和索引，并回填头部"""
+        f = self._file
+        if f.closed:
+            return
+        palettes_offset = f.tell()
+        f.write(json.dumps([palette_rows(palette) for palette in self._palettes],
+                           ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        names_offset = f.tell()
+        f.write(self._names)
+        index_offset = f.tell()
+        f.write(b"".join(self._entries))
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, PACK_VERSION, 0, len(self._entries),
+                             palettes_offset, names_offset, index_offset))
+        f.close()
+
+
+class LevelPack:
+    """以内存映射方式打开的只读关卡包"""
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        """打开关卡包，只解析头部和原型表"""
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = None
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self) -> None:
+        if os.fstat(self._file.fileno()).st_size < _HEADER.size:
+            raise ValueError("关卡包数据不完整")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _flags, count, palettes_offset, names_offset, index_offset = \
+            _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError("不是关卡包文件")
+        if version > PACK_VERSION:
+            raise ValueError(f"不支持的关卡包版本: {version}")
+        if index_offset + count * _ENTRY.size > len(self._mmap):
+            raise ValueError("关卡包数据不完整")
+
+        self._count = count
+        self._names_offset = names_offset
+        self._index_offset = index_offset
+        self._palettes = [palette_from_rows(rows)
+                          for rows in json.loads(self._mmap[palettes_offset:names_offset])]
+        self._name_index: Optional[Dict[str, int]] = None
+
+    def close(self) -> None:
+        """关闭内存映射和文件"""
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> 'LevelPack':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, index: int) -> tuple:
+        if not 0 <= index < self._count:
+            raise IndexError(f"关卡编号超出范围: {index}")
+        return _ENTRY.unpack_from(self._mmap, self._index_offset + index * _ENTRY.size)
+
+    def _name(self, name_offset: int, name_length: int) -> str:
+        start = self._names_offset + name_offset
+        return self._mmap[start:start + name_length].decode("utf-8")
+
+    def info(self, index: int) -> LevelInfo:
+        """读取一个关卡的元数据"""
+        (_offset, _length, width, height, objects, keys, doors, treasures, monsters,
+         solvable, path_length, name_offset, name_length) = self._entry(index)
+        return LevelInfo(
+            index=index, name=self._name(name_offset, name_length),
+            width=width, height=height, objects=objects,
+            keys=keys, doors=doors, treasures=treasures, monsters=monsters,
+            solvable=None if solvable == UNKNOWN else bool(solvable),
+            path_length=None if path_length < 0 else path_length
+        )
+
+    def __iter__(self) -> Iterator[LevelInfo]:
+        """按编号遍历所有关卡的元数据"""
+        for index in range(self._count):
+            yield self.info(index)
+
+    def find(self, name: str) -> int:
+        """按名称查找关卡编号（首次调用时建立名称表）"""
+        if self._name_index is None:
+            self._name_index = {}
+            for index in range(self._count):
+                entry = self._entry(index)
+                self._name_index.setdefault(self._name(entry[-2], entry[-1]), index)
+        try:
+            return self._name_index[name]
+        except KeyError:
+            raise KeyError(f"关卡包中没有关卡: {name}") from None
+
+    def load_map(self, level: Union[int, str]) -> tuple:
+        """读取关卡的地图与玩家，返回 (GameMap, Player)；只读取该关卡的字节"""
+        index = self.find(level) if isinstance(level, str) else level
+        offset, length = self._entry(index)[:2]
+        mapped = self._mmap
+        width, height, palette_id, itemsize, px, py, tiles_length, indices_length = \
+            _LEVEL.unpack_from(mapped, offset)
+        start = offset + _LEVEL.size
+        tiles = decompress_array("B" if itemsize == 1 else "H", mapped[start:start + tiles_length])
+        start += tiles_length
+        indices = decompress_array("I", mapped[start:start + indices_length])
+        game_map = build_map(width, height, self._palettes[palette_id], tiles, indices)
+        return game_map, Player(position=Position.from_xy(px, py))
+
+    def load(self, level: Union[int, str]) -> World:
+        """按编号或名称构建关卡的 World"""
+        game_map, player = self.load_map(level)
+        return World(game_map=game_map, player=player)
+
+
+def build_pack(output: Union[str, os.PathLike], paths: Sequence[Union[str, Path]],
+               solve: bool = False, max_workers: Optional[int] = None) -> int:
+    """把关卡文件打包，solve 为真时用进程池并行检查可解性；返回关卡数"""
+    results = None
+    if solve:
+        results = list(solve_many(paths, max_workers=max_workers))
+
+    with LevelPackWriter(output) as writer:
+        for i, path in enumerate(paths):
+            with open(path, encoding="utf-8") as f:
+                game_map, player = GameMap.from_text(f)
+            result = results[i] if results is not None else None
+            writer.add(Path(path).stem, game_map, player,
+                       None if result is None else result.solvable,
+                       None if result is None else result.path_length)
+        return len(writer)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="关卡包工具")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="把目录中的关卡文件打包")
+    build.add_argument("output", help="输出的关卡包文件")
+    build.add_argument("directory", help="关卡目录")
+    build.add_argument("--pattern", default="*.txt", help="关卡文件的匹配模式")
+    build.add_argument("--solve", action="store_true", help="同时检查并记录可解性")
+    build.add_argument("--workers", type=int, default=os.cpu_count(), help="检查可解性的进程数")
+    info = commands.add_parser("info", help="列出关卡包中的关卡")
+    info.add_argument("pack", help="关卡包文件")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        paths = sorted(Path(args.directory).glob(args.pattern))
+        count = build_pack(args.output, paths, args.solve, args.workers)
+        print(f"已打包 {count} 个关卡到 {args.output}（{os.path.getsize(args.output)} 字节）")
+        return 0
+
+    with LevelPack(args.pack) as pack:
+        for level in pack:
+            status = {None: "未检查或未知", True: f"可通关 {level.path_length or '?'} 步", False: "无法通关"}[level.solvable]
+            print(f"{level.index}: {level.name} {level.width}x{level.height} "
+                  f"对象 {level.objects}（钥匙 {level.keys} 门 {level.doors} 宝物 {level.treasures} "
+                  f"怪物 {level.monsters}） {status}")
+        print(f"共 {len(pack)} 个关卡")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
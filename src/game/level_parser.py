@@ -0,0 +1,155 @@
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple, Union
+from .tiles import TileProto, EMPTY_TILE, PLAYER_SYMBOLS, TILE_LEGEND
+
+if TYPE_CHECKING:
+    from .types import Player
+    from .game_map import GameMap
+
+
+class ParsedLevel(NamedTuple):
+    """解析结果的原始形式：格子编码、原型表与非静态格子的原型，不创建任何模型对象"""
+    width: int
+    height: int
+    tiles: array
+    palette: List[TileProto]
+    entities: Dict[Tuple[int, int], TileProto]
+    player: Optional[Tuple[int, int]]
+
+
+class LevelParser:
+    """单遍关卡文本解析器
+
+    每行文本通过图例一次性翻译为格子编码，只有非静态格子（门、钥匙、怪物等）
+    才会创建完整对象。行可以逐条喂入，因此大文件无需整体读入内存。
+    finish_tiles 只返回原始编码，不加载 pydantic 模型，供关卡校验等短命进程使用。
+    """
+
+    def __init__(self, legend: Optional[Mapping[str, TileProto]] = None):
+        """用字符到原型的图例初始化解析器"""
+        self.legend = TILE_LEGEND if legend is None else legend
+
+        self._palette: List[TileProto] = [EMPTY_TILE]
+        codes: Dict[TileProto, int] = {EMPTY_TILE: 0}
+        self._table: Dict[int, int] = {}
+        self._entity_chars = set()
+        for char, proto in self.legend.items():
+            code = codes.get(proto)
+            if code is None:
+                code = codes[proto] = len(self._palette)
+                self._palette.append(proto)
+            self._table[ord(char)] = code
+            if not proto.is_static:
+                self._entity_chars.add(char)
+        for char in PLAYER_SYMBOLS:
+            self._table[ord(char)] = 0
+        self._typecode = 'B' if len(self._palette) <= 0x100 else 'H'
+
+        self._rows: List[array] = []
+        self._width = 0
+        self._last_length = 0
+        self._last_stripped_length = 0
+        self._entities: Dict[Tuple[int, int], TileProto] = {}
+        self._player_position: Optional[Tuple[int, int]] = None
+
+    def feed_line(self, line: str) -> bool:
+        """解析一行文本，空行被忽略；返回是否生成了新行"""
+        if line.endswith('\n'):
+            line = line[:-1]
+        if not line.strip():
+            return False
+        if not self._rows:
+            # 与整体 strip() 一致：去掉首行的前导空白
+            line = line.lstrip()
+
+        y = len(self._rows)
+        chars = set(line)
+        table = self._table
+        for char in chars:
+            if ord(char) not in table:
+                # 未知字符与空白一样视为空格子
+                table[ord(char)] = 0
+
+        for char in chars & self._entity_chars:
+            proto = self.legend[char]
+            x = line.find(char)
+            while x != -1:
+                self._entities[(x, y)] = proto
+                x = line.find(char, x + 1)
+
+        for char in chars & PLAYER_SYMBOLS:
+            x = line.rfind(char)
+            if self._player_position is None or self._player_position[1] < y or self._player_position[0] < x:
+                self._player_position = (x, y)
+
+        translated = line.translate(table)
+        if self._typecode == 'B':
+            row = array('B', translated.encode('latin-1'))
+        else:
+            row = array('H', map(ord, translated))
+
+        # 之前的行按完整长度计宽，当前行可能是末行，先记录去尾随空白后的长度
+        self._width = max(self._width, self._last_length)
+        self._last_length = len(line)
+        self._last_stripped_length = len(line.rstrip())
+        self._rows.append(row)
+        return True
+
+    def feed(self, lines: Iterable[str]) -> None:
+        """逐行解析可迭代的文本行（如文件对象）"""
+        for line in lines:
+            self.feed_line(line)
+
+    @property
+    def row_count(self) -> int:
+        """已解析的行数"""
+        return len(self._rows)
+
+    @property
+    def player_position(self) -> Optional[Tuple[int, int]]:
+        """已解析部分中玩家的出生点，尚未出现时为 None"""
+        return self._player_position
+
+    def finish_tiles(self) -> ParsedLevel:
+        """结束解析，返回原始的格子编码与原型"""
+        if not self._rows:
+            raise ValueError("地图文本为空")
+
+        # 与整体 strip() 一致：末行的尾随空白不计入宽度
+        width = max(self._width, self._last_stripped_length)
+        height = len(self._rows)
+
+        tiles = array(self._typecode)
+        for row in self._rows:
+            tiles.extend(row[:width])
+            if len(row) < width:
+                tiles.extend(array(self._typecode, bytes((width - len(row)) * tiles.itemsize)))
+        self._rows = []
+        return ParsedLevel(width, height, tiles, self._palette, self._entities, self._player_position)
+
+    def finish(self) -> Tuple['GameMap', Optional['Player']]:
+        """批量填充地图存储并返回地图与玩家"""
+        from .types import Player, Position
+        from .game_map import GameMap
+
+        level = self.finish_tiles()
+        entities = {(x, y): proto.materialize(x, y) for (x, y), proto in level.entities.items()}
+        game_map = GameMap.from_tiles(level.width, level.height, level.tiles, level.palette, entities)
+
+        player = None
+        if level.player is not None:
+            x, y = level.player
+            player = Player(position=Position(x=x, y=y))
+
+        return game_map, player
+
+
+def parse_level(source: Union[str, Iterable[str]],
+                legend: Optional[Mapping[str, TileProto]] = None) -> Tuple['GameMap', Optional['Player']]:
+    """解析关卡文本；source 可以是字符串、文本行的可迭代对象或文件对象"""
+    if isinstance(source, str):
+        source = source.split('\n')
+
+    parser = LevelParser(legend)
+    parser.feed(source)
+    return parser.finish()
@@ -0,0 +1,391 @@
+import heapq
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Optional, Tuple
+from .types import GameObjectType, Position
+from .game_map import GameMap
+
+Cell = Tuple[int, int]
+PathFunc = Callable[[GameMap, Cell, Cell], Optional[List[Cell]]]
+
+
+def _prepare(game_map: GameMap, start: Cell, goal: Cell):
+    """检查起点终点并返回 (grid, 起点下标, 终点下标)，无法寻路时返回 None"""
+    grid = game_map.grid
+    if not (grid.in_bounds(*start) and grid.in_bounds(*goal)):
+        return None
+    goal_index = goal[1] * grid.width + goal[0]
+    if not grid.is_terrain_passable(goal_index):
+        return None
+    return grid, start[1] * grid.width + start[0], goal_index
+
+
+def _cells(width: int, indices: List[int]) -> List[Cell]:
+    """下标列表转换为坐标列表"""
+    return [(index % width, index // width) for index in indices]
+
+
+def astar(game_map: GameMap, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+    """四方向 A* 寻路，返回包含起点和终点的格子列表；不可达时返回 None
+
+    怪物、NPC 所在的格子按地形视为可通过（它们会移动），起点本身不检查通行性。
+    """
+    prepared = _prepare(game_map, start, goal)
+    if prepared is None:
+        return None
+    grid, source, target = prepared
+    if source == target:
+        return [start]
+
+    width, size = grid.width, grid.width * grid.height
+    last_x = width - 1
+    tiles, terrain = grid.tiles, grid.terrain_codes
+    gx, gy = goal
+
+    came_from = {source: -1}
+    cost = {source: 0}
+    heap = [(abs(start[0] - gx) + abs(start[1] - gy), 0, source)]
+    while heap:
+        _, g, current = heapq.heappop(heap)
+        g = -g
+        if current == target:
+            path = []
+            while current != -1:
+                path.append(current)
+                current = came_from[current]
+            path.reverse()
+            return _cells(width, path)
+        if g > cost[current]:
+            continue
+
+        x = current % width
+        g += 1
+        for neighbor in (current - 1 if x else -1, current + 1 if x != last_x else -1,
+                         current - width, current + width):
+            if 0 <= neighbor < size and terrain[tiles[neighbor]] and g < cost.get(neighbor, size):
+                cost[neighbor] = g
+                came_from[neighbor] = current
+                h = abs(neighbor % width - gx) + abs(neighbor // width - gy)
+                # f 相同时优先扩展 g 更大（更接近终点）的节点
+                heapq.heappush(heap, (g + h, -g, neighbor))
+    return None
+
+
+def jps(game_map: GameMap, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+    """四方向跳点搜索 (Jump Point Search)，结果与 A* 等长，但只有跳点进入开放列表
+
+    规范路径先沿竖直方向移动、在每一步向两侧水平扫描；水平移动只在遇到强制邻居
+    （上方或下方刚刚从障碍变为可通过）时停下转向。堆操作远少于 A*，但纯 Python 中
+    直线扫描本身开销不小，两者的耗时可用 bench/pathfinding.py 在目标地图上对比。
+    """
+    prepared = _prepare(game_map, start, goal)
+    if prepared is None:
+        return None
+    grid, source, target = prepared
+    if source == target:
+        return [start]
+
+    width, height = grid.width, grid.height
+    tiles, terrain = grid.tiles, grid.terrain_codes
+    gx, gy = goal
+
+    def open_cell(index: int) -> bool:
+        return terrain[tiles[index]] == 1
+
+    def jump_horizontal(index: int, dx: int) -> Optional[int]:
+        x, row = index % width, index - index % width
+        y = row // width
+        while True:
+            x += dx
+            if not 0 <= x < width:
+                return None
+            current = row + x
+            if not open_cell(current):
+                return None
+            if current == target:
+                return current
+            behind = current - dx
+            if y > 0 and open_cell(current - width) and not open_cell(behind - width):
+                return current
+            if y < height - 1 and open_cell(current + width) and not open_cell(behind + width):
+                return current
+
+    def jump_vertical(index: int, dy: int) -> Optional[int]:
+        x, y = index % width, index // width
+        while True:
+            y += dy
+            if not 0 <= y < height:
+                return None
+            current = y * width + x
+            if not open_cell(current):
+                return None
+            if current == target:
+                return current
+            if jump_horizontal(current, -1) is not None or jump_horizontal(current, 1) is not None:
+                return current
+
+    # 方向编码：(dx, dy)
+    all_directions = ((1, 0), (-1, 0), (0, 1), (0, -1))
+    came_from = {source: (-1, (0, 0))}
+    cost = {source: 0}
+    heap = [(abs(start[0] - gx) + abs(start[1] - gy), 0, source)]
+    while heap:
+        _, g, current = heapq.heappop(heap)
+        if current == target:
+            break
+        if g > cost[current]:
+            continue
+
+        parent_direction = came_from[current][1]
+        if parent_direction == (0, 0):
+            directions = all_directions
+        elif parent_direction[1] == 0:
+            # 水平到达：继续水平，或转为竖直
+            directions = (parent_direction, (0, 1), (0, -1))
+        else:
+            # 竖直到达：继续竖直，或向两侧水平
+            directions = (parent_direction, (1, 0), (-1, 0))
+
+        for dx, dy in directions:
+            point = jump_horizontal(current, dx) if dy == 0 else jump_vertical(current, dy)
+            if point is None:
+                continue
+            distance = abs(point % width - current % width) + abs(point // width - current // width)
+            new_cost = g + distance
+            if new_cost < cost.get(point, width * height + 1):
+                cost[point] = new_cost
+                came_from[point] = (current, (dx, dy))
+                h = abs(point % width - gx) + abs(point // width - gy)
+                heapq.heappush(heap, (new_cost + h, new_cost, point))
+    else:
+        return None
+
+    # 把跳点之间的直线段展开为逐格路径
+    jump_points = []
+    current = target
+    while current != -1:
+        jump_points.append(current)
+        current = came_from[current][0]
+    jump_points.reverse()
+
+    path = [jump_points[0]]
+    for point in jump_points[1:]:
+        previous = path[-1]
+        step = 1 if point > previous else -1
+        if point // width != previous // width:
+            step *= width
+        while path[-1] != point:
+            path.append(path[-1] + step)
+    return _cells(width, path)
+
+
+ALGORITHMS = {"astar": astar, "jps": jps}
+
+
+class PathCache:
+    """按 (起点, 终点, 地形版本) 缓存路径的 LRU 缓存
+
+    最短路径的后缀仍是最短路径，所以一条路径上的每个格子都登记为同一终点的起点。
+    地形版本在 remove_object_at 等操作改变墙、门的通行性时递增，此时整个缓存失效。
+    """
+
+    def __init__(self, game_map: GameMap, maxsize: int = 65536, algorithm: PathFunc = astar):
+        """为一张地图创建路径缓存"""
+        self.game_map = game_map
+        self.maxsize = maxsize
+        self.algorithm = algorithm
+        self.hits = 0
+        self.misses = 0
+        self._version = game_map.terrain_version
+        self._entries: "OrderedDict[Tuple[Cell, Cell], Tuple[Optional[Tuple[Cell, ...]], int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, start: Cell, goal: Cell) -> Tuple[Optional[Tuple[Cell, ...]], int]:
+        """查找或计算路径，返回 (路径, 起点在路径中的偏移)"""
+        version = self.game_map.terrain_version
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+        key = (start, goal)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        found = self.algorithm(self.game_map, start, goal)
+        if found is None:
+            entry = (None, 0)
+            self._entries[key] = entry
+        else:
+            path = tuple(found)
+            for offset, cell in enumerate(path):
+                self._entries[(cell, goal)] = (path, offset)
+            entry = (path, 0)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return entry
+
+    def get_path(self, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        """获取从起点到终点的路径（包含两端），不可达时返回 None"""
+        path, offset = self._lookup(start, goal)
+        if path is None:
+            return None
+        return list(path[offset:])
+
+    def next_step(self, start: Cell, goal: Cell) -> Optional[Cell]:
+        """获取路径上的下一步，已在终点或不可达时返回 None"""
+        path, offset = self._lookup(start, goal)
+        if path is None or offset + 1 >= len(path):
+            return None
+        return path[offset + 1]
+
+
+class FlowField:
+    """以玩家所在格为源的广度优先距离场，可分多个周期按时间预算增量计算
+
+    一次搜索即可为所有怪物给出下一步：沿距离递减的方向走就是最短路径。
+    """
+
+    def __init__(self, game_map: GameMap, goal: Cell):
+        """从终点开始一个新的距离场"""
+        grid = game_map.grid
+        self.grid = grid
+        self.goal = goal
+        self.version = grid.terrain_version
+        self.distance = array('i', [-1]) * (grid.width * grid.height)
+        goal_index = goal[1] * grid.width + goal[0]
+        self.distance[goal_index] = 0
+        self._frontier = [goal_index]
+        self._depth = 0
+
+    @property
+    def done(self) -> bool:
+        """距离场是否已覆盖全部可达格子"""
+        return not self._frontier
+
+    def advance(self, deadline: float) -> bool:
+        """继续扩展距离场直到完成或超过截止时间，返回是否完成"""
+        grid = self.grid
+        width, size = grid.width, grid.width * grid.height
+        last_x = width - 1
+        tiles, terrain, distance = grid.tiles, grid.terrain_codes, self.distance
+        while self._frontier:
+            if time.perf_counter() > deadline:
+                return False
+            depth = self._depth + 1
+            next_frontier = []
+            for current in self._frontier:
+                x = current % width
+                for neighbor in (current - 1 if x else -1, current + 1 if x != last_x else -1,
+                                 current - width, current + width):
+                    if 0 <= neighbor < size and distance[neighbor] < 0 and terrain[tiles[neighbor]]:
+                        distance[neighbor] = depth
+                        next_frontier.append(neighbor)
+            self._frontier = next_frontier
+            self._depth = depth
+        return True
+
+    def next_step(self, position: Cell) -> Optional[Cell]:
+        """从某个格子出发朝终点走的下一步，尚未覆盖或已在终点时返回 None"""
+        grid = self.grid
+        width = grid.width
+        x, y = position
+        current = y * width + x
+        own = self.distance[current]
+        if own <= 0:
+            return None
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= nx < width and 0 <= ny < grid.height and self.distance[ny * width + nx] == own - 1:
+                return nx, ny
+        return None
+
+
+class TickStats(NamedTuple):
+    """一次调度的统计"""
+    moved: int
+    blocked: int
+    deferred: int
+    elapsed_ms: float
+
+
+class MonsterScheduler:
+    """每个时钟周期让所有怪物沿最短路径向玩家移动一步
+
+    几百个怪物共享同一个终点，所以不为每个怪物单独做 A*，而是维护一个以玩家为源的
+    距离场 (FlowField)：玩家移动或地形版本变化后在后台按预算重新计算，算完之前怪物
+    沿旧的距离场前进。单个周期的耗时受 budget_ms 限制，来不及处理的怪物顺延到下个
+    周期，并从上次中断的位置继续，保证每个怪物都能轮到。
+    """
+
+    # 每个周期中用于扩展距离场的预算比例
+    FIELD_BUDGET_SHARE = 0.5
+
+    def __init__(self, world, budget_ms: float = 2.0):
+        """为世界创建怪物调度器"""
+        self.world = world
+        self.budget_ms = budget_ms
+        self.field: Optional[FlowField] = None
+        self._pending: Optional[FlowField] = None
+        self._cursor = 0
+
+    def _update_field(self, goal: Cell, deadline: float) -> Optional[FlowField]:
+        """在预算内推进距离场的计算，返回本周期使用的距离场"""
+        game_map = self.world.game_map
+        version = game_map.terrain_version
+        current = self.field
+        if current is None or current.goal != goal or current.version != version:
+            pending = self._pending
+            if pending is None or pending.goal != goal or pending.version != version:
+                pending = self._pending = FlowField(game_map, goal)
+            if pending.advance(deadline):
+                self.field = pending
+                self._pending = None
+        # 新距离场没算完时沿用旧的，首次计算时用已覆盖的部分
+        return self.field if self.field is not None else self._pending
+
+    def tick(self) -> TickStats:
+        """执行一个调度周期"""
+        started = time.perf_counter()
+        budget = self.budget_ms / 1000
+        world = self.world
+        if world.game_over:
+            return TickStats(0, 0, 0, 0.0)
+
+        game_map = world.game_map
+        goal = (world.player.position.x, world.player.position.y)
+        if not game_map.grid.in_bounds(*goal):
+            return TickStats(0, 0, 0, 0.0)
+        field = self._update_field(goal, started + budget * self.FIELD_BUDGET_SHARE)
+
+        deadline = started + budget
+        monsters = [obj for obj in game_map.iter_entities() if obj.type == GameObjectType.MONSTER]
+        count = len(monsters)
+        moved = blocked = processed = 0
+
+        for i in range(count):
+            if time.perf_counter() > deadline:
+                break
+            processed += 1
+            monster = monsters[(self._cursor + i) % count]
+            position = (monster.position.x, monster.position.y)
+            if abs(position[0] - goal[0]) + abs(position[1] - goal[1]) <= 1:
+                continue  # 已经贴近玩家
+
+            step = field.next_step(position)
+            if step is None or step == goal or not game_map.is_passable_xy(*step):
+                blocked += 1
+                continue
+            game_map.move_object(monster.position, Position.from_xy(step[0], step[1]))
+            moved += 1
+
+        if count:
+            self._cursor = (self._cursor + processed) % count
+        elapsed = (time.perf_counter() - started) * 1000
+        return TickStats(moved=moved, blocked=blocked, deferred=count - processed, elapsed_ms=elapsed)
@@ -0,0 +1,407 @@
+"""数据驱动的交互规则
+
+规则来自生成的剧本（JSON），每条规则描述与某类对象交互时的条件和效果:
+
+    {"type": "door", "name": "铁门",            # name 可省略，省略时对该类型的所有对象生效
+     "when": {"has_key": true, "gold": {">=": 5}, "has_item": "火把"},
+     "effects": [{"remove_object": true}, {"has_key": false}, {"gold": -5}],
+     "message": "{name} 打开了。", "event": "door_opened"}
+
+type 为 "*" 的规则对所有对象生效。规则集编译为以 (对象类型, 名称) 为键的分发表，
+表项是按优先级排好的规则元组（同名规则、同类型规则、通配规则），交互时一次
+字典查找即可取到候选规则，再按顺序取第一条条件成立的规则执行。
+重新加载规则只替换分发表，共享同一规则集的世界立即生效。
+"""
+
+import json
+import operator
+import os
+import string
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from .enums import GameObjectType
+from .events import Event, EventType
+
+if TYPE_CHECKING:
+    from .types import GameObject, Player, PositionLike
+    from .world import World
+
+WILDCARD = "*"
+
+# 条件中可比较的玩家字段及其类型
+PLAYER_FIELDS = {"gold": int, "has_key": bool, "health": int, "max_health": int}
+
+# 消息模板中可用的占位符
+MESSAGE_FIELDS = frozenset({"name"})
+
+OPERATORS = {
+    "==": operator.eq, "!=": operator.ne,
+    ">=": operator.ge, ">": operator.gt, "<=": operator.le, "<": operator.lt,
+}
+
+Condition = Callable[['Player'], bool]
+Effect = Callable[['World', 'GameObject', 'PositionLike'], None]
+RuleKey = Tuple[Optional[GameObjectType], Optional[str]]
+
+
+class RuleError(ValueError):
+    """规则定义不合法"""
+
+
+# 与原先硬编码的交互一致的默认规则
+DEFAULT_RULES: List[dict] = [
+    {"type": "door", "when": {"has_key": True}, "effects": [{"remove_object": True}, {"has_key": False}],
+     "message": "你用钥匙打开了门。", "event": EventType.DOOR_OPENED},
+    {"type": "door", "message": "门是锁着的。你需要钥匙。", "event": EventType.DOOR_LOCKED},
+    {"type": "key", "effects": [{"has_key": True}, {"remove_object": True}],
+     "message": "你获得了一把钥匙。", "event": EventType.KEY_PICKED},
+    {"type": "treasure", "effects": [{"gold": 10}, {"remove_object": True}],
+     "message": "你获得了10个金币。", "event": EventType.TREASURE_PICKED},
+    {"type": "monster", "effects": [{"game_over": True}],
+     "message": "你被怪物击败了！游戏结束。", "event": EventType.PLAYER_DEFEATED},
+    {"type": "npc", "message": "{name} 说：你好，冒险者！", "event": EventType.NPC_TALKED},
+    {"type": WILDCARD, "message": "无法与 {name} 交互。", "event": EventType.INTERACTION_FAILED},
+]
+
+
+def _operand(field: str, value):
+    """条件的比较值必须与玩家字段同类型（bool 不算整数）"""
+    kind = PLAYER_FIELDS[field]
+    if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+        raise RuleError(f"条件 {field} 的比较值类型不正确: {value!r}")
+    return value
+
+
+def _field_test(field: str, test) -> List[Condition]:
+    getter = operator.attrgetter(field)
+    if not isinstance(test, dict):
+        return [lambda player, value=_operand(field, test): getter(player) == value]
+    checks = []
+    for op, value in test.items():
+        compare = OPERATORS.get(op)
+        if compare is None:
+            raise RuleError(f"未知的比较运算符: {op}")
+        checks.append(lambda player, compare=compare, value=_operand(field, value): compare(getter(player), value))
+    return checks
+
+
+def compile_conditions(spec: Optional[dict]) -> Tuple[Condition, ...]:
+    """把条件字典编译为对玩家状态的检查函数"""
+    checks: List[Condition] = []
+    if not isinstance(spec or {}, dict):
+        raise RuleError("when 必须是对象")
+    for field, test in (spec or {}).items():
+        if field in ("has_item", "lacks_item") and not isinstance(test, str):
+            raise RuleError(f"条件 {field} 的物品名必须是字符串: {test!r}")
+        if field == "has_item":
+            checks.append(lambda player, item=test: item in player.inventory)
+        elif field == "lacks_item":
+            checks.append(lambda player, item=test: item not in player.inventory)
+        elif field in PLAYER_FIELDS:
+            checks.extend(_field_test(field, test))
+        else:
+            raise RuleError(f"未知的条件: {field}")
+    return tuple(checks)
+
+
+def _require(value, kind, name: str):
+    """效果参数的类型检查（bool 不算整数）"""
+    if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+        raise RuleError(f"效果 {name} 的参数类型不正确: {value!r}")
+    return value
+
+
+def _add_gold(amount: int) -> Effect:
+    _require(amount, int, "gold")
+
+    def effect(world, game_object, position):
+        world.player.gold += amount
+    return effect
+
+
+def _add_health(amount: int) -> Effect:
+    _require(amount, int, "health")
+
+    def effect(world, game_object, position):
+        player = world.player
+        player.health = max(0, min(player.max_health, player.health + amount))
+        if player.health == 0:
+            world.game_over = True
+    return effect
+
+
+def _set_key(value: bool) -> Effect:
+    _require(value, bool, "has_key")
+
+    def effect(world, game_object, position):
+        world.player.has_key = value
+    return effect
+
+
+def _give_item(item: str) -> Effect:
+    _require(item, str, "give_item")
+
+    def effect(world, game_object, position):
+        world.player.inventory.append(item)
+    return effect
+
+
+def _take_item(item: str) -> Effect:
+    _require(item, str, "take_item")
+
+    def effect(world, game_object, position):
+        inventory = world.player.inventory
+        if item in inventory:
+            inventory.remove(item)
+    return effect
+
+
+def _remove_object(enabled: bool) -> Optional[Effect]:
+    _require(enabled, bool, "remove_object")
+
+    def effect(world, game_object, position):
+        world.game_map.remove_object_at(position)
+    return effect if enabled else None
+
+
+def _game_over(enabled: bool) -> Optional[Effect]:
+    _require(enabled, bool, "game_over")
+
+    def effect(world, game_object, position):
+        world.game_over = True
+    return effect if enabled else None
+
+
+def _victory(enabled: bool) -> Optional[Effect]:
+    _require(enabled, bool, "victory")
+
+    def effect(world, game_object, position):
+        world._declare_victory()
+    return effect if enabled else None
+
+
+# 效果名 -> 由参数创建效果函数
+EFFECTS: Dict[str, Callable[..., Optional[Effect]]] = {
+    "gold": _add_gold,
+    "health": _add_health,
+    "has_key": _set_key,
+    "give_item": _give_item,
+    "take_item": _take_item,
+    "remove_object": _remove_object,
+    "game_over": _game_over,
+    "victory": _victory,
+}
+
+
+def compile_message(message) -> Tuple[str, bool]:
+    """检查消息模板，返回 (模板, 是否含占位符)；只允许 MESSAGE_FIELDS 中的占位符"""
+    if not isinstance(message, str):
+        raise RuleError(f"message 必须是字符串: {message!r}")
+    try:
+        fields = [field for _, field, _, _ in string.Formatter().parse(message) if field is not None]
+        for field in fields:
+            if field not in MESSAGE_FIELDS:
+                raise RuleError(f"消息中有未知的占位符: {{{field}}}")
+        message.format(**dict.fromkeys(MESSAGE_FIELDS, ""))  # 检查格式说明，如 {name:d}
+    except RuleError:
+        raise
+    except ValueError:
+        raise RuleError(f"消息模板不合法: {message!r}") from None
+    # 转义的 {{ }} 也需要经过 format
+    return message, "{" in message or "}" in message
+
+
+def compile_effects(spec) -> Tuple[Tuple[Effect, ...], Dict[str, int]]:
+    """把效果列表（或字典）编译为效果函数，同时汇总金币、生命值的变化量作为事件数据"""
+    if isinstance(spec, dict):
+        spec = [{name: value} for name, value in spec.items()]
+    elif not isinstance(spec, (list, type(None))):
+        raise RuleError("effects 必须是列表或对象")
+    effects: List[Effect] = []
+    data: Dict[str, int] = {}
+    for item in spec or ():
+        if not isinstance(item, dict):
+            raise RuleError(f"效果必须是对象: {item!r}")
+        for name, value in item.items():
+            factory = EFFECTS.get(name)
+            if factory is None:
+                raise RuleError(f"未知的效果: {name}")
+            effect = factory(value)
+            if effect is not None:
+                effects.append(effect)
+            if name in ("gold", "health"):
+                data[name] = data.get(name, 0) + value
+    return tuple(effects), data
+
+
+class CompiledRule:
+    """编译后的规则"""
+
+    __slots__ = ("conditions", "effects", "message", "templated", "event", "data")
+
+    def __init__(self, spec: dict):
+        self.conditions = compile_conditions(spec.get("when"))
+        self.effects, self.data = compile_effects(spec.get("effects"))
+        self.message, self.templated = compile_message(spec.get("message", ""))
+        self.event = spec.get("event", "interaction")
+        if not isinstance(self.event, str):
+            raise RuleError(f"event 必须是字符串: {self.event!r}")
+
+    def matches(self, player: 'Player') -> bool:
+        for check in self.conditions:
+            if not check(player):
+                return False
+        return True
+
+    def apply(self, world: 'World', game_object: 'GameObject', position: 'PositionLike') -> str:
+        """执行效果并发布事件，返回给玩家的描述"""
+        message = self.message.format(name=game_object.name) if self.templated else self.message
+        for effect in self.effects:
+            effect(world, game_object, position)
+        data = dict(self.data) if self.data else None
+        return world.publish(Event(self.event, message, game_object, position, data)).message
+
+
+def _rule_key(spec: dict) -> RuleKey:
+    obj_type = spec.get("type")
+    if obj_type is None:
+        raise RuleError("规则缺少 type")
+    if obj_type == WILDCARD:
+        return None, None
+    try:
+        obj_type = GameObjectType(obj_type)
+    except ValueError:
+        raise RuleError(f"未知的对象类型: {obj_type}") from None
+    name = spec.get("name")
+    if name is not None and not isinstance(name, str):
+        raise RuleError(f"name 必须是字符串: {name!r}")
+    return obj_type, name
+
+
+class RuleSet:
+    """编译好的交互规则集，可在运行时重新加载"""
+
+    __slots__ = ("table", "wildcard", "specs", "version", "path", "mtime", "with_defaults")
+
+    def __init__(self, rules: Iterable[dict] = DEFAULT_RULES):
+        self.table: Dict[RuleKey, Tuple[CompiledRule, ...]] = {}
+        self.wildcard: Tuple[CompiledRule, ...] = ()
+        self.specs: List[dict] = []
+        self.version = 0
+        self.path: Optional[str] = None
+        self.mtime: Optional[int] = None
+        self.with_defaults = False
+        self.load(rules)
+
+    # 规则集是共享的配置：复制世界时沿用同一规则集，pickle 时按规则定义重新编译
+    def __copy__(self) -> 'RuleSet':
+        return self
+
+    def __deepcopy__(self, memo) -> 'RuleSet':
+        return self
+
+    def __reduce__(self):
+        return RuleSet, (self.specs,)
+
+    def load(self, rules: Iterable[dict]) -> None:
+        """编译规则并替换分发表；规则不合法时抛出 RuleError，原有规则保持不变"""
+        specs = list(rules)
+        by_name: Dict[RuleKey, List[CompiledRule]] = {}
+        by_type: Dict[GameObjectType, List[CompiledRule]] = {}
+        wildcard: List[CompiledRule] = []
+        for index, spec in enumerate(specs):
+            if not isinstance(spec, dict):
+                raise RuleError(f"第 {index + 1} 条规则不是对象")
+            try:
+                key = _rule_key(spec)
+                rule = CompiledRule(spec)
+            except RuleError as e:
+                raise RuleError(f"第 {index + 1} 条规则: {e}") from None
+            if key[0] is None:
+                wildcard.append(rule)
+            elif key[1] is None:
+                by_type.setdefault(key[0], []).append(rule)
+            else:
+                by_name.setdefault(key, []).append(rule)
+
+        # 每个表项预先拼好候选顺序：同名规则、同类型规则、通配规则
+        wildcard_rules = tuple(wildcard)
+        table: Dict[RuleKey, Tuple[CompiledRule, ...]] = {
+            (obj_type, None): tuple(rules) + wildcard_rules for obj_type, rules in by_type.items()}
+        for (obj_type, name), rules in by_name.items():
+            table[(obj_type, name)] = tuple(rules) + tuple(by_type.get(obj_type, ())) + wildcard_rules
+
+        self.table, self.wildcard, self.specs = table, wildcard_rules, specs
+        self.version += 1
+
+    @classmethod
+    def from_script(cls, script: Union[str, bytes, dict, list], with_defaults: bool = True) -> 'RuleSet':
+        """从剧本数据（JSON 文本、含 "rules" 的对象或规则列表）创建规则集
+
+        with_defaults 为真时剧本规则排在默认规则之前，剧本只需描述新增或改变的交互。
+        """
+        rules = cls.parse(script)
+        return cls(rules + DEFAULT_RULES if with_defaults else rules)
+
+    @staticmethod
+    def parse(script: Union[str, bytes, dict, list]) -> List[dict]:
+        """取出剧本中的规则列表"""
+        if isinstance(script, (str, bytes)):
+            try:
+                script = json.loads(script)
+            except json.JSONDecodeError as e:
+                raise RuleError(f"规则不是合法的 JSON: {e}") from None
+        if isinstance(script, dict):
+            script = script.get("rules", [])
+        if not isinstance(script, list):
+            raise RuleError("rules 必须是列表")
+        return script
+
+    @classmethod
+    def from_file(cls, path: Union[str, os.PathLike], with_defaults: bool = True) -> 'RuleSet':
+        """从剧本文件创建规则集，之后可用 reload_if_changed 热重载"""
+        rule_set = cls(())
+        rule_set.path = os.fspath(path)
+        rule_set.with_defaults = with_defaults
+        rule_set._load_file()
+        return rule_set
+
+    def _load_file(self) -> None:
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path, "rb") as f:
+            rules = self.parse(f.read())
+        self.load(rules + DEFAULT_RULES if self.with_defaults else rules)
+        self.mtime = mtime
+
+    def reload_if_changed(self) -> bool:
+        """剧本文件修改过时重新加载，返回是否重新加载；新规则不合法时保留原有规则并抛出 RuleError"""
+        if self.path is None or os.stat(self.path).st_mtime_ns == self.mtime:
+            return False
+        self._load_file()
+        return True
+
+    def candidates(self, game_object: 'GameObject') -> Tuple[CompiledRule, ...]:
+        """对象对应的候选规则（一次到两次字典查找）"""
+        table = self.table
+        rules = table.get((game_object.type, game_object.name))
+        if rules is None:
+            rules = table.get((game_object.type, None), self.wildcard)
+        return rules
+
+    def resolve(self, game_object: 'GameObject', player: 'Player') -> Optional[CompiledRule]:
+        """第一条条件成立的规则，没有时返回 None"""
+        for rule in self.candidates(game_object):
+            if rule.matches(player):
+                return rule
+        return None
+
+    def apply(self, world: 'World', game_object: 'GameObject', position: 'PositionLike') -> str:
+        """按规则处理一次交互"""
+        rule = self.resolve(game_object, world.player)
+        if rule is None:
+            return world.publish(Event(EventType.INTERACTION_FAILED, f"无法与 {game_object.name} 交互。",
+                                       game_object, position)).message
+        return rule.apply(world, game_object, position)
+
+
+# 未指定规则集的世界共享的默认规则
+DEFAULT_RULESET = RuleSet()
@@ -0,0 +1,86 @@
+import os
+from pathlib import Path
+from typing import List, NamedTuple, Union
+from .world import World
+from .snapshot import read_header
+
+# 默认存档槽位名
+DEFAULT_SLOT = "默认"
+
+
+class SaveSlot(NamedTuple):
+    """存档槽位信息（只读取快照头部）"""
+    name: str
+    path: Path
+    size: int
+    modified: float
+    width: int
+    height: int
+    game_over: bool
+    victory: bool
+
+
+class SaveManager:
+    """玩家存档：每个槽位是存档目录下的一个二进制快照文件
+
+    存档包含地图、玩家和自定义规则，不包含调度器中待执行的行动和附加的日志（见 game.snapshot）。
+    """
+
+    EXTENSION = ".sav"
+
+    def __init__(self, directory: Union[str, os.PathLike] = "saves"):
+        """用存档目录初始化，目录在第一次存档时创建"""
+        self.directory = Path(directory)
+
+    def path_for(self, slot: str) -> Path:
+        """槽位对应的文件路径"""
+        if not slot or slot.strip() != slot or any(c in slot for c in '/\\:') or slot.startswith("."):
+            raise ValueError(f"无效的存档名: {slot!r}")
+        return self.directory / f"{slot}{self.EXTENSION}"
+
+    def save(self, world: World, slot: str = DEFAULT_SLOT) -> SaveSlot:
+        """保存世界到槽位，覆盖同名存档"""
+        path = self.path_for(slot)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        world.save(path)
+        return self._describe(slot, path)
+
+    def load(self, slot: str = DEFAULT_SLOT) -> World:
+        """读取槽位中的世界，槽位不存在时抛出 FileNotFoundError"""
+        path = self.path_for(slot)
+        if not path.exists():
+            raise FileNotFoundError(f"存档不存在: {slot}")
+        return World.load(path)
+
+    def exists(self, slot: str) -> bool:
+        """槽位是否已有存档"""
+        return self.path_for(slot).exists()
+
+    def delete(self, slot: str) -> bool:
+        """删除槽位，返回是否确实删除了文件"""
+        path = self.path_for(slot)
+        if not path.exists():
+            return False
+        path.unlink()
+        return True
+
+    def list_slots(self) -> List[SaveSlot]:
+        """按修改时间从新到旧列出所有存档，损坏的文件被跳过"""
+        if not self.directory.is_dir():
+            return []
+        slots = []
+        for path in self.directory.glob(f"*{self.EXTENSION}"):
+            try:
+                slots.append(self._describe(path.stem, path))
+            except (OSError, ValueError):
+                continue
+        slots.sort(key=lambda slot: slot.modified, reverse=True)
+        return slots
+
+    @staticmethod
+    def _describe(slot: str, path: Path) -> SaveSlot:
+        """读取文件状态和快照头部"""
+        stat = path.stat()
+        _version, width, height, game_over, victory = read_header(path)
+        return SaveSlot(name=slot, path=path, size=stat.st_size, modified=stat.st_mtime,
+                        width=width, height=height, game_over=game_over, victory=victory)
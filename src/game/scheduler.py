@@ -0,0 +1,167 @@
+"""按回合推进的实体行动调度器
+
+调度器是一个时间轮：未来 wheel_size 回合内到期的行动按到期回合放进
+对应的槽，每回合只取出当前槽，插入与推进都是 O(1)，与已调度的行动总数无关；
+更远的行动先放在按到期回合排序的堆中，进入时间轮的范围后再移入槽。
+同一回合到期的行动按调度顺序执行。
+
+行动是 action(world) 形式的可调用对象，返回下一次执行前等待的回合数
+（None 表示按 interval 重复，interval 也为 None 时结束；返回 STOP 总是结束）。
+"""
+
+import heapq
+import itertools
+from typing import TYPE_CHECKING, Callable, List, Optional, Sequence, Tuple
+
+from .events import Event, EventType
+from .types import Position
+
+if TYPE_CHECKING:
+    from .types import GameObject, PositionLike
+    from .world import World
+
+Action = Callable[['World'], Optional[int]]
+
+# 行动返回 STOP 表示不再执行（不论是否设置了 interval）
+STOP = -1
+
+
+class ScheduledAction:
+    """已调度的行动，可传给 Scheduler.cancel 取消"""
+
+    __slots__ = ("due", "action", "interval", "cancelled")
+
+    def __init__(self, due: int, action: Action, interval: Optional[int]):
+        self.due = due
+        self.action = action
+        self.interval = interval
+        self.cancelled = False
+
+
+class Scheduler:
+    """时间轮调度器"""
+
+    __slots__ = ("now", "wheel", "mask", "overflow", "live", "_seq")
+
+    def __init__(self, wheel_size: int = 256):
+        """wheel_size 会向上取整为 2 的幂"""
+        size = 1 << max(0, (wheel_size - 1).bit_length())
+        self.now = 0
+        self.wheel: List[List[ScheduledAction]] = [[] for _ in range(size)]
+        self.mask = size - 1
+        # 超出时间轮范围的行动: (到期回合, 序号, 行动)
+        self.overflow: List[Tuple[int, int, ScheduledAction]] = []
+        self.live = 0
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        """尚未取消的行动数"""
+        return self.live
+
+    def schedule(self, delay: int, action: Action, interval: Optional[int] = None) -> ScheduledAction:
+        """delay 回合后执行行动；interval 不为 None 时之后每 interval 回合重复"""
+        if delay < 1:
+            raise ValueError("delay 至少为 1 回合")
+        if interval is not None and interval < 1:
+            raise ValueError("interval 至少为 1 回合")
+        entry = ScheduledAction(self.now + delay, action, interval)
+        self._insert(entry)
+        self.live += 1
+        return entry
+
+    def cancel(self, entry: ScheduledAction) -> None:
+        """取消行动；已放进槽或堆中的条目在到期时被跳过"""
+        if not entry.cancelled:
+            entry.cancelled = True
+            self.live -= 1
+
+    def _insert(self, entry: ScheduledAction) -> None:
+        if entry.due - self.now <= self.mask:
+            self.wheel[entry.due & self.mask].append(entry)
+        else:
+            heapq.heappush(self.overflow, (entry.due, next(self._seq), entry))
+
+    def tick(self, world: 'World') -> int:
+        """推进一个回合并执行到期的行动，返回执行的行动数"""
+        self.now = now = self.now + 1
+        overflow = self.overflow
+        horizon = now + self.mask
+        while overflow and overflow[0][0] <= horizon:
+            self.wheel[overflow[0][0] & self.mask].append(heapq.heappop(overflow)[2])
+
+        slot = self.wheel[now & self.mask]
+        if not slot:
+            return 0
+        self.wheel[now & self.mask] = []
+        executed = 0
+        index = 0
+        try:
+            for index, entry in enumerate(slot):
+                if entry.cancelled:
+                    continue
+                executed += 1
+                delay = entry.action(world)
+                if entry.cancelled:
+                    # 行动在执行中取消了自己
+                    continue
+                if delay is None:
+                    delay = entry.interval
+                if delay is None or delay == STOP:
+                    self.live -= 1
+                    entry.cancelled = True
+                else:
+                    entry.due = now + max(1, delay)
+                    self._insert(entry)
+        except BaseException:
+            self._requeue(slot, index)
+            raise
+        return executed
+
+    def _requeue(self, slot: List[ScheduledAction], failed: int) -> None:
+        """行动抛出异常后：出错的行动按 interval 重复（没有则结束），同槽中尚未执行的行动推迟到下一回合"""
+        entry = slot[failed]
+        if not entry.cancelled:
+            if entry.interval is None:
+                self.live -= 1
+                entry.cancelled = True
+            else:
+                entry.due = self.now + entry.interval
+                self._insert(entry)
+        for entry in slot[failed + 1:]:
+            if not entry.cancelled:
+                entry.due = self.now + 1
+                self._insert(entry)
+
+    def run(self, world: 'World', ticks: int) -> int:
+        """连续推进多个回合，返回执行的行动总数"""
+        return sum(self.tick(world) for _ in range(ticks))
+
+
+def patrol(monster: 'GameObject', waypoints: Sequence['PositionLike'], period: int = 1) -> Action:
+    """怪物沿相邻格子组成的环形路线巡逻，每 period 回合走一步
+
+    下一格被占用时原地等待；走进玩家所在的格子时玩家被击败。
+    """
+    route = [(p.x, p.y) for p in waypoints]
+    step = [route.index((monster.position.x, monster.position.y))]
+
+    def act(world: 'World') -> Optional[int]:
+        if world.game_over:
+            return STOP
+        index = (step[0] + 1) % len(route)
+        x, y = route[index]
+        player = world.player.position
+        if (player.x, player.y) == (x, y):
+            world.game_over = True
+            world.publish(Event(EventType.PLAYER_DEFEATED, "你被怪物击败了！游戏结束。", monster, player))
+            return STOP
+        grid = world.game_map.grid
+        if grid.code_at(x, y) != 0:
+            return period
+        origin = monster.position
+        world.game_map.move_object(origin, Position.from_xy(x, y))
+        step[0] = index
+        world.publish(Event(EventType.ENTITY_MOVED, "", monster, monster.position, {"from": origin}))
+        return period
+
+    return act
@@ -0,0 +1,161 @@
+"""可插拔的 JSON 序列化层
+
+按速度优先选用 orjson、pydantic-core（pydantic 自带的 Rust 序列化器）和标准库
+json，输出统一为紧凑的 UTF-8 字节。模型对象走 pydantic 的原生序列化；
+以 Position / Point 为键的字典（如 Dict[Position, GameObject]）的键统一编码为 "x,y"。
+
+用法: serialization.dumps(data)，或 get_serializer("json") 指定实现。
+"""
+
+import enum
+import json
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional
+from pydantic import BaseModel
+import pydantic_core
+from .types import Point, Position
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+
+def position_key(position) -> str:
+    """位置作为 JSON 对象键时的编码"""
+    return f"{position.x},{position.y}"
+
+
+def _key(key):
+    if isinstance(key, str):
+        return key
+    if isinstance(key, (Position, Point)):
+        return position_key(key)
+    if isinstance(key, enum.Enum):
+        return key.value
+    if isinstance(key, (int, float, bool)) or key is None:
+        return key
+    return str(key)
+
+
+def jsonable(data):
+    """把字典键规范化：位置键编码为 "x,y"；模型对象原样保留，由序列化器处理"""
+    if isinstance(data, dict):
+        return {_key(key): jsonable(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)) and not isinstance(data, Point):
+        return [jsonable(value) for value in data]
+    return data
+
+
+def _model_default(value):
+    """标准库与 orjson 遇到未知类型时的回调"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"无法序列化 {type(value).__name__}")
+
+
+class Serializer(ABC):
+    """序列化器接口"""
+
+    name = "base"
+
+    @abstractmethod
+    def dumps(self, data) -> bytes:
+        """把数据（字典、列表、模型对象等）编码为紧凑 JSON 字节"""
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class StdlibSerializer(Serializer):
+    """标准库 json，总是可用"""
+
+    name = "json"
+
+    def dumps(self, data) -> bytes:
+        if isinstance(data, BaseModel):
+            data = data.model_dump(mode="json")
+        try:
+            text = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_model_default)
+        except TypeError:
+            # 非字符串键（如位置）：规范化后重试
+            text = json.dumps(jsonable(data), ensure_ascii=False, separators=(",", ":"),
+                              default=_model_default)
+        return text.encode("utf-8")
+
+
+class PydanticSerializer(Serializer):
+    """pydantic-core 的 Rust 序列化器"""
+
+    name = "pydantic"
+
+    def dumps(self, data) -> bytes:
+        if isinstance(data, BaseModel):
+            return data.__pydantic_serializer__.to_json(data)
+        # pydantic-core 会把模型键编码为 str(模型)，所以先规范化键
+        return pydantic_core.to_json(jsonable(data))
+
+
+class OrjsonSerializer(Serializer):
+    """orjson，可用时最快"""
+
+    name = "orjson"
+
+    def dumps(self, data) -> bytes:
+        if isinstance(data, BaseModel):
+            return data.__pydantic_serializer__.to_json(data)
+        try:
+            return orjson.dumps(data, default=_model_default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # 以位置为键的对象表：交给 pydantic-core，批量序列化其中的模型比逐个回调快
+            return pydantic_core.to_json(jsonable(data))
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+# 名称 -> 构造函数；按优先级排列
+SERIALIZERS: Dict[str, Callable[[], Serializer]] = {}
+if orjson is not None:
+    SERIALIZERS["orjson"] = OrjsonSerializer
+SERIALIZERS["pydantic"] = PydanticSerializer
+SERIALIZERS["json"] = StdlibSerializer
+
+_instances: Dict[str, Serializer] = {}
+
+
+def register_serializer(name: str, factory: Callable[[], Serializer], preferred: bool = False) -> None:
+    """注册序列化器；preferred 为真时成为默认实现"""
+    if preferred:
+        items = dict(SERIALIZERS)
+        SERIALIZERS.clear()
+        SERIALIZERS[name] = factory
+        SERIALIZERS.update((key, value) for key, value in items.items() if key != name)
+    else:
+        SERIALIZERS[name] = factory
+    _instances.pop(name, None)
+
+
+def get_serializer(name: Optional[str] = None) -> Serializer:
+    """按名称获取序列化器；不指定时返回可用的最快实现"""
+    if name is None:
+        name = next(iter(SERIALIZERS))
+    serializer = _instances.get(name)
+    if serializer is None:
+        try:
+            factory = SERIALIZERS[name]
+        except KeyError:
+            raise ValueError(f"未知的序列化器: {name}") from None
+        serializer = _instances[name] = factory()
+    return serializer
+
+
+def dumps(data, serializer: Optional[str] = None) -> bytes:
+    """用默认（或指定的）序列化器编码为紧凑 JSON 字节"""
+    return get_serializer(serializer).dumps(data)
+
+
+def loads(data, serializer: Optional[str] = None):
+    return get_serializer(serializer).loads(data)
@@ -0,0 +1,216 @@
+"""World 的二进制快照格式
+
+布局（小端序）:
+    头部      魔数 b"AIWS"、格式版本、标志、宽、高、格子编码字节数、game_over、victory
+    原型表    长度前缀的 UTF-8 JSON 列表 [类型, 名称, 符号, 可交互, 可通过]
+    格子数组  长度前缀的 zlib 压缩格子编码
+    对象表    长度前缀的 zlib 压缩 uint32 一维下标（稀疏对象所在的格子）
+    玩家      长度前缀的 UTF-8 JSON（Player.model_dump()）
+    规则      仅当标志含 FLAG_RULES 时存在：长度前缀的 UTF-8 JSON（RuleSet.specs）
+    校验      之前所有字节的 CRC32
+
+稀疏对象的字段完全由其格子原型决定，因此对象表只记录位置，读档时按原型还原。
+使用默认规则的世界不写规则段；自定义规则集按规则定义保存，读档时重新编译，
+但不保留剧本文件路径（读回的规则集不再热重载）。调度器中待执行的行动和
+附加的日志不属于快照，读档后需要重新安排和附加。
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Iterable, List, Sequence, Tuple, Union
+from .types import GameObjectType, Player
+from .tiles import TileProto
+from .tile_grid import TileGrid
+from .game_map import GameMap
+from .world import World
+from .rules import DEFAULT_RULESET, RuleError, RuleSet
+
+MAGIC = b"AIWS"
+SNAPSHOT_VERSION = 1
+
+# 头部标志：快照带有规则段
+FLAG_RULES = 1
+
+_HEADER = struct.Struct("<4sHHIIBBBx")
+_LENGTH = struct.Struct("<I")
+_CRC = struct.Struct("<I")
+
+# 压缩级别：存档以速度优先，格子数组重复度高，低级别已足够
+COMPRESS_LEVEL = 1
+
+
+def _little_endian(data: array) -> bytes:
+    """按小端序导出数组字节"""
+    if sys.byteorder != "little" and data.itemsize > 1:
+        data = array(data.typecode, data)
+        data.byteswap()
+    return data.tobytes()
+
+
+def _from_little_endian(typecode: str, raw: bytes) -> array:
+    """从小端序字节还原数组"""
+    data = array(typecode)
+    data.frombytes(raw)
+    if sys.byteorder != "little" and data.itemsize > 1:
+        data.byteswap()
+    return data
+
+
+def compress_array(data: array) -> bytes:
+    """以小端序 zlib 压缩数组"""
+    return zlib.compress(_little_endian(data), COMPRESS_LEVEL)
+
+
+def decompress_array(typecode: str, raw: bytes) -> array:
+    """解压 compress_array 的结果"""
+    return _from_little_endian(typecode, zlib.decompress(raw))
+
+
+def palette_rows(palette: Sequence[TileProto]) -> List[list]:
+    """原型表转换为可写入 JSON 的行 [类型, 名称, 符号, 可交互, 可通过]"""
+    return [[proto.type.value, proto.name, proto.symbol, proto.interactive, proto.passable]
+            for proto in palette]
+
+
+def palette_from_rows(rows: Iterable[list]) -> List[TileProto]:
+    """由 palette_rows 的结果还原原型表"""
+    return [TileProto(GameObjectType(obj_type), name, symbol, interactive, passable)
+            for obj_type, name, symbol, interactive, passable in rows]
+
+
+def encode_palette(palette: Sequence[TileProto]) -> bytes:
+    """原型表编码为紧凑 JSON"""
+    return json.dumps(palette_rows(palette), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_palette(raw: bytes) -> List[TileProto]:
+    """还原 encode_palette 的结果"""
+    return palette_from_rows(json.loads(bytes(raw)))
+
+
+def entity_indices(grid: TileGrid) -> array:
+    """稀疏对象所在格子的一维下标（升序）"""
+    width = grid.width
+    return array("I", sorted(y * width + x for x, y in grid.entities))
+
+
+def build_map(width: int, height: int, palette: List[TileProto], tiles: array,
+              indices: Iterable[int]) -> GameMap:
+    """由格子编码和稀疏对象下标构建地图，对象按原型还原"""
+    if len(tiles) != width * height:
+        raise ValueError("格子数组长度与地图尺寸不符")
+    entities = {}
+    for index in indices:
+        y, x = divmod(index, width)
+        entities[(x, y)] = palette[tiles[index]].materialize(x, y)
+    return GameMap(width=width, height=height, grid=TileGrid(width, height, tiles, palette, entities))
+
+
+def dumps(world: World) -> bytes:
+    """把世界编码为二进制快照"""
+    grid = world.game_map.grid
+
+    palette = encode_palette(grid.palette)
+    tiles = compress_array(grid.tiles)
+    objects = compress_array(entity_indices(grid))
+    player = json.dumps(world.player.model_dump(), ensure_ascii=False,
+                        separators=(",", ":")).encode("utf-8")
+    sections = [palette, tiles, objects, player]
+    flags = 0
+    if world.rules is not DEFAULT_RULESET:
+        flags |= FLAG_RULES
+        sections.append(json.dumps(world.rules.specs, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    parts = [_HEADER.pack(MAGIC, SNAPSHOT_VERSION, flags, grid.width, grid.height, grid.tiles.itemsize,
+                          world.game_over, world.victory)]
+    for section in sections:
+        parts.append(_LENGTH.pack(len(section)))
+        parts.append(section)
+    data = b"".join(parts)
+    return data + _CRC.pack(zlib.crc32(data))
+
+
+def loads(data: Union[bytes, bytearray, memoryview, mmap.mmap]) -> World:
+    """从二进制快照还原世界；格式不符或数据损坏时抛出 ValueError"""
+    size = len(data)
+    if size < _HEADER.size + _CRC.size:
+        raise ValueError("存档数据不完整")
+
+    # 校验时只借用缓冲区，不保留切片，避免内存映射在关闭时仍被引用
+    end = size - _CRC.size
+    with memoryview(data) as view, view[:end] as body:
+        actual = zlib.crc32(body)
+    (crc,) = _CRC.unpack_from(data, end)
+    if actual != crc:
+        raise ValueError("存档校验失败，数据已损坏")
+
+    magic, version, flags, width, height, itemsize, game_over, victory = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("不是游戏存档文件")
+    if version > SNAPSHOT_VERSION:
+        raise ValueError(f"不支持的存档版本: {version}")
+    if itemsize not in (1, 2):
+        raise ValueError(f"无效的格子编码宽度: {itemsize}")
+
+    sections = []
+    offset = _HEADER.size
+    for _ in range(5 if flags & FLAG_RULES else 4):
+        if offset + _LENGTH.size > end:
+            raise ValueError("存档数据不完整")
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        if offset + length > end:
+            raise ValueError("存档数据不完整")
+        sections.append(data[offset:offset + length])
+        offset += length
+    palette_raw, tiles_raw, objects_raw, player_raw = sections[:4]
+
+    palette = decode_palette(palette_raw)
+    tiles = decompress_array("B" if itemsize == 1 else "H", tiles_raw)
+    game_map = build_map(width, height, palette, tiles, decompress_array("I", objects_raw))
+    player = Player.model_validate_json(bytes(player_raw))
+    world = World(game_map=game_map, player=player, game_over=bool(game_over), victory=bool(victory))
+    if flags & FLAG_RULES:
+        try:
+            world.use_rules(RuleSet(json.loads(bytes(sections[4]))))
+        except (RuleError, ValueError, TypeError) as e:
+            raise ValueError(f"存档中的规则无效: {e}") from None
+    return world
+
+
+def save(world: World, path: Union[str, os.PathLike]) -> int:
+    """写入快照文件（先写临时文件再原子替换），返回写入的字节数"""
+    data = dumps(world)
+    temp_path = f"{os.fspath(path)}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    return len(data)
+
+
+def load(path: Union[str, os.PathLike]) -> World:
+    """用内存映射读取快照文件"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("存档文件为空")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return loads(mapped)
+
+
+def read_header(path: Union[str, os.PathLike]) -> Tuple[int, int, int, bool, bool]:
+    """只读取头部：(格式版本, 宽, 高, game_over, victory)，用于存档列表"""
+    with open(path, "rb") as f:
+        raw = f.read(_HEADER.size)
+    if len(raw) < _HEADER.size:
+        raise ValueError("存档数据不完整")
+    magic, version, _flags, width, height, _itemsize, game_over, victory = _HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError("不是游戏存档文件")
+    return version, width, height, bool(game_over), bool(victory)
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""关卡可解性检查：拿到钥匙、打开门并收集所有宝物，且不触碰怪物
+
+可解性按可达区域判断，状态只包含已移除的钥匙和门；最短通关步数另做精确的
+广度优先搜索。两者共用一个状态预算，超出时可解性或步数记为未知。
+
+运行: python -m game.solver <关卡目录或文件> [--workers N] [--pattern *.txt]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from .enums import GameObjectType
+from .level_parser import LevelParser, ParsedLevel
+
+if TYPE_CHECKING:
+    from .types import Player
+    from .game_map import GameMap
+
+# 与 World.from_text 一致：地图中没有玩家时的默认出生点
+DEFAULT_START = (1, 1)
+
+# 与 World.get_forward_position 一致：玩家总是与右侧的格子交互
+FORWARD_OFFSET = 1
+
+
+# 默认的搜索预算（访问过的状态数），超出时结果为“未知”
+MAX_STATES = 200_000
+
+
+class SolveResult(NamedTuple):
+    """单个关卡的检查结果"""
+    name: str
+    solvable: Optional[bool]  # None 表示超出搜索预算，无法判断
+    path_length: Optional[int] = None  # 最短通关指令数（移动与交互各算一步），超出预算时为 None
+    key_reached: bool = False  # 搜索过程中是否拿到过钥匙
+    door_reached: bool = False  # 搜索过程中是否打开过门
+    treasure_reached: bool = False  # 搜索过程中是否收集过宝物
+    states: int = 0  # 访问过的状态数
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def solve_level(game_map: 'GameMap', player: Optional['Player'] = None, name: str = "",
+                max_states: int = MAX_STATES) -> SolveResult:
+    """先按可达区域判断能否通关，再在预算内搜索最短通关步数
+
+    通关条件为收集地图上的所有宝物；可交互的怪物视为致命，从不与其交互。
+    """
+    started = time.perf_counter()
+    entities = ((obj.position.x, obj.position.y, obj) for obj in game_map.iter_entities())
+    start = (player.position.x, player.position.y) if player is not None else None
+    return _search(game_map.width, game_map.height, game_map.passability_view(), entities, start, name,
+                   started, max_states)
+
+
+def solve_parsed(level: ParsedLevel, name: str = "", max_states: int = MAX_STATES) -> SolveResult:
+    """检查 LevelParser.finish_tiles 的原始解析结果，不创建地图模型"""
+    started = time.perf_counter()
+    codes = bytes(proto.passable for proto in level.palette)
+    if level.tiles.typecode == 'B':
+        passable = bytes(level.tiles).translate(codes.ljust(256, b'\0'))
+    else:
+        passable = bytes(codes[code] for code in level.tiles)
+    entities = ((x, y, proto) for (x, y), proto in level.entities.items())
+    return _search(level.width, level.height, passable, entities, level.player, name, started, max_states)
+
+
+Targets = Dict[int, Tuple[int, GameObjectType]]
+
+
+def _search(width: int, height: int, passable, entities, start: Optional[Tuple[int, int]],
+            name: str, started: float, max_states: int) -> SolveResult:
+    """entities 为 (x, y, 对象或原型)，只用到 type 与 interactive"""
+    # 可交互对象编号为位，被移除后对应格子变为可通行
+    targets: Targets = {}
+    treasure_mask = 0
+    for x, y, entity in entities:
+        if not entity.interactive:
+            continue
+        obj_type = entity.type
+        if obj_type not in (GameObjectType.KEY, GameObjectType.DOOR,
+                            GameObjectType.TREASURE, GameObjectType.MONSTER):
+            continue
+        bit = 1 << len(targets)
+        targets[y * width + x] = (bit, obj_type)
+        if obj_type == GameObjectType.TREASURE:
+            treasure_mask |= bit
+
+    if not treasure_mask:
+        return SolveResult(name=name, solvable=False, seconds=time.perf_counter() - started,
+                           error="地图上没有宝物")
+
+    sx, sy = DEFAULT_START if start is None else start
+    if not (0 <= sx < width and 0 <= sy < height):
+        return SolveResult(name=name, solvable=False, seconds=time.perf_counter() - started,
+                           error="玩家不在地图内")
+
+    start = sy * width + sx
+    solvable, reached, states = _reachable(width, passable, targets, start, max_states)
+    path_length = None
+    if solvable:
+        path_length, extra = _shortest(width, passable, targets, start, treasure_mask, max_states - states)
+        states += extra
+    return SolveResult(
+        name=name, solvable=solvable, path_length=path_length,
+        key_reached=reached[GameObjectType.KEY],
+        door_reached=reached[GameObjectType.DOOR],
+        treasure_reached=reached[GameObjectType.TREASURE],
+        states=states, seconds=time.perf_counter() - started,
+        error=None if solvable is not None else "超出搜索预算"
+    )
+
+
+def _neighbors(width: int, size: int, cell: int) -> Iterator[int]:
+    x = cell % width
+    if x > 0:
+        yield cell - 1
+    if x < width - 1:
+        yield cell + 1
+    if cell >= width:
+        yield cell - width
+    if cell + width < size:
+        yield cell + width
+
+
+def _reachable(width: int, passable, targets: Targets, start: int,
+               max_states: int) -> Tuple[Optional[bool], Dict[GameObjectType, bool], int]:
+    """按可达区域判断能否通关
+
+    移动可逆、移除对象只会打开格子，所以玩家的位置可以用“从起点可达的区域”代替。
+    地图先缩成节点图：每个可通行的连通分量一个节点，每个钥匙、门、宝物一个节点，
+    区域和已移除对象都是节点位掩码。宝物一旦能交互就直接收集（只会打开格子），
+    剩下的选择只有拿哪把钥匙、开哪扇门，状态为 (已移除对象, 是否有钥匙)。
+    四周都已可达、前方没有对象的钥匙拿走后不会打开任何东西，它们可以互换，
+    只展开编号最小的一把，拿着钥匙时也不再去拿。
+    返回 (能否通关，超出预算时为 None, 各类对象是否拿到过, 访问过的状态数)。
+    """
+    size = len(passable)
+    reached = {GameObjectType.KEY: False, GameObjectType.DOOR: False, GameObjectType.TREASURE: False}
+
+    # 连通分量节点，起点即使不可通行（玩家所在格）也单独成为分量
+    component = [-1] * size
+    count = 0
+    for seed in [start] + [cell for cell in range(size) if passable[cell]]:
+        if component[seed] >= 0:
+            continue
+        component[seed] = count
+        stack = [seed]
+        while stack:
+            for cell in _neighbors(width, size, stack.pop()):
+                if passable[cell] and component[cell] < 0:
+                    component[cell] = count
+                    stack.append(cell)
+        count += 1
+
+    # 对象节点（怪物从不交互，与墙一样）
+    types: List[Optional[GameObjectType]] = [None] * count
+    nodes: Dict[int, int] = {}
+    for cell, (_, obj_type) in targets.items():
+        if obj_type != GameObjectType.MONSTER:
+            nodes[cell] = len(types)
+            types.append(obj_type)
+
+    def node_at(cell: int) -> Optional[int]:
+        return component[cell] if component[cell] >= 0 else nodes.get(cell)
+
+    adjacent: List[set] = [set() for _ in types]
+    ahead: List[List[int]] = [[] for _ in types]  # 站在该节点上可以交互的对象节点
+    for cell, node in nodes.items():
+        for other in map(node_at, _neighbors(width, size, cell)):
+            if other is not None:
+                adjacent[node].add(other)
+                adjacent[other].add(node)
+        if cell % width >= FORWARD_OFFSET:
+            left = node_at(cell - FORWARD_OFFSET)
+            if left is not None:
+                ahead[left].append(node)
+
+    treasures = 0
+    for node in nodes.values():
+        if types[node] == GameObjectType.TREASURE:
+            treasures |= 1 << node
+
+    def grow(region: int, removed: int, found: int, seeds: List[int],
+             relaxed: bool = False) -> Tuple[int, int, int, int]:
+        """从新加入区域的节点扩展，返回 (区域, 已移除对象, 可交互的钥匙和门, 新加入的节点数)
+
+        relaxed 为真时钥匙和门也一律直接移除（钥匙不限量），用来快速排除无法通关的关卡。
+        """
+        stack = seeds
+        added = 0
+        while stack:
+            node = stack.pop()
+            added += 1
+            for target in ahead[node]:
+                bit = 1 << target
+                if removed & bit:
+                    continue
+                if relaxed or types[target] == GameObjectType.TREASURE:
+                    removed |= bit
+                    region |= bit
+                    stack.append(target)
+                else:
+                    found |= bit
+            for other in adjacent[node]:
+                bit = 1 << other
+                if not region & bit and (other < count or removed & bit):
+                    region |= bit
+                    stack.append(other)
+        return region, removed, found, added
+
+    def inert(node: int, region: int, removed: int) -> bool:
+        return all(region >> other & 1 for other in adjacent[node] if other < count) and \
+            all(removed >> target & 1 for target in ahead[node])
+
+    origin = component[start]
+    if grow(1 << origin, 0, 0, [origin], relaxed=True)[1] & treasures != treasures:
+        return False, reached, 0
+    region, removed, found, states = grow(1 << origin, 0, 0, [origin])
+    seen = {(0, False)}
+    stack = [(region, removed, found, False)]
+
+    while stack:
+        region, removed, found, has_key = stack.pop()
+        if removed & treasures:
+            reached[GameObjectType.TREASURE] = True
+        if removed & treasures == treasures:
+            return True, reached, states
+        if states > max_states:
+            return None, reached, states
+        states += 1
+
+        # 后入栈的先展开：开门优先
+        choices = []
+        spare = False
+        gates = found & ~removed
+        while gates:
+            bit = gates & -gates
+            gates ^= bit
+            node = bit.bit_length() - 1
+            if types[node] == GameObjectType.DOOR:
+                if has_key:
+                    choices.append(node)
+            elif not inert(node, region, removed):
+                choices.insert(0, node)
+            elif not has_key and not spare:
+                spare = True
+                choices.insert(0, node)
+
+        for node in choices:
+            is_key = types[node] == GameObjectType.KEY
+            child_removed = removed | 1 << node
+            state = (child_removed & ~treasures, is_key)
+            if state in seen:
+                continue
+            seen.add(state)
+            reached[types[node]] = True
+            child = grow(region | 1 << node, child_removed, found, [node])
+            states += child[3]
+            stack.append((child[0], child[1], child[2], is_key))
+
+    return False, reached, states
+
+
+def _shortest(width: int, passable, targets: Targets, start: int, treasure_mask: int,
+              max_states: int) -> Tuple[Optional[int], int]:
+    """在 (位置, 是否有钥匙, 已移除对象) 上做广度优先搜索求最短通关步数
+
+    状态数随对象数量指数增长，超出预算时放弃并返回 (None, 访问过的状态数)。
+    """
+    size = len(passable)
+    # 状态编码为 flags * size + pos，flags = 已移除对象掩码 << 1 | 有钥匙
+    visited = {start}
+    frontier = [(0, start)]
+    states = 1
+    distance = 0
+
+    while frontier:
+        if states > max_states:
+            return None, states
+        distance += 1
+        next_frontier = []
+        for flags, pos in frontier:
+            removed = flags >> 1
+            x = pos % width
+
+            # 移动
+            for step, ok in ((-1, x > 0), (1, x < width - 1), (-width, pos >= width), (width, pos + width < size)):
+                if not ok:
+                    continue
+                cell = pos + step
+                if not passable[cell]:
+                    target = targets.get(cell)
+                    if target is None or not removed & target[0]:
+                        continue
+                state = flags * size + cell
+                if state not in visited:
+                    visited.add(state)
+                    next_frontier.append((flags, cell))
+
+            # 与前方对象交互
+            if x + FORWARD_OFFSET >= width:
+                continue
+            target = targets.get(pos + FORWARD_OFFSET)
+            if target is None or removed & target[0]:
+                continue
+            bit, obj_type = target
+            if obj_type == GameObjectType.KEY:
+                new_flags = (removed | bit) << 1 | 1
+            elif obj_type == GameObjectType.DOOR and flags & 1:
+                new_flags = (removed | bit) << 1
+            elif obj_type == GameObjectType.TREASURE:
+                new_flags = (removed | bit) << 1 | (flags & 1)
+            else:
+                continue
+
+            if (new_flags >> 1) & treasure_mask == treasure_mask:
+                return distance, states
+            state = new_flags * size + pos
+            if state not in visited:
+                visited.add(state)
+                next_frontier.append((new_flags, pos))
+        states += len(next_frontier)
+        frontier = next_frontier
+
+    return None, states
+
+
+def solve_text(map_text: Union[str, Iterable[str]], name: str = "", max_states: int = MAX_STATES) -> SolveResult:
+    """解析关卡文本并检查可解性，耗时包含解析时间
+
+    只做原始解析（LevelParser.finish_tiles），不加载 pydantic 模型，短命的校验进程启动更快。
+    """
+    started = time.perf_counter()
+    if isinstance(map_text, str):
+        map_text = map_text.split('\n')
+    parser = LevelParser()
+    try:
+        parser.feed(map_text)
+        level = parser.finish_tiles()
+    except ValueError as e:
+        return SolveResult(name=name, solvable=False, seconds=time.perf_counter() - started, error=str(e))
+    result = solve_parsed(level, name, max_states)
+    return result._replace(seconds=time.perf_counter() - started)
+
+
+def solve_file(path: Union[str, Path]) -> SolveResult:
+    """以流式方式读取并检查关卡文件"""
+    with open(path, encoding="utf-8") as f:
+        return solve_text(f, name=str(path))
+
+
+def _solve_entry(entry: Union[str, Path, Tuple[str, str]]) -> SolveResult:
+    """进程池任务：路径在子进程中读取，(名称, 文本) 直接解析"""
+    if isinstance(entry, tuple):
+        name, map_text = entry
+        return solve_text(map_text, name)
+    return solve_file(entry)
+
+
+def solve_many(entries: Iterable[Union[str, Path, Tuple[str, str]]],
+               max_workers: Optional[int] = None, chunksize: int = 4) -> Iterator[SolveResult]:
+    """用进程池在所有核心上并行检查关卡，按输入顺序产出结果
+
+    entries 中的元素可以是关卡文件路径，也可以是 (名称, 关卡文本) 元组。
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(_solve_entry, entries, chunksize=chunksize)
+
+
+def solve_directory(directory: Union[str, Path], pattern: str = "*.txt",
+                    max_workers: Optional[int] = None) -> List[SolveResult]:
+    """并行检查目录下所有匹配的关卡文件"""
+    paths = sorted(Path(directory).glob(pattern))
+    return list(solve_many(paths, max_workers=max_workers))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="检查关卡是否可以通关")
+    parser.add_argument("path", help="关卡文件或目录")
+    parser.add_argument("--pattern", default="*.txt", help="目录中关卡文件的匹配模式")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="工作进程数")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if os.path.isdir(args.path):
+        results = solve_directory(args.path, args.pattern, args.workers)
+    else:
+        results = [solve_file(args.path)]
+
+    for result in results:
+        if result.solvable:
+            status = f"可通关，最短 {result.path_length} 步" if result.path_length is not None else "可通关"
+        elif result.solvable is None:
+            status = f"未知 {result.error}"
+        else:
+            status = f"无法通关 {result.error or ''}"
+        print(f"{result.name}: {status} ({result.states} 个状态, {result.seconds * 1000:.1f}ms)")
+
+    solvable = sum(result.solvable is True for result in results)
+    print(f"共 {len(results)} 个关卡，{solvable} 个可通关，总耗时 {time.perf_counter() - started:.2f}s")
+    return 0 if solvable == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
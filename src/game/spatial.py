@@ -0,0 +1,184 @@
+import heapq
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from .enums import GameObjectType
+
+if TYPE_CHECKING:
+    from .types import GameObject
+
+Cell = Tuple[int, int]
+Bucket = Dict[Cell, 'GameObject']
+
+
+class SpatialIndex:
+    """稀疏对象表的空间索引：按对象类型分组的均匀网格桶
+
+    每个类型一张 桶坐标 -> {(x, y): 对象} 的表，另有每个类型的全部对象表。
+    矩形、半径与最近邻查询只访问与查询范围相交的桶。由 TileGrid.set_cell 增量维护。
+    """
+
+    __slots__ = ("shift", "size", "buckets", "by_type")
+
+    def __init__(self, entities: Mapping[Cell, 'GameObject'] = None, bucket_size: int = 8):
+        """bucket_size 会向上取整为 2 的幂"""
+        shift = max(0, (bucket_size - 1).bit_length())
+        self.shift = shift
+        self.size = 1 << shift
+        self.buckets: Dict[GameObjectType, Dict[Cell, Bucket]] = {}
+        self.by_type: Dict[GameObjectType, Dict[Cell, 'GameObject']] = {}
+        if entities:
+            for (x, y), game_object in entities.items():
+                self.add(x, y, game_object)
+
+    def add(self, x: int, y: int, game_object: 'GameObject') -> None:
+        obj_type = game_object.type
+        by_type = self.by_type.get(obj_type)
+        if by_type is None:
+            by_type = self.by_type[obj_type] = {}
+            self.buckets[obj_type] = {}
+        by_type[(x, y)] = game_object
+        buckets = self.buckets[obj_type]
+        key = (x >> self.shift, y >> self.shift)
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = {}
+        bucket[(x, y)] = game_object
+
+    def remove(self, x: int, y: int, game_object: 'GameObject') -> None:
+        obj_type = game_object.type
+        by_type = self.by_type.get(obj_type)
+        if by_type is None or by_type.pop((x, y), None) is None:
+            return
+        buckets = self.buckets[obj_type]
+        key = (x >> self.shift, y >> self.shift)
+        bucket = buckets[key]
+        del bucket[(x, y)]
+        if not bucket:
+            del buckets[key]
+
+    def replace(self, x: int, y: int, old: 'GameObject', new: 'GameObject') -> None:
+        """同一格子上的对象被替换"""
+        if old.type == new.type:
+            # 保持对象在类型表中的顺序，与稀疏对象表一致
+            self.by_type[old.type][(x, y)] = new
+            self.buckets[old.type][(x >> self.shift, y >> self.shift)][(x, y)] = new
+        else:
+            self.remove(x, y, old)
+            self.add(x, y, new)
+
+    def _types(self, obj_type: Optional[GameObjectType]) -> Iterable[GameObjectType]:
+        if obj_type is None:
+            return list(self.by_type)
+        return (obj_type,) if obj_type in self.by_type else ()
+
+    def count(self, obj_type: Optional[GameObjectType] = None) -> int:
+        """对象数量（可按类型）"""
+        return sum(len(self.by_type[t]) for t in self._types(obj_type))
+
+    def of_type(self, obj_type: GameObjectType) -> List['GameObject']:
+        """某类型的全部对象"""
+        return list(self.by_type.get(obj_type, {}).values())
+
+    def in_rect(self, x0: int, y0: int, x1: int, y1: int,
+                obj_type: Optional[GameObjectType] = None) -> List['GameObject']:
+        """[x0, x1) x [y0, y1) 矩形内的对象，按 (y, x) 排序"""
+        if x1 <= x0 or y1 <= y0:
+            return []
+        found = [(oy, ox, obj) for (ox, oy), obj in self._candidates(x0, y0, x1, y1, obj_type)
+                 if x0 <= ox < x1 and y0 <= oy < y1]
+        found.sort(key=lambda item: item[:2])
+        return [item[2] for item in found]
+
+    def in_radius(self, x: int, y: int, radius: float,
+                  obj_type: Optional[GameObjectType] = None) -> List['GameObject']:
+        """到 (x, y) 的欧氏距离不超过 radius 的对象，由近到远排列"""
+        reach = int(radius)
+        limit = radius * radius
+        found = []
+        for (ox, oy), obj in self._candidates(x - reach, y - reach, x + reach + 1, y + reach + 1, obj_type):
+            distance = (ox - x) ** 2 + (oy - y) ** 2
+            if distance <= limit:
+                found.append((distance, oy, ox, obj))
+        found.sort(key=lambda item: item[:3])
+        return [item[3] for item in found]
+
+    def _candidates(self, x0: int, y0: int, x1: int, y1: int,
+                    obj_type: Optional[GameObjectType]) -> Iterator[Tuple[Cell, 'GameObject']]:
+        """与矩形相交的桶中的所有对象（未按矩形过滤）"""
+        shift = self.shift
+        bx0, by0, bx1, by1 = x0 >> shift, y0 >> shift, (x1 - 1) >> shift, (y1 - 1) >> shift
+        span = (bx1 - bx0 + 1) * (by1 - by0 + 1)
+        for t in self._types(obj_type):
+            by_type = self.by_type[t]
+            if span >= len(by_type):
+                yield from by_type.items()
+                continue
+            buckets = self.buckets[t]
+            for by in range(by0, by1 + 1):
+                for bx in range(bx0, bx1 + 1):
+                    bucket = buckets.get((bx, by))
+                    if bucket:
+                        yield from bucket.items()
+
+    def nearest(self, x: int, y: int, obj_type: Optional[GameObjectType] = None, k: int = 1,
+                max_radius: Optional[float] = None) -> List['GameObject']:
+        """离 (x, y) 最近的 k 个对象（欧氏距离，相同距离按 (y, x)），由近到远排列
+
+        从所在的桶开始一圈圈向外搜索，已找到的第 k 近对象比下一圈的最近可能距离
+        更近时停止。
+        """
+        types = self._types(obj_type)
+        total = sum(len(self.by_type[t]) for t in types)
+        if k <= 0 or not total:
+            return []
+        limit = None if max_radius is None else max_radius * max_radius
+
+        if total <= 4 * k:
+            # 对象很少时直接全部比较
+            candidates = ((cell, obj) for t in types for cell, obj in self.by_type[t].items())
+            return self._closest(x, y, candidates, k, limit)
+
+        shift, size = self.shift, self.size
+        cx, cy = x >> shift, y >> shift
+        best: List[Tuple[int, int, int, 'GameObject']] = []
+        seen = 0
+        ring = 0
+        while seen < total:
+            for bx, by in _ring(cx, cy, ring):
+                for t in types:
+                    bucket = self.buckets[t].get((bx, by))
+                    if bucket:
+                        seen += len(bucket)
+                        best.extend(((ox - x) ** 2 + (oy - y) ** 2, oy, ox, obj)
+                                    for (ox, oy), obj in bucket.items())
+            # 下一圈的桶中的对象与查询点的切比雪夫距离至少为 ring * size + 1
+            bound = ring * size + 1
+            if len(best) >= k:
+                best.sort(key=lambda item: item[:3])
+                del best[k:]
+                if best[-1][0] < bound * bound:
+                    break
+            if limit is not None and bound * bound > limit:
+                break
+            ring += 1
+        best.sort(key=lambda item: item[:3])
+        return [item[3] for item in best[:k] if limit is None or item[0] <= limit]
+
+    @staticmethod
+    def _closest(x, y, candidates, k, limit) -> List['GameObject']:
+        scored = ((((ox - x) ** 2 + (oy - y) ** 2), oy, ox, obj) for (ox, oy), obj in candidates)
+        if limit is not None:
+            scored = (item for item in scored if item[0] <= limit)
+        return [item[3] for item in heapq.nsmallest(k, scored, key=lambda item: item[:3])]
+
+
+def _ring(cx: int, cy: int, ring: int) -> Iterator[Cell]:
+    """以 (cx, cy) 为中心、切比雪夫半径为 ring 的一圈桶坐标"""
+    if ring == 0:
+        yield cx, cy
+        return
+    for bx in range(cx - ring, cx + ring + 1):
+        yield bx, cy - ring
+        yield bx, cy + ring
+    for by in range(cy - ring + 1, cy + ring):
+        yield cx - ring, by
+        yield cx + ring, by
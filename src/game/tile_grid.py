@@ -0,0 +1,223 @@
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+from .types import GameObject
+from .tiles import TileProto, EMPTY_TILE
+from .spatial import SpatialIndex
+from .visibility import FovCache
+
+# 邻接掩码中各方向的位
+NEIGHBOR_UP = 1
+NEIGHBOR_DOWN = 2
+NEIGHBOR_LEFT = 4
+NEIGHBOR_RIGHT = 8
+
+
+class TileGrid:
+    """GameMap 的底层存储引擎，全部以整数坐标 (x, y) 或一维下标访问
+
+    格子编码保存在 array 中，编码指向原型表；可交互或可移动的对象另存于稀疏表。
+    通行性位图与可选的四邻接掩码随格子写入增量维护，寻路等热点路径无需创建 Position。
+    """
+
+    __slots__ = (
+        "width", "height", "tiles", "palette", "palette_index", "symbols",
+        "passable_codes", "terrain_codes", "opaque_codes", "entities", "passable", "neighbors",
+        "version", "passability_version", "terrain_version", "opacity_version", "opacity_cell",
+        "row_versions", "row_cache", "cells_cache", "listener", "index", "fov",
+    )
+
+    def __init__(self, width: int, height: int, tiles: Optional[array] = None,
+                 palette: Optional[List[TileProto]] = None,
+                 entities: Optional[Dict[Tuple[int, int], GameObject]] = None):
+        self.width = width
+        self.height = height
+        self.tiles = array('B', bytes(width * height)) if tiles is None else tiles
+        self.palette: List[TileProto] = [EMPTY_TILE] if palette is None else list(palette)
+        self.palette_index = {proto: code for code, proto in enumerate(self.palette)}
+        self.symbols = [proto.symbol for proto in self.palette]
+        self.passable_codes = bytearray(proto.passable for proto in self.palette)
+        self.terrain_codes = bytearray(proto.terrain_passable for proto in self.palette)
+        self.opaque_codes = bytearray(proto.opaque for proto in self.palette)
+        self.entities: Dict[Tuple[int, int], GameObject] = dict(entities) if entities else {}
+        self.version = 0
+        self.passability_version = 0
+        self.terrain_version = 0
+        # 遮挡视线的格子变化时递增，opacity_cell 为最近一次变化的坐标（供视野缓存增量失效）
+        self.opacity_version = 0
+        self.opacity_cell: Optional[Tuple[int, int]] = None
+        self.row_versions = [0] * height
+        self.row_cache: List[Optional[str]] = [None] * height
+        self.cells_cache = None
+        self.neighbors: Optional[array] = None
+        self.passable = self._build_passable()
+        # 格子写入监听器 listener(x, y, 旧编码, 新编码)，供增量日志等记录地图变化
+        self.listener: Optional[Callable[[int, int, int, int], None]] = None
+        # 稀疏对象表的空间索引，首次查询时建立（见 spatial_index）
+        self.index: Optional[SpatialIndex] = None
+        # 视野缓存，首次查询时建立（见 fov_cache）
+        self.fov: Optional[FovCache] = None
+
+    def __getstate__(self):
+        """复制或 pickle 时不带监听器、空间索引和视野缓存（按需重建）"""
+        return {name: getattr(self, name) for name in self.__slots__ if name not in ("listener", "index", "fov")}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.listener = None
+        self.index = None
+        self.fov = None
+
+    def spatial_index(self) -> SpatialIndex:
+        """稀疏对象表的空间索引，首次调用时建立，之后随 set_cell 增量维护"""
+        if self.index is None:
+            self.index = SpatialIndex(self.entities)
+        return self.index
+
+    def fov_cache(self) -> FovCache:
+        """视野缓存，首次调用时建立"""
+        if self.fov is None:
+            self.fov = FovCache(self)
+        return self.fov
+
+    def _build_passable(self) -> bytearray:
+        """由格子编码整体生成通行性位图"""
+        if self.tiles.typecode == 'B':
+            table = bytes(self.passable_codes).ljust(256, b'\0')
+            return bytearray(self.tiles.tobytes().translate(table))
+        passable_codes = self.passable_codes
+        return bytearray(passable_codes[code] for code in self.tiles)
+
+    def intern(self, proto: TileProto) -> int:
+        """获取原型编码，必要时登记新原型"""
+        code = self.palette_index.get(proto)
+        if code is None:
+            code = len(self.palette)
+            if code > 0xFF and self.tiles.typecode == 'B':
+                # 原型数量超过单字节范围时升级为双字节数组
+                self.tiles = array('H', self.tiles)
+            self.palette.append(proto)
+            self.palette_index[proto] = code
+            self.symbols.append(proto.symbol)
+            self.passable_codes.append(proto.passable)
+            self.terrain_codes.append(proto.terrain_passable)
+            self.opaque_codes.append(proto.opaque)
+        return code
+
+    def is_terrain_passable(self, index: int) -> bool:
+        """按一维下标判断地形是否可通过（可移动对象所在格子视为可通过）"""
+        return self.terrain_codes[self.tiles[index]] == 1
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        """坐标是否在地图范围内"""
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_opaque(self, x: int, y: int) -> bool:
+        """坐标是否遮挡视线，地图外视为遮挡"""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return True
+        return self.opaque_codes[self.tiles[y * self.width + x]] == 1
+
+    def code_at(self, x: int, y: int) -> int:
+        """坐标上的格子编码（调用方负责边界检查）"""
+        return self.tiles[y * self.width + x]
+
+    def object_at(self, x: int, y: int) -> Optional[GameObject]:
+        """获取坐标上的对象，静态格子按原型生成对象"""
+        entity = self.entities.get((x, y))
+        if entity is not None:
+            return entity
+        code = self.tiles[y * self.width + x]
+        if code == 0:
+            return None
+        return self.palette[code].materialize(x, y)
+
+    def set_cell(self, x: int, y: int, code: int, entity: Optional[GameObject]) -> None:
+        """写入格子编码，同步稀疏对象表、通行性位图和行缓存"""
+        index = y * self.width + x
+        if self.listener is not None:
+            self.listener(x, y, self.tiles[index], code)
+        if self.terrain_codes[self.tiles[index]] != self.terrain_codes[code]:
+            # 墙、门等地形变化才影响寻路缓存，怪物走动不算
+            self.terrain_version += 1
+        if self.opaque_codes[self.tiles[index]] != self.opaque_codes[code]:
+            self.opacity_version += 1
+            self.opacity_cell = (x, y)
+        self.tiles[index] = code
+        if entity is None:
+            old = self.entities.pop((x, y), None)
+        else:
+            old = self.entities.get((x, y))
+            self.entities[(x, y)] = entity
+        if self.index is not None and old is not entity:
+            if old is None:
+                self.index.add(x, y, entity)
+            elif entity is None:
+                self.index.remove(x, y, old)
+            else:
+                self.index.replace(x, y, old, entity)
+
+        self.version += 1
+        self.row_versions[y] = self.version
+        self.row_cache[y] = None
+        self.cells_cache = None
+
+        passable = self.passable_codes[code]
+        if self.passable[index] != passable:
+            self.passable[index] = passable
+            self.passability_version += 1
+            if self.neighbors is not None:
+                self._update_neighbors(x, y, passable)
+
+    def _update_neighbors(self, x: int, y: int, passable: int) -> None:
+        """格子通行性变化后更新四个邻居指向它的位"""
+        width = self.width
+        index = y * width + x
+        neighbors = self.neighbors
+        for ok, other, bit in ((y > 0, index - width, NEIGHBOR_DOWN),
+                               (y < self.height - 1, index + width, NEIGHBOR_UP),
+                               (x > 0, index - 1, NEIGHBOR_RIGHT),
+                               (x < width - 1, index + 1, NEIGHBOR_LEFT)):
+            if ok:
+                if passable:
+                    neighbors[other] |= bit
+                else:
+                    neighbors[other] &= ~bit
+
+    def build_neighbors(self) -> array:
+        """生成四邻接掩码：每个格子记录哪些相邻格子可通行"""
+        width, height = self.width, self.height
+        passable = self.passable
+        neighbors = array('B', bytes(width * height))
+        for y in range(height):
+            row = y * width
+            for x in range(width):
+                index = row + x
+                mask = 0
+                if y > 0 and passable[index - width]:
+                    mask |= NEIGHBOR_UP
+                if y < height - 1 and passable[index + width]:
+                    mask |= NEIGHBOR_DOWN
+                if x > 0 and passable[index - 1]:
+                    mask |= NEIGHBOR_LEFT
+                if x < width - 1 and passable[index + 1]:
+                    mask |= NEIGHBOR_RIGHT
+                neighbors[index] = mask
+        self.neighbors = neighbors
+        return neighbors
+
+    def row_text(self, y: int) -> str:
+        """获取一行的渲染文本（按行缓存，格子变化时失效）"""
+        text = self.row_cache[y]
+        if text is None:
+            symbols = self.symbols
+            start = y * self.width
+            text = "".join([symbols[code] for code in self.tiles[start:start + self.width]])
+            self.row_cache[y] = text
+        return text
+
+    def region_symbols(self, y: int, x0: int, x1: int) -> List[str]:
+        """获取一行中 [x0, x1) 区间的显示符号"""
+        symbols = self.symbols
+        start = y * self.width
+        return [symbols[code] for code in self.tiles[start + x0:start + x1]]
@@ -0,0 +1,115 @@
+from typing import TYPE_CHECKING, NamedTuple
+from .enums import GameObjectType
+
+if TYPE_CHECKING:
+    from .types import GameObject
+
+
+class TileProto(NamedTuple):
+    """不可变的格子原型，地图数组中的每个编码对应一个原型"""
+    type: GameObjectType
+    name: str
+    symbol: str
+    interactive: bool = False
+    passable: bool = False
+
+    @classmethod
+    def from_object(cls, game_object: 'GameObject') -> 'TileProto':
+        """从游戏对象提取原型"""
+        return cls(
+            type=game_object.type,
+            name=game_object.name,
+            symbol=game_object.symbol,
+            interactive=game_object.interactive,
+            passable=game_object.passable
+        )
+
+    def materialize(self, x: int, y: int) -> 'GameObject':
+        """在指定坐标上生成完整的游戏对象（跳过校验）"""
+        # 延迟导入：只用到原型表的工具（如关卡校验）不必加载 pydantic 模型
+        from .types import GameObject, Position
+        return GameObject._from_trusted({
+            'type': self.type,
+            'name': self.name,
+            'symbol': self.symbol,
+            'position': Position.from_xy(x, y),
+            'interactive': self.interactive,
+            'passable': self.passable,
+        })
+
+    @property
+    def terrain_passable(self) -> bool:
+        """作为地形是否可通过：可移动对象所在的格子视为可通过"""
+        return self.passable or self.type in MOBILE_TYPES
+
+    @property
+    def opaque(self) -> bool:
+        """是否遮挡视线"""
+        return self.type in OPAQUE_TYPES
+
+    @property
+    def is_static(self) -> bool:
+        """是否为只存放在格子数组中的静态格子（无需完整对象）"""
+        return not self.interactive and self.type in STATIC_TILE_TYPES
+
+
+# 只需格子编码即可表示的对象类型，其余对象保存在稀疏对象表中
+STATIC_TILE_TYPES = frozenset({GameObjectType.EMPTY, GameObjectType.WALL})
+
+# 会自行移动的对象类型，寻路时不把它们当作地形障碍
+MOBILE_TYPES = frozenset({GameObjectType.PLAYER, GameObjectType.MONSTER, GameObjectType.NPC})
+
+# 遮挡视线的对象类型：墙和关着的门（打开的门会从地图上移除）
+OPAQUE_TYPES = frozenset({GameObjectType.WALL, GameObjectType.DOOR})
+
+# 编码 0 保留给空格子
+EMPTY_TILE = TileProto(
+    type=GameObjectType.EMPTY,
+    name=GameObjectType.EMPTY.value,
+    symbol=" ",
+    interactive=False,
+    passable=True
+)
+
+
+# 可交互的对象类型
+INTERACTIVE_TYPES = frozenset({
+    GameObjectType.DOOR,
+    GameObjectType.KEY,
+    GameObjectType.TREASURE,
+    GameObjectType.NPC,
+})
+
+
+def legend_proto(obj_type: GameObjectType, symbol: str) -> TileProto:
+    """按关卡文本的默认规则为字符创建原型"""
+    return TileProto(
+        type=obj_type,
+        name=obj_type.value,
+        symbol=symbol,
+        interactive=obj_type in INTERACTIVE_TYPES,
+        passable=obj_type in (GameObjectType.EMPTY, GameObjectType.PLAYER)
+    )
+
+
+# 玩家字符不写入地图，而是单独创建玩家
+PLAYER_SYMBOLS = frozenset({"我", "@"})
+
+# 关卡文本字符到格子原型的共享图例（单字符与中文字符）
+TILE_LEGEND = {
+    symbol: legend_proto(obj_type, symbol)
+    for symbol, obj_type in (
+        ("#", GameObjectType.WALL),
+        ("D", GameObjectType.DOOR),
+        ("K", GameObjectType.KEY),
+        ("M", GameObjectType.MONSTER),
+        ("T", GameObjectType.TREASURE),
+        ("N", GameObjectType.NPC),
+        ("墙", GameObjectType.WALL),
+        ("门", GameObjectType.DOOR),
+        ("钥", GameObjectType.KEY),
+        ("怪", GameObjectType.MONSTER),
+        ("宝", GameObjectType.TREASURE),
+        ("人", GameObjectType.NPC),
+    )
+}
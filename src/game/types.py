@@ -1,38 +1,20 @@
-from enum import Enum
-from typing import Optional, List
-from pydantic import Field
+from typing import Optional, List, NamedTuple, Union
+from pydantic import ConfigDict, Field
 from .base import Text_BaseModel
-
-
-class GameObjectType(str, Enum):
-    """游戏对象类型枚举"""
-    EMPTY = "empty"
-    WALL = "wall"
-    PLAYER = "player"
-    DOOR = "door"
-    KEY = "key"
-    MONSTER = "monster"
-    TREASURE = "treasure"
-    NPC = "npc"
-    ITEM = "item"
-
-
-class Direction(str, Enum):
-    """方向枚举"""
-    UP = "up"
-    DOWN = "down"
-    LEFT = "left"
-    RIGHT = "right"
+from .enums import GameObjectType, Direction
 
 
 class Position(Text_BaseModel):
     """位置坐标"""
+    # 不可变值对象：from_xy 返回的小坐标实例会被共享
+    model_config = ConfigDict(frozen=True)
+
     x: int = Field(description="X坐标")
     y: int = Field(description="Y坐标")
 
     def __add__(self, other: 'Position') -> 'Position':
         """位置相加"""
-        return Position(x=self.x + other.x, y=self.y + other.y)
+        return Position.from_xy(self.x + other.x, self.y + other.y)
 
     def __eq__(self, other: object) -> bool:
         """位置相等比较"""
@@ -44,6 +26,76 @@ class Position(Text_BaseModel):
         """使位置可哈希，用作字典键"""
         return hash((self.x, self.y))
 
+    @classmethod
+    def from_xy(cls, x: int, y: int) -> 'Position':
+        """由整数坐标获取位置，跳过校验；小坐标返回驻留的共享实例"""
+        if cls is Position and 0 <= x < POINT_INTERN_LIMIT and 0 <= y < POINT_INTERN_LIMIT:
+            index = y * POINT_INTERN_LIMIT + x
+            cached = _position_cache[index]
+            if cached is None:
+                cached = _position_cache[index] = _build_position(cls, x, y)
+            return cached
+        return _build_position(cls, x, y)
+
+    @classmethod
+    def from_point(cls, p: 'Point') -> 'Position':
+        """由引擎内部的轻量坐标转换"""
+        return cls.from_xy(p[0], p[1])
+
+    def to_point(self) -> 'Point':
+        """转换为引擎内部的轻量坐标"""
+        return point(self.x, self.y)
+
+
+# 驻留范围：0 <= x, y < POINT_INTERN_LIMIT 的坐标共享同一个实例
+POINT_INTERN_LIMIT = 256
+_position_cache: List[Optional[Position]] = [None] * (POINT_INTERN_LIMIT * POINT_INTERN_LIMIT)
+
+
+def _build_position(cls, x: int, y: int) -> Position:
+    """绕过校验创建位置"""
+    return cls._from_trusted({'x': x, 'y': y})
+
+
+class Point(NamedTuple):
+    """引擎内部使用的轻量坐标：不可变、可哈希，可直接当作 (x, y) 元组使用
+
+    只在序列化等边界处与 Position 互相转换；小坐标由 point() 驻留复用。
+    """
+    x: int
+    y: int
+
+    def __add__(self, other: 'Point') -> 'Point':
+        """坐标相加（而不是元组拼接）"""
+        return point(self[0] + other[0], self[1] + other[1])
+
+    def offset(self, dx: int, dy: int) -> 'Point':
+        """按位移得到新坐标"""
+        return point(self[0] + dx, self[1] + dy)
+
+    def to_position(self) -> Position:
+        """转换为可序列化的 Position"""
+        return Position.from_xy(self[0], self[1])
+
+
+_point_cache: List[Optional[Point]] = [None] * (POINT_INTERN_LIMIT * POINT_INTERN_LIMIT)
+_new_point = tuple.__new__
+
+
+def point(x: int, y: int) -> Point:
+    """获取坐标对应的 Point，小坐标返回驻留的共享实例"""
+    if 0 <= x < POINT_INTERN_LIMIT and 0 <= y < POINT_INTERN_LIMIT:
+        index = y * POINT_INTERN_LIMIT + x
+        cached = _point_cache[index]
+        if cached is None:
+            cached = _point_cache[index] = _new_point(Point, (x, y))
+        return cached
+    return _new_point(Point, (x, y))
+
+
+# 接受 Position 或 Point 的接口只读取 .x/.y
+PositionLike = Union[Position, Point]
+
 
 class GameObject(Text_BaseModel):
     """基础游戏对象类"""
@@ -78,8 +130,8 @@ class Player(Text_BaseModel):
 
     def move(self, dx: int, dy: int, world) -> str:
         """按方向移动玩家"""
-        new_pos = Position(x=self.position.x + dx, y=self.position.y + dy)
-        return world.move_player_to(new_pos)
+        position = self.position
+        return world.move_player_to(point(position.x + dx, position.y + dy))
 
     @classmethod
     def get_example_instance(cls) -> 'Player':
@@ -0,0 +1,144 @@
+"""视野与视线
+
+field_of_view 用递归阴影投射（recursive shadowcasting）计算从某点出发、
+在圆形半径内可见的格子；墙和关着的门遮挡视线，地图外视为遮挡。
+只有被照亮（可见）的格子才会投下阴影，因此一个格子的遮挡状态变化
+只影响能看到它的视野——FovCache 据此在开门后只丢弃看得到那扇门的缓存。
+"""
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, FrozenSet, Iterable, List, Tuple
+
+if TYPE_CHECKING:
+    from .tile_grid import TileGrid
+
+Cell = Tuple[int, int]
+
+# 八个卦限的坐标变换 (xx, xy, yx, yy)
+OCTANTS = (
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+)
+
+
+def field_of_view(grid: 'TileGrid', x: int, y: int, radius: int) -> FrozenSet[Cell]:
+    """从 (x, y) 出发、欧氏距离不超过 radius 的可见格子（含自身和可见的遮挡物）"""
+    visible = {(x, y)}
+    if radius > 0:
+        for xx, xy, yx, yy in OCTANTS:
+            _cast(grid, visible, x, y, 1, 1.0, 0.0, radius, xx, xy, yx, yy)
+    return frozenset(visible)
+
+
+def _cast(grid: 'TileGrid', visible: set, cx: int, cy: int, row: int, start: float, end: float,
+          radius: int, xx: int, xy: int, yx: int, yy: int) -> None:
+    """扫描一个卦限中斜率在 [end, start] 之间的部分，遇到遮挡物时递归扫描其后的缝隙"""
+    width, height = grid.width, grid.height
+    tiles, opaque_codes = grid.tiles, grid.opaque_codes
+    limit = radius * radius
+    new_start = start
+    for j in range(row, radius + 1):
+        dy = -j
+        blocked = False
+        for dx in range(-j, 1):
+            left, right = (dx - 0.5) / (dy + 0.5), (dx + 0.5) / (dy - 0.5)
+            if start < right:
+                continue
+            if end > left:
+                break
+            if dx * dx + dy * dy > limit:
+                # 半径外的格子不可见，也不投下阴影
+                opaque = False
+            else:
+                mx, my = cx + dx * xx + dy * xy, cy + dx * yx + dy * yy
+                if 0 <= mx < width and 0 <= my < height:
+                    visible.add((mx, my))
+                    opaque = opaque_codes[tiles[my * width + mx]] == 1
+                else:
+                    opaque = True
+            if blocked:
+                if opaque:
+                    new_start = right
+                    continue
+                blocked = False
+                start = new_start
+            elif opaque and j < radius:
+                blocked = True
+                _cast(grid, visible, cx, cy, j + 1, start, left, radius, xx, xy, yx, yy)
+                new_start = right
+        if blocked:
+            break
+
+
+def line_of_sight(grid: 'TileGrid', x0: int, y0: int, x1: int, y1: int) -> bool:
+    """两点之间的直线（Bresenham）是否不被遮挡；两端的格子本身不算"""
+    dx, dy = abs(x1 - x0), -abs(y1 - y0)
+    sx, sy = (1 if x0 < x1 else -1), (1 if y0 < y1 else -1)
+    error = dx + dy
+    x, y = x0, y0
+    while True:
+        doubled = 2 * error
+        if doubled >= dy:
+            error += dy
+            x += sx
+        if doubled <= dx:
+            error += dx
+            y += sy
+        if x == x1 and y == y1:
+            return True
+        if grid.is_opaque(x, y):
+            return False
+
+
+class FovCache:
+    """按 (位置, 半径) 缓存的视野，随地图遮挡变化失效
+
+    缓存与 TileGrid.opacity_version 同步。两次查询之间只有一个格子的遮挡
+    状态变化（如开门）时，只丢弃能看到该格子的视野；否则全部丢弃。
+    """
+
+    __slots__ = ("grid", "entries", "version", "max_entries", "hits", "misses")
+
+    def __init__(self, grid: 'TileGrid', max_entries: int = 4096):
+        self.grid = grid
+        self.entries: "OrderedDict[Tuple[int, int, int], FrozenSet[Cell]]" = OrderedDict()
+        self.version = grid.opacity_version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def _sync(self) -> None:
+        grid = self.grid
+        if grid.opacity_version == self.version:
+            return
+        if grid.opacity_version == self.version + 1 and grid.opacity_cell is not None:
+            cell = grid.opacity_cell
+            stale = [key for key, visible in self.entries.items() if cell in visible]
+            for key in stale:
+                del self.entries[key]
+        else:
+            self.entries.clear()
+        self.version = grid.opacity_version
+
+    def get(self, x: int, y: int, radius: int) -> FrozenSet[Cell]:
+        """(x, y) 处半径为 radius 的视野"""
+        self._sync()
+        key = (x, y, radius)
+        visible = self.entries.get(key)
+        if visible is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return visible
+        self.misses += 1
+        visible = self.entries[key] = field_of_view(self.grid, x, y, radius)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return visible
+
+    def get_many(self, origins: Iterable[Cell], radius: int) -> List[FrozenSet[Cell]]:
+        """批量计算多个观察者的视野（如每回合所有怪物）"""
+        self._sync()
+        return [self.get(x, y, radius) for x, y in origins]
+
+    def clear(self) -> None:
+        self.entries.clear()
@@ -1,7 +1,33 @@
+from array import array
+from typing import Container, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
 from pydantic import Field
 from .base import Text_BaseModel
-from .types import GameObject, GameObjectType, Position, Player
+from .types import GameObject, GameObjectType, Position, PositionLike, Player, Point, point
 from .game_map import GameMap
+from .events import Event, EventBus, EventType
+from .scheduler import Scheduler
+from .rules import DEFAULT_RULESET, RuleSet
+
+# 迷雾中未探明格子的显示符号
+FOG_SYMBOL = "░"
+
+# 玩家和怪物的默认视野半径
+SIGHT_RADIUS = 8
+
+# 可能改变胜利条件的事件，只在这些事件发生时重新检查胜利
+VICTORY_EVENTS = frozenset({EventType.TREASURE_PICKED, EventType.GOLD_CHANGED})
+
+
+class FrameCache:
+    """上一帧的行缓冲，用于增量渲染"""
+
+    __slots__ = ("rows", "game_map", "versions", "player")
+
+    def __init__(self):
+        self.rows: Optional[List[str]] = None
+        self.game_map: Optional[GameMap] = None
+        self.versions: List[int] = []
+        self.player: Optional[Tuple[int, int]] = None
 
 
 class World(Text_BaseModel):
@@ -12,9 +38,74 @@ class World(Text_BaseModel):
     game_over: bool = Field(default=False, description="游戏结束状态")
     victory: bool = Field(default=False, description="胜利状态")
 
+    __slots__ = ('_frame', '_journal', '_events', '_scheduler', '_rules')
+    # 事件订阅和调度中的行动引用的是原世界的对象，不随副本传递
+    __transient__ = ('_journal', '_events', '_scheduler')
+
     def __init__(self, game_map: GameMap, player: Player, **data):
         """用地图和玩家初始化世界"""
         super().__init__(game_map=game_map, player=player, **data)
+        object.__setattr__(self, '_frame', FrameCache())
+        object.__setattr__(self, '_journal', None)
+        object.__setattr__(self, '_events', None)
+        object.__setattr__(self, '_scheduler', None)
+        object.__setattr__(self, '_rules', None)
+
+    @property
+    def journal(self):
+        """挂接的增量日志（见 game.journal），未挂接时为 None"""
+        return self._journal
+
+    @property
+    def events(self) -> EventBus:
+        """世界的事件总线，首次访问时创建"""
+        if self._events is None:
+            object.__setattr__(self, '_events', EventBus())
+        return self._events
+
+    @property
+    def scheduler(self) -> Scheduler:
+        """实体行动调度器，首次访问时创建"""
+        if self._scheduler is None:
+            object.__setattr__(self, '_scheduler', Scheduler())
+        return self._scheduler
+
+    @property
+    def rules(self) -> RuleSet:
+        """交互规则集，未指定时使用默认规则"""
+        rules = self._rules
+        return DEFAULT_RULESET if rules is None else rules
+
+    def use_rules(self, rules: Optional[RuleSet]) -> None:
+        """指定交互规则集（如由剧本编译的规则），None 恢复默认规则"""
+        object.__setattr__(self, '_rules', rules)
+
+    def publish(self, event: Event) -> Event:
+        """发布事件；可能影响胜利条件的事件会触发胜利检查"""
+        if self._events is not None:
+            self._events.publish(event)
+        if not self.victory and (event.type in VICTORY_EVENTS
+                                 or (event.data is not None and "gold" in event.data)):
+            self._evaluate_victory()
+        return event
+
+    def tick(self, count: int = 1) -> int:
+        """推进 count 个回合，执行到期的实体行动，返回执行的行动数"""
+        scheduler = self._scheduler
+        if scheduler is None:
+            return 0
+        journal = self._journal
+        executed = 0
+        for _ in range(count):
+            if self.game_over:
+                break
+            if journal is None:
+                executed += scheduler.tick(self)
+            else:
+                # 每个回合作为日志中的一步，行动造成的修改可以撤销，崩溃后也能恢复
+                with journal.step():
+                    executed += scheduler.tick(self)
+        return executed
 
     @classmethod
     def get_example_instance(cls) -> 'World':
@@ -24,42 +115,65 @@ class World(Text_BaseModel):
         return cls(game_map=game_map, player=player)
 
     @classmethod
-    def from_text(cls, map_text: str) -> 'World':
-        """从文本表示创建世界"""
+    def from_text(cls, map_text: Union[str, Iterable[str]]) -> 'World':
+        """从文本表示（字符串、文本行或文件对象）创建世界"""
         game_map, player = GameMap.from_text(map_text)
         if player is None:
             # 如果在地图中没有找到玩家，则创建默认玩家
             player = Player(position=Position(x=1, y=1))
         return cls(game_map=game_map, player=player)
 
-    def move_player_to(self, new_position: Position) -> str:
-        """移动玩家到新位置"""
+    def save(self, path) -> int:
+        """保存为二进制快照文件，返回写入的字节数"""
+        from .snapshot import save
+        return save(self, path)
+
+    @classmethod
+    def load(cls, path) -> 'World':
+        """从二进制快照文件读取世界"""
+        from .snapshot import load
+        return load(path)
+
+    def move_player_to(self, new_position: PositionLike) -> str:
+        """移动玩家到新位置（接受 Position 或引擎内部的 Point）"""
         if self.game_over:
             return "游戏已结束。"
 
         # 检查新位置是否有效
-        if not self.game_map.is_valid_position(new_position):
+        grid = self.game_map.grid
+        x, y = new_position.x, new_position.y
+        if not (0 <= x < grid.width and 0 <= y < grid.height):
             return "无法移动到该位置。"
 
         # 检查位置是否可通过
-        if not self.game_map.is_passable(new_position):
+        if not grid.passable[y * grid.width + x]:
             return "前方有障碍物。"
 
         # 移动玩家 - 仅更新位置，玩家不存储在地图对象中
+        if not isinstance(new_position, Position):
+            new_position = Position.from_xy(x, y)
+        old_position = self.player.position
         self.player.position = new_position
+        if self._journal is not None:
+            self._journal.record_move(old_position, new_position)
         return "移动成功。"
 
+    def forward_point(self) -> Point:
+        """玩家前方的坐标（引擎内部使用，不创建 Position）"""
+        position = self.player.position
+        return point(position.x + 1, position.y)
+
     def get_forward_position(self) -> Position:
         """获取玩家前方的位置（默认假设玩家面向右）"""
         # 为简单起见，假设前方是右方（x+1）
-        return Position(x=self.player.position.x + 1, y=self.player.position.y)
+        return Position.from_xy(self.player.position.x + 1, self.player.position.y)
 
     def interact_forward(self) -> str:
         """与玩家前方的对象交互"""
         if self.game_over:
             return "游戏已结束。"
 
-        forward_pos = self.get_forward_position()
+        forward_pos = self.forward_point()
         game_object = self.game_map.get_object_at(forward_pos)
 
         if game_object is None:
@@ -68,59 +182,125 @@ class World(Text_BaseModel):
         if not game_object.interactive:
             return f"{game_object.name} 无法交互。"
 
-        return self._handle_interaction(game_object, forward_pos)
+        journal = self._journal
+        if journal is None:
+            return self._handle_interaction(game_object, forward_pos)
+        # 交互可能同时修改地图和玩家状态，作为日志中的一步记录
+        with journal.step():
+            return self._handle_interaction(game_object, forward_pos)
 
-    def _handle_interaction(self, game_object: GameObject, position: Position) -> str:
-        """处理与不同对象类型的交互"""
-        if game_object.type == GameObjectType.DOOR:
-            if self.player.has_key:
-                self.game_map.remove_object_at(position)
-                self.player.has_key = False
-                return "你用钥匙打开了门。"
-            else:
-                return "门是锁着的。你需要钥匙。"
+    def _handle_interaction(self, game_object: GameObject, position: PositionLike) -> str:
+        """按交互规则处理，规则执行效果、发布事件并返回给玩家的描述"""
+        return self.rules.apply(self, game_object, position)
 
-        elif game_object.type == GameObjectType.KEY:
-            self.player.has_key = True
-            self.game_map.remove_object_at(position)
-            return "你获得了一把钥匙。"
+    def _render_row(self, y: int) -> str:
+        """渲染一行，并在玩家所在行覆盖玩家符号"""
+        line = self.game_map.get_row_text(y)
+        px, py = self.player.position.x, self.player.position.y
+        if y == py and 0 <= px < len(line):
+            line = line[:px] + "我" + line[px + 1:]  # 玩家符号
+        return line
 
-        elif game_object.type == GameObjectType.TREASURE:
-            self.player.gold += 10
-            self.game_map.remove_object_at(position)
-            return "你获得了10个金币。"
+    def _refresh_frame(self) -> List[int]:
+        """只重新生成变化过的行，返回这些行的行号"""
+        frame = self._frame
+        game_map = self.game_map
+        height = game_map.height
+        row_versions = game_map.grid.row_versions
+        player = (self.player.position.x, self.player.position.y)
 
-        elif game_object.type == GameObjectType.MONSTER:
-            self.game_over = True
-            return "你被怪物击败了！游戏结束。"
+        if frame.rows is None or frame.game_map is not game_map or len(frame.rows) != height:
+            # 首帧或地图被替换时整帧重建
+            frame.player = player
+            frame.rows = [self._render_row(y) for y in range(height)]
+            frame.game_map = game_map
+            frame.versions = list(row_versions)
+            return list(range(height))
 
-        elif game_object.type == GameObjectType.NPC:
-            return f"{game_object.name} 说：你好，冒险者！"
+        versions = frame.versions
+        dirty = {y for y in range(height) if row_versions[y] != versions[y]}
+        if player != frame.player:
+            dirty.add(frame.player[1])
+            dirty.add(player[1])
+            frame.player = player
 
-        else:
-            return f"无法与 {game_object.name} 交互。"
+        changed = []
+        for y in sorted(dirty):
+            if not 0 <= y < height:
+                continue
+            versions[y] = row_versions[y]
+            line = self._render_row(y)
+            if line != frame.rows[y]:
+                frame.rows[y] = line
+                changed.append(y)
+        return changed
 
     def render(self) -> str:
         """将游戏世界渲染为文本"""
-        render_data = self.game_map.get_render_data()
+        self._refresh_frame()
+        return "\n".join(self._frame.rows)
 
-        # 将渲染数据转换为字符串
-        lines = []
-        for row in render_data:
-            line = ""
-            for cell in row:
-                line += cell
-            lines.append(line)
+    def render_diff(self) -> Dict[int, str]:
+        """只返回自上一次渲染以来发生变化的行（行号到行文本）"""
+        changed = self._refresh_frame()
+        rows = self._frame.rows
+        return {y: rows[y] for y in changed}
+
+    def get_viewport(self, width: int, height: int,
+                     center: Optional[Position] = None) -> Tuple[int, int, int, int]:
+        """计算视口在地图上的范围 (x0, y0, x1, y1)，视口在地图边缘处被夹住"""
+        if center is None:
+            center = self.player.position
+
+        def clamp(c: int, size: int, limit: int) -> Tuple[int, int]:
+            size = min(size, limit)
+            start = max(0, min(c - size // 2, limit - size))
+            return start, start + size
+
+        x0, x1 = clamp(center.x, width, self.game_map.width)
+        y0, y1 = clamp(center.y, height, self.game_map.height)
+        return x0, y0, x1, y1
+
+    def visible_cells(self, radius: int = SIGHT_RADIUS) -> FrozenSet[Tuple[int, int]]:
+        """玩家视野内的格子坐标 (x, y)"""
+        return self.game_map.field_of_view(self.player.position, radius)
+
+    def monsters_seeing_player(self, radius: int = SIGHT_RADIUS) -> List[GameObject]:
+        """视野中能看到玩家的怪物，由近到远排列"""
+        game_map = self.game_map
+        position = self.player.position
+        target = (position.x, position.y)
+        return [monster for monster in game_map.objects_in_radius(position, radius, GameObjectType.MONSTER)
+                if target in game_map.field_of_view(monster.position, radius)]
+
+    def render_viewport(self, width: int, height: int, center: Optional[Position] = None,
+                        fog: Optional[Container] = None, fog_symbol: str = FOG_SYMBOL,
+                        sight: Optional[int] = None) -> str:
+        """只渲染视口内的格子，开销与视口大小成正比而与地图大小无关
 
-        # 添加玩家位置（用玩家符号覆盖）
+        fog 为可见性遮罩：可以是与地图同尺寸的字节数组（非零表示可见），
+        也可以是包含可见坐标 (x, y) 的集合；不可见的格子显示为迷雾符号。
+        给出 sight 而不给 fog 时，以玩家在该半径内的视野作为遮罩。
+        """
+        if fog is None and sight is not None:
+            fog = self.visible_cells(sight)
+        x0, y0, x1, y1 = self.get_viewport(width, height, center)
         px, py = self.player.position.x, self.player.position.y
-        if 0 <= py < len(lines) and 0 <= px < len(lines[py]):
-            # 将玩家位置的格子替换为玩家符号
-            row = list(lines[py])
-            row[px] = "我"  # 玩家符号
-            lines[py] = "".join(row)
+        map_width = self.game_map.width
+        mask = isinstance(fog, (bytes, bytearray, memoryview, array))
+
+        lines = []
+        for y in range(y0, y1):
+            cells = self.game_map.get_region_symbols(y, x0, x1)
+            if fog is not None:
+                for x in range(x0, x1):
+                    visible = fog[y * map_width + x] if mask else (x, y) in fog
+                    if not visible:
+                        cells[x - x0] = fog_symbol
+            if y == py and x0 <= px < x1:
+                cells[px - x0] = "我"  # 玩家符号
+            lines.append("".join(cells))
 
-        # 用换行符连接行
         return "\n".join(lines)
 
     def get_status(self) -> str:
@@ -128,21 +308,47 @@ class World(Text_BaseModel):
         return f"金币: {self.player.gold}, 有钥匙: {self.player.has_key}, 生命值: {self.player.health}/{self.player.max_health}"
 
     def check_victory(self) -> bool:
-        """检查玩家是否获胜"""
-        # 简单的胜利条件：收集50个金币
-        if self.player.gold >= 50:
-            self.victory = True
-            self.game_over = True
+        """检查玩家是否获胜
+
+        交互引起的金币变化会通过事件自动触发检查，只有在外部直接修改玩家状态后才需要调用。
+        """
+        if self.victory:
             return True
-        return False
+        if not self._victory_reached():
+            return False
+        journal = self._journal
+        if journal is None:
+            self._declare_victory()
+        else:
+            with journal.step():
+                self._declare_victory()
+        return True
+
+    def _victory_reached(self) -> bool:
+        """胜利条件"""
+        # 简单的胜利条件：收集50个金币
+        return self.player.gold >= 50
+
+    def _evaluate_victory(self) -> None:
+        """事件触发的胜利检查（在交互的日志步骤之内）"""
+        if self._victory_reached():
+            self._declare_victory()
+
+    def _declare_victory(self) -> None:
+        self.victory = True
+        self.game_over = True
+        if self._events is not None:
+            self._events.publish(Event(EventType.VICTORY, "你获得了胜利！"))
 
     def get_game_state(self) -> dict:
         """获取当前游戏状态"""
+        player = self.player
+        position = player.position
         return {
-            "player_position": {"x": self.player.position.x, "y": self.player.position.y},
-            "player_gold": self.player.gold,
-            "player_has_key": self.player.has_key,
-            "player_health": self.player.health,
+            "player_position": {"x": position.x, "y": position.y},
+            "player_gold": player.gold,
+            "player_has_key": player.has_key,
+            "player_health": player.health,
             "game_over": self.game_over,
             "victory": self.victory
         }
\ No newline at end of file
@@ -0,0 +1 @@
+"""多会话游戏服务器"""
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""游戏服务器压测客户端：大量并发会话发送随机指令，统计吞吐量与延迟
+
+每个会话按闭环方式发送指令（收到响应后再发下一条），记录每条指令的往返延迟。
+
+运行: python -m server.loadgen [--sessions 1000] [--commands 50] [--host 127.0.0.1 --port 8765]
+      python -m server.loadgen --spawn   # 在本进程内启动服务器再压测
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from typing import List, NamedTuple, Optional
+from .tcp import GameServer
+
+# 随机指令：移动为主，夹杂交互与状态查询
+COMMAND_MIX = ["上", "下", "左", "右", "右", "左", "互动", "状态"]
+
+
+class LoadResult(NamedTuple):
+    """压测结果"""
+    sessions: int
+    commands: int
+    errors: int
+    seconds: float
+    commands_per_sec: float
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+async def run_client(host: str, port: int, commands: List[str], latencies: List[float]) -> None:
+    """一个会话：读取初始画面后逐条发送指令并等待响应"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        await reader.readline()
+        timer = time.perf_counter
+        for command in commands:
+            start = timer()
+            writer.write(command.encode("utf-8") + b"\n")
+            await writer.drain()
+            if not await reader.readline():
+                raise ConnectionError("服务器关闭了连接")
+            latencies.append(timer() - start)
+        writer.write("退出\n".encode("utf-8"))
+        await writer.drain()
+        await reader.read()
+    finally:
+        writer.close()
+
+
+async def run_load(host: str, port: int, sessions: int = 1000, commands: int = 50,
+                   seed: int = 0, connect_limit: int = 1000) -> LoadResult:
+    """并发运行 sessions 个会话，每个会话发送 commands 条随机指令"""
+    rng = random.Random(seed)
+    scripts = [[rng.choice(COMMAND_MIX) for _ in range(commands)] for _ in range(sessions)]
+    latencies: List[float] = []
+    gate = asyncio.Semaphore(connect_limit)
+
+    async def client(script: List[str]) -> None:
+        # 限制同时在线的会话数，避免连接风暴溢出监听队列
+        async with gate:
+            await run_client(host, port, script, latencies)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client(script) for script in scripts), return_exceptions=True)
+    seconds = time.perf_counter() - start
+    errors = sum(isinstance(result, Exception) for result in results)
+
+    latencies.sort()
+    count = len(latencies)
+
+    def pick(fraction: float) -> float:
+        return latencies[min(count - 1, int(fraction * count))] * 1000 if count else 0.0
+
+    return LoadResult(sessions=sessions, commands=count, errors=errors, seconds=seconds,
+                      commands_per_sec=count / seconds if seconds else 0.0,
+                      p50_ms=pick(0.50), p99_ms=pick(0.99), max_ms=pick(1.0))
+
+
+async def _spawn_and_run(args) -> LoadResult:
+    server = GameServer(host=args.host, port=0, max_sessions=args.sessions + 1)
+    port = await server.start()
+    try:
+        return await run_load(args.host, port, args.sessions, args.commands, args.seed, args.connect_limit)
+    finally:
+        await server.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="游戏服务器压测客户端")
+    parser.add_argument("--host", default="127.0.0.1", help="服务器地址")
+    parser.add_argument("--port", type=int, default=8765, help="服务器端口")
+    parser.add_argument("--sessions", type=int, default=1000, help="并发会话数")
+    parser.add_argument("--commands", type=int, default=50, help="每个会话发送的指令数")
+    parser.add_argument("--connect-limit", type=int, default=1000, help="同时进行中的会话上限")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--spawn", action="store_true", help="在本进程内启动服务器（客户端与服务器共享事件循环）")
+    args = parser.parse_args(argv)
+
+    if args.spawn:
+        result = asyncio.run(_spawn_and_run(args))
+    else:
+        result = asyncio.run(run_load(args.host, args.port, args.sessions, args.commands,
+                                      args.seed, args.connect_limit))
+
+    print(f"{result.sessions} 个会话，{result.commands} 条指令，用时 {result.seconds:.2f}s")
+    print(f"吞吐量 {result.commands_per_sec:,.0f} 条/秒，延迟 p50 {result.p50_ms:.2f}ms，"
+          f"p99 {result.p99_ms:.2f}ms，最大 {result.max_ms:.2f}ms")
+    if result.errors:
+        print(f"{result.errors} 个会话出错")
+    return 1 if result.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
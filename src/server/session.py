@@ -0,0 +1,66 @@
+import itertools
+from typing import Dict, Optional
+from game.batch import COMMAND_CODES, COMMAND_DELTAS, INTERACT, NOOP
+from game.world import World
+
+# 除移动和交互外的指令词，与 src/test.py 的交互指令一致
+STATUS_COMMANDS = frozenset({"状态", "status"})
+LOOK_COMMANDS = frozenset({"看", "look"})
+QUIT_COMMANDS = frozenset({"退出", "q", "quit"})
+
+_session_ids = itertools.count(1)
+
+
+class Session:
+    """一个玩家会话：持有自己的 World，把指令文本解析为引擎调用
+
+    每条指令的响应只带自上次响应以来变化的渲染行（render_diff），
+    客户端据此增量更新画面。
+    """
+
+    def __init__(self, world: World, session_id: Optional[int] = None):
+        """用世界初始化会话"""
+        self.id = next(_session_ids) if session_id is None else session_id
+        self.world = world
+        self.seq = 0
+        self.closed = False
+
+    def hello(self) -> Dict:
+        """连接建立时发送的完整画面"""
+        rows = self.world.render_diff()
+        return {"session": self.id, "seq": self.seq, "rows": rows,
+                "height": self.world.game_map.height, "status": self.world.get_status()}
+
+    def handle(self, command: str) -> Dict:
+        """执行一条指令，返回响应（消息与变化的行）"""
+        self.seq += 1
+        world = self.world
+        command = command.strip()
+        code = COMMAND_CODES.get(command, NOOP)
+        ok = True
+
+        if code == INTERACT:
+            # 胜利由交互事件触发检查，无需每条指令轮询
+            message = world.interact_forward()
+        elif code != NOOP:
+            dx, dy = COMMAND_DELTAS[code]
+            message = world.player.move(dx, dy, world)
+        elif command in STATUS_COMMANDS:
+            message = world.get_status()
+        elif command in LOOK_COMMANDS:
+            # 客户端要求整帧重绘
+            rows = dict(enumerate(world.render().split("\n")))
+            return {"seq": self.seq, "ok": True, "message": "", "rows": rows,
+                    "game_over": world.game_over}
+        elif command in QUIT_COMMANDS:
+            self.closed = True
+            message = "游戏结束。"
+        else:
+            ok = False
+            message = "未知指令。"
+
+        response = {"seq": self.seq, "ok": ok, "message": message, "rows": world.render_diff(),
+                    "game_over": world.game_over}
+        if world.victory:
+            response["victory"] = True
+        return response
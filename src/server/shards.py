@@ -0,0 +1,232 @@
+"""跨进程分片托管会话
+
+每个工作进程持有一部分会话（World），会话按编号固定分配到某个分片，
+从而绕开单进程 GIL 的限制。主进程与工作进程之间通过管道交换 marshal
+编码的紧凑消息；迁移会话时，World 以二进制快照（game.snapshot）的形式
+从原分片导出、在目标分片导入。
+"""
+
+import marshal
+import multiprocessing
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+from game import snapshot
+from game.world import World
+from .session import Session
+from .tcp import DEMO_LEVEL
+
+# 消息类型
+OP_OPEN = 1  # (会话编号, 关卡文本) -> 初始画面
+OP_IMPORT = 2  # (会话编号, 指令序号, 快照) -> 初始画面
+OP_BATCH = 3  # [(会话编号, [指令...]), ...] -> [(会话编号, [响应...]), ...]，出错的会话以错误响应结尾
+OP_EXPORT = 4  # 会话编号 -> (指令序号, 快照)，会话仍留在该分片，导入成功后再关闭
+OP_CLOSE = 5  # 会话编号 -> 是否存在
+OP_STATS = 6  # None -> (会话数, 已处理指令数)
+OP_STOP = 7
+
+
+class ShardError(RuntimeError):
+    """工作进程执行请求失败"""
+
+
+class SessionNotFound(LookupError):
+    """分片上没有该会话"""
+
+    def __str__(self) -> str:
+        return f"会话不存在: {self.args[0]}"
+
+
+def error_response(message: str) -> dict:
+    """批量执行中某个会话出错时的响应，带有 error 字段"""
+    return {"ok": False, "error": message, "message": message}
+
+
+def _session(sessions: Dict[int, Session], session_id: int) -> Session:
+    session = sessions.get(session_id)
+    if session is None:
+        raise SessionNotFound(session_id)
+    return session
+
+
+def _send(conn, op: int, payload) -> None:
+    conn.send_bytes(bytes((op,)) + marshal.dumps(payload))
+
+
+def _worker_main(conn) -> None:
+    """工作进程主循环：按顺序处理主进程发来的请求"""
+    sessions: Dict[int, Session] = {}
+    commands = 0
+    while True:
+        try:
+            message = conn.recv_bytes()
+        except EOFError:
+            return
+        op, payload = message[0], marshal.loads(message[1:])
+        try:
+            if op == OP_BATCH:
+                # 按会话分别报告：一个会话出错不影响同批其它会话，已执行指令的响应也保留
+                replies = []
+                for session_id, lines in payload:
+                    responses = []
+                    try:
+                        session = _session(sessions, session_id)
+                        for line in lines:
+                            responses.append(session.handle(line))
+                            commands += 1
+                    except SessionNotFound as e:
+                        responses.append(error_response(str(e)))
+                    except Exception as e:
+                        responses.append(error_response(f"{type(e).__name__}: {e}"))
+                    else:
+                        if session.closed:
+                            del sessions[session_id]
+                    replies.append((session_id, responses))
+                result = replies
+            elif op == OP_OPEN:
+                session_id, level = payload
+                session = sessions[session_id] = Session(World.from_text(level), session_id)
+                result = session.hello()
+            elif op == OP_IMPORT:
+                session_id, seq, data = payload
+                session = sessions[session_id] = Session(snapshot.loads(data), session_id)
+                session.seq = seq
+                result = session.hello()
+            elif op == OP_EXPORT:
+                session = _session(sessions, payload)
+                result = (session.seq, snapshot.dumps(session.world))
+            elif op == OP_CLOSE:
+                result = sessions.pop(payload, None) is not None
+            elif op == OP_STATS:
+                result = (len(sessions), commands)
+            elif op == OP_STOP:
+                conn.send_bytes(marshal.dumps((True, None)))
+                return
+            else:
+                raise ValueError(f"未知的请求类型: {op}")
+            reply = (True, result)
+        except SessionNotFound as e:
+            reply = (False, str(e))
+        except Exception as e:
+            reply = (False, f"{type(e).__name__}: {e}")
+        conn.send_bytes(marshal.dumps(reply))
+
+
+class ShardPool:
+    """把会话分散到多个工作进程的分片池
+
+    会话默认按 编号 % 分片数 分配，迁移过的会话记录在放置表中。
+    run_batch 先把请求发给所有分片再统一收取响应，各分片并行执行。
+    """
+
+    def __init__(self, workers: Optional[int] = None, context: Optional[str] = None):
+        """启动 workers 个工作进程（默认与 CPU 核心数相同）"""
+        self.workers = workers or os.cpu_count() or 1
+        ctx = multiprocessing.get_context(context)
+        self._conns = []
+        self._processes = []
+        for _ in range(self.workers):
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=_worker_main, args=(child,), daemon=True)
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+        self._placement: Dict[int, int] = {}
+
+    def __enter__(self) -> 'ShardPool':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def shard_for(self, session_id: int) -> int:
+        """会话所在的分片"""
+        shard = self._placement.get(session_id)
+        return session_id % self.workers if shard is None else shard
+
+    def _receive(self, shard: int):
+        ok, result = marshal.loads(self._conns[shard].recv_bytes())
+        if not ok:
+            raise ShardError(f"分片 {shard}: {result}")
+        return result
+
+    def _call(self, shard: int, op: int, payload):
+        _send(self._conns[shard], op, payload)
+        return self._receive(shard)
+
+    def open_session(self, session_id: int, level: str = DEMO_LEVEL) -> dict:
+        """在会话所属分片上创建世界，返回初始画面"""
+        return self._call(self.shard_for(session_id), OP_OPEN, (session_id, level))
+
+    def close_session(self, session_id: int) -> bool:
+        """关闭会话，返回会话是否存在"""
+        existed = self._call(self.shard_for(session_id), OP_CLOSE, session_id)
+        self._placement.pop(session_id, None)
+        return existed
+
+    def execute(self, session_id: int, command: str) -> dict:
+        """执行单条指令；会话不存在或执行出错时抛出 ShardError"""
+        response = self.run_batch({session_id: [command]})[session_id][0]
+        if "error" in response:
+            raise ShardError(f"分片 {self.shard_for(session_id)}: {response['error']}")
+        return response
+
+    def run_batch(self, commands: Dict[int, Sequence[str]]) -> Dict[int, List[dict]]:
+        """执行一批会话的指令；每个分片收到一条消息，所有分片并行处理
+
+        错误按会话报告：会话不存在或执行出错时，该会话的响应列表以带 error 字段的
+        响应结尾（之前已执行的指令的响应保留），同批其它会话照常返回。
+        """
+        per_shard: Dict[int, List[Tuple[int, List[str]]]] = {}
+        for session_id, lines in commands.items():
+            per_shard.setdefault(self.shard_for(session_id), []).append((session_id, list(lines)))
+
+        for shard, batch in per_shard.items():
+            _send(self._conns[shard], OP_BATCH, batch)
+        results: Dict[int, List[dict]] = {}
+        errors = []
+        for shard in per_shard:
+            try:
+                results.update(self._receive(shard))
+            except ShardError as e:
+                # 继续收取其他分片的响应，保持管道同步
+                errors.append(e)
+        if errors:
+            raise errors[0]
+        return results
+
+    def migrate(self, session_id: int, target: int) -> int:
+        """把会话迁移到目标分片，返回传输的快照字节数"""
+        if not 0 <= target < self.workers:
+            raise ValueError(f"无效的分片编号: {target}")
+        source = self.shard_for(session_id)
+        if source == target:
+            return 0
+        # 导入成功后才从原分片关闭，导入失败时会话仍在原分片上
+        seq, data = self._call(source, OP_EXPORT, session_id)
+        self._call(target, OP_IMPORT, (session_id, seq, data))
+        self._call(source, OP_CLOSE, session_id)
+        if target == session_id % self.workers:
+            self._placement.pop(session_id, None)
+        else:
+            self._placement[session_id] = target
+        return len(data)
+
+    def stats(self) -> List[Tuple[int, int]]:
+        """各分片的 (会话数, 已处理指令数)"""
+        for conn in self._conns:
+            _send(conn, OP_STATS, None)
+        return [tuple(self._receive(shard)) for shard in range(self.workers)]
+
+    def close(self) -> None:
+        """停止所有工作进程"""
+        for shard, conn in enumerate(self._conns):
+            try:
+                self._call(shard, OP_STOP, None)
+            except (EOFError, OSError):
+                pass
+            conn.close()
+        for process in self._processes:
+            process.join(timeout=5)
+        self._conns = []
+        self._processes = []
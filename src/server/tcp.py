@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""基于 asyncio 的多会话 TCP 游戏服务器
+
+协议: 客户端每行发送一条 UTF-8 指令（与 src/test.py 相同的指令词），服务器
+对每条指令回复一行 JSON。连接建立后服务器先发送完整画面，之后的响应只带
+变化的行。每个会话有一个有界指令队列：队列满时服务器暂停读取该连接，
+由 TCP 流量控制把压力反馈给客户端。
+
+运行: python -m server.tcp [--host 127.0.0.1] [--port 8765] [--level 关卡文件 | --pack 关卡包]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+from typing import Callable, Dict, List, Optional
+from game import serialization
+from game.world import World
+from .session import Session
+
+# 默认关卡，与 src/test.py 的演示地图相同
+DEMO_LEVEL = """
+墙墙墙墙墙墙墙
+墙 我 钥 怪 门
+墙 宝   人 墙
+墙墙墙墙墙墙墙
+"""
+
+# 单行指令的最大字节数，超出时断开连接
+MAX_LINE = 1024
+
+
+def encode(message: Dict) -> bytes:
+    """编码一行 JSON 响应（使用可用的最快序列化器）"""
+    return serialization.dumps(message) + b"\n"
+
+
+class ServerStats:
+    """服务器运行统计"""
+
+    __slots__ = ("commands", "sessions_total", "rejected")
+
+    def __init__(self):
+        self.commands = 0
+        self.sessions_total = 0
+        self.rejected = 0
+
+
+class GameServer:
+    """同时托管大量 World 会话的 asyncio 服务器"""
+
+    def __init__(self, world_factory: Optional[Callable[[], World]] = None,
+                 host: str = "127.0.0.1", port: int = 8765,
+                 queue_size: int = 32, max_sessions: int = 10000):
+        """world_factory 为每个新会话创建世界，默认使用演示关卡"""
+        self.world_factory = world_factory or (lambda: World.from_text(DEMO_LEVEL))
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.max_sessions = max_sessions
+        self.sessions: Dict[int, Session] = {}
+        self.stats = ServerStats()
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self) -> int:
+        """开始监听，返回实际端口（port 为 0 时由系统分配）"""
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port,
+                                                  limit=MAX_LINE, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """停止监听并等待监听套接字关闭"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """连接处理：读取指令放入会话队列，由会话任务依次执行"""
+        if len(self.sessions) >= self.max_sessions:
+            self.stats.rejected += 1
+            writer.write(encode({"ok": False, "message": "服务器已满。"}))
+            await self._close_writer(writer)
+            return
+
+        session = worker = None
+        try:
+            try:
+                session = Session(self.world_factory())
+            except Exception as e:
+                # 创建世界失败（如关卡包损坏）：回复错误后关闭连接
+                writer.write(encode({"ok": False, "message": f"服务器内部错误: {type(e).__name__}"}))
+                return
+            self.sessions[session.id] = session
+            self.stats.sessions_total += 1
+            queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+            worker = asyncio.create_task(self._run_session(session, queue, writer))
+            writer.write(encode(session.hello()))
+            while not worker.done():
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    # 行过长或连接被重置
+                    break
+                if not line:
+                    break
+                if not await self._enqueue(queue, line.decode("utf-8", "replace"), worker):
+                    break
+        finally:
+            if worker is not None:
+                if not worker.done():
+                    await self._enqueue(queue, None, worker)
+                await asyncio.gather(worker, return_exceptions=True)
+            if session is not None:
+                self.sessions.pop(session.id, None)
+            await self._close_writer(writer)
+
+    @staticmethod
+    async def _enqueue(queue: asyncio.Queue, command: str, worker: asyncio.Task) -> bool:
+        """把指令放入队列；队列满时同时等待会话任务，任务已结束时返回 False 而不是永远等待"""
+        if not queue.full():
+            queue.put_nowait(command)
+            return True
+        put = asyncio.ensure_future(queue.put(command))
+        await asyncio.wait((put, worker), return_when=asyncio.FIRST_COMPLETED)
+        if put.done():
+            return True
+        put.cancel()
+        return False
+
+    async def _run_session(self, session: Session, queue: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        """按顺序执行会话队列中的指令并写回响应"""
+        stats = self.stats
+        while True:
+            command = await queue.get()
+            if command is None:
+                return
+            try:
+                response = session.handle(command)
+            except Exception as e:
+                # 单条指令出错只回复错误，会话继续处理队列
+                response = {"seq": session.seq, "ok": False, "message": f"服务器内部错误: {type(e).__name__}"}
+            writer.write(encode(response))
+            stats.commands += 1
+            if session.closed:
+                # 退出指令：关闭连接，读取循环随之结束
+                writer.close()
+                return
+            await writer.drain()
+
+    @staticmethod
+    async def _close_writer(writer: asyncio.StreamWriter) -> None:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def make_world_factory(level: Optional[str] = None, pack: Optional[str] = None) -> Callable[[], World]:
+    """按命令行参数创建世界工厂：固定关卡文件，或从关卡包中随机选关"""
+    if pack is not None:
+        from game.level_pack import LevelPack
+        level_pack = LevelPack(pack)
+        return lambda: level_pack.load(random.randrange(len(level_pack)))
+    if level is not None:
+        with open(level, encoding="utf-8") as f:
+            text = f.read()
+        return lambda: World.from_text(text)
+    return lambda: World.from_text(DEMO_LEVEL)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="多会话文字冒险游戏服务器")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--level", help="每个会话使用的关卡文件")
+    parser.add_argument("--pack", help="从关卡包中为每个会话随机选关")
+    parser.add_argument("--queue-size", type=int, default=32, help="每个会话的指令队列长度")
+    parser.add_argument("--max-sessions", type=int, default=10000, help="最大同时会话数")
+    args = parser.parse_args(argv)
+
+    server = GameServer(make_world_factory(args.level, args.pack), args.host, args.port,
+                        args.queue_size, args.max_sessions)
+
+    async def run():
+        port = await server.start()
+        print(f"服务器已启动: {args.host}:{port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print(f"\n服务器已停止，共处理 {server.stats.commands} 条指令")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 from game.world import World
+from game.saves import SaveManager, DEFAULT_SLOT
 
 
 map_text = """
@@ -10,9 +11,10 @@ map_text = """
 
 world = World.from_text(map_text)
 player = world.player
+saves = SaveManager()
 
 print("=== 欢迎来到 AI 文字冒险 Demo ===")
-print("指令：上 下 左 右 看 互助 状态 退出\n")
+print("指令：上 下 左 右 看 互助 状态 存档 读档 退出\n")
 print(world.render())
 
 while True:
@@ -34,5 +36,19 @@ while True:
         print(world.interact_forward())
     elif cmd == "状态":
         print(f"金币: {player.gold}, 有钥匙: {player.has_key}")
+    elif cmd.partition(" ")[0] in ("存档", "读档"):
+        action, _, slot = cmd.partition(" ")
+        slot = slot.strip() or DEFAULT_SLOT
+        try:
+            if action == "存档":
+                info = saves.save(world, slot)
+                print(f"已存档到「{slot}」（{info.size} 字节）。")
+            else:
+                world = saves.load(slot)
+                player = world.player
+                print(f"已读取存档「{slot}」。")
+                print(world.render())
+        except (OSError, ValueError) as e:
+            print(f"操作失败：{e}")
     else:
         print("未知指令。")
\ No newline at end of file
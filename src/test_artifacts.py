@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""测试 schema / 示例 / 提示词素材的缓存与紧凑 JSON"""
+
+import json
+
+from agent.prompts import build_prompt, schema_version
+from game.base import clear_artifacts, warm_artifacts
+from game.types import Player
+from game.world import World
+
+
+def test_artifacts():
+    """素材只计算一次，模型重建后失效；紧凑 JSON 与缩进 JSON 内容相同"""
+    print("=== 测试提示词素材缓存 ===\n")
+
+    print("1. 缓存命中:")
+    clear_artifacts()
+    warm_artifacts((World, Player))
+    schema = World.get_schema_json()
+    assert World.get_schema_json() is schema
+    assert World.get_example_json(None) is World.get_example_json(None)
+    assert json.loads(schema) == World.model_json_schema()
+    version = World.schema_version()
+    assert schema_version() == version and Player.schema_version() != version
+
+    print("2. 模型重建后失效:")
+    World.model_rebuild(force=True)
+    assert World.get_schema_json() is not schema and World.get_schema_json() == schema
+    assert World.schema_version() == version
+
+    print("3. 紧凑 JSON:")
+    world = World.get_example_instance()
+    pretty, compact = world.model_dump_json(), world.model_dump_json(None)
+    print(f"   缩进 {len(pretty.encode('utf-8'))} 字节，紧凑 {len(compact.encode('utf-8'))} 字节")
+    assert json.loads(pretty) == json.loads(compact) and "\n" not in compact
+    assert len(compact) < len(pretty) * 0.6
+
+    print("4. 提示词:")
+    prompt = build_prompt("雪山")
+    assert "主题: 雪山" in prompt and World.get_schema_json(None) in prompt
+    assert build_prompt("雪山") == prompt
+
+    print("\n=== 提示词素材缓存测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_artifacts()
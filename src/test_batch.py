@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""测试批量模拟"""
+
+from game.batch import run_batch, run_scalar, encode_commands, INTERACT, UP
+from game.world import World
+
+map_text = """
+墙墙墙墙墙墙墙
+墙 我 钥 怪 门
+墙 宝   人 墙
+墙墙墙墙墙墙墙
+"""
+
+scripts = [
+    ["右", "互动", "右", "右", "右", "互动", "右"],
+    ["左", "下", "互动", "上", "右"],
+    ["上", "上", "左"],
+    [],
+]
+
+
+def test_batch():
+    """批量结果应与逐个世界执行的结果一致"""
+    print("=== 测试批量模拟 ===\n")
+
+    print("1. 指令编码:")
+    assert encode_commands(["上", "互动", "未知", INTERACT]) == [UP, INTERACT, 0, INTERACT]
+
+    print("2. 批量与标量结果一致:")
+    scalar = run_scalar([World.from_text(map_text) for _ in scripts], scripts)
+    worlds = [World.from_text(map_text) for _ in scripts]
+    batch = run_batch(worlds, scripts)
+    for result in batch:
+        print(f"   {result.steps} 步: {result.state}")
+    assert batch == scalar
+    assert batch[0].state["player_has_key"] is True
+    assert batch[3].steps == 0
+
+    print("3. 结果写回世界:")
+    assert worlds[0].player.position.x == batch[0].state["player_position"]["x"]
+
+    print("\n=== 批量模拟测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_batch()
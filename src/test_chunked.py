@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""测试区块化的无限地图：跨区块访问、换出后写回与内存上限"""
+
+import random
+import tempfile
+
+from game.chunked import ENTITY_BYTES, ChunkedMap, ChunkStore, DirectoryChunkStore, decode_chunk, encode_chunk
+from game.level_parser import LevelParser
+from game.types import GameObject, GameObjectType, Position, point
+
+
+def generate(cx: int, cy: int, size: int):
+    """每个区块的左上角是墙，按区块坐标确定地放一些宝物；"." 是图例外的字符，解析为空格子"""
+    rng = random.Random(cx * 100003 + cy)
+    rows = []
+    for y in range(size):
+        row = ["#" if x == 0 and y == 0 else "." for x in range(size)]
+        if y == size // 2:
+            row[rng.randrange(1, size)] = "T"
+        rows.append("".join(row))
+    parser = LevelParser()
+    parser.feed(rows)
+    return parser.finish_tiles()
+
+
+class MemoryChunkStore(ChunkStore):
+    """保存在字典里的仓库"""
+
+    def __init__(self):
+        self.chunks = {}
+        self.closed = False
+
+    def load(self, key):
+        return self.chunks.get(key)
+
+    def save(self, key, data):
+        self.chunks[key] = data
+
+    def close(self):
+        self.closed = True
+
+
+def test_chunked():
+    """跨区块访问透明，修改在换出后保留，走得再远内存也有上限"""
+    print("=== 测试区块化地图 ===\n")
+
+    print("1. 跨区块访问:")
+    with ChunkedMap(chunk_size=8, generator=generate) as world_map:
+        wall = world_map.get_object_at(point(-8, 16))
+        assert wall.type == GameObjectType.WALL and wall.position == Position(x=-8, y=16)
+        assert not world_map.is_passable(point(-8, 16)) and world_map.is_passable_xy(-7, 16)
+        assert world_map.is_valid_position(point(-10 ** 9, 10 ** 9))
+        treasure = next(obj for x in range(8) if (obj := world_map.get_object_at(point(x, 4))))
+        assert treasure.type == GameObjectType.TREASURE and treasure.position.y == 4
+        text = world_map.render_region(-2, 0, 10, 1)
+        assert text == "  #       # ", repr(text)
+        print(f"   跨三个区块的一行: {text!r}")
+
+        print("\n2. 跨区块移动:")
+        monster = GameObject(type=GameObjectType.MONSTER, name="怪物", symbol="M",
+                             position=Position(x=7, y=3))
+        assert world_map.add_object(monster)
+        assert world_map.move_object(point(7, 3), point(8, 3))
+        assert world_map.get_object_at(point(7, 3)) is None
+        assert world_map.get_object_at(point(8, 3)) is monster and monster.position == Position(x=8, y=3)
+        assert world_map.render_region(6, 3, 10, 4) == "  M "
+        assert world_map.render_viewport(point(8, 3), 3, 1) == " 我 "
+
+    print("\n3. 换出后写回并重新载入:")
+    with tempfile.TemporaryDirectory() as directory:
+        budget = 4 * (16 * 16 * 2 + ENTITY_BYTES)
+        world_map = ChunkedMap(chunk_size=16, memory_budget=budget,
+                               store=DirectoryChunkStore(directory), generator=generate)
+        world_map.remove_object_at(point(0, 0))
+        door = GameObject(type=GameObjectType.DOOR, name="门", symbol="D",
+                          position=Position(x=3, y=2), interactive=True)
+        world_map.add_object(door)
+
+        peak = 0
+        x = 0
+        for step in range(2000):
+            x += 1
+            world_map.is_passable_xy(x, step % 40)
+            peak = max(peak, world_map.resident_chunks)
+        assert world_map.stats.evicted > 100
+        assert 2 < peak <= 4 and world_map.memory_usage() <= budget
+        print(f"   走了 2000 格，常驻区块最多 {peak} 个，换出 {world_map.stats.evicted} 个")
+
+        assert world_map.get_object_at(point(0, 0)) is None
+        reloaded = world_map.get_object_at(point(3, 2))
+        assert reloaded.type == GameObjectType.DOOR and reloaded.position == Position(x=3, y=2)
+        world_map.close()
+
+        reopened = ChunkedMap(chunk_size=16, store=DirectoryChunkStore(directory), generator=generate)
+        assert reopened.get_object_at(point(0, 0)) is None
+        assert reopened.get_object_at(point(3, 2)).type == GameObjectType.DOOR
+        assert reopened.stats.loaded == 1 and reopened.stats.generated == 0
+        reopened.close()
+
+    print("\n4. 区块编码:")
+    with ChunkedMap(chunk_size=8, generator=generate) as world_map:
+        grid = world_map.chunk((2, -1))
+    clone = decode_chunk(encode_chunk(grid), 8, (16, -8))
+    assert clone.tiles == grid.tiles and clone.palette == grid.palette
+    assert [obj.position for obj in clone.entities.values()] == [obj.position for obj in grid.entities.values()]
+    try:
+        decode_chunk(encode_chunk(grid)[:-1] + b"\0", 8, (16, -8))
+        raise AssertionError("损坏的区块应当被拒绝")
+    except ValueError:
+        pass
+
+    print("\n5. 自定义仓库:")
+    store = MemoryChunkStore()
+    budget = 3 * (8 * 8 * 2 + ENTITY_BYTES)
+    with ChunkedMap(chunk_size=8, memory_budget=budget, store=store, generator=generate) as world_map:
+        world_map.remove_object_at(point(0, 0))
+        for x in range(200):
+            world_map.is_passable_xy(x, 0)
+        assert world_map.stats.evicted > 10 and (0, 0) in store.chunks
+        assert world_map.get_object_at(point(0, 0)) is None, "换出的修改从自定义仓库读回"
+        assert world_map.stats.loaded >= 1
+    assert store.closed
+
+    print("\n=== 区块化地图测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_chunked()
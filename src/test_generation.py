@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""测试异步关卡生成流水线：批量调用、缓存、请求合并与输出校验"""
+
+import asyncio
+import tempfile
+
+from agent import GenerationError, LevelCache, LevelPipeline, StubBackend, parse_world
+
+
+class FlakyBackend(StubBackend):
+    """前 broken 次输出无效 JSON 的后端"""
+
+    def __init__(self, broken: int):
+        super().__init__()
+        self.broken = broken
+
+    def render(self, prompt: str) -> str:
+        if self.broken > 0:
+            self.broken -= 1
+            return '好的，这是关卡：{"game_map": {"width": 3}'
+        return super().render(prompt)
+
+
+class MixedBackend(StubBackend):
+    """主题含“坏”时输出构造地图会出错的 JSON"""
+
+    def render(self, prompt: str) -> str:
+        if "坏" in prompt:
+            return '{"game_map": {"width": 3, "height": 3, "objects": 5}, "player": {"position": {"x": 1, "y": 1}}}'
+        return super().render(prompt)
+
+
+async def run_pipeline_checks(directory: str) -> None:
+    print("1. 批量调用与请求合并:")
+    backend = StubBackend(max_batch=8, latency=0.01)
+    async with LevelPipeline(backend, LevelCache(directory)) as pipeline:
+        themes = [f"主题{i}" for i in range(20)] + ["主题0"] * 5
+        worlds = await pipeline.generate_many(themes)
+        stats = pipeline.stats
+        print(f"   {backend.calls} 次调用，{backend.prompts} 个提示词，合并 {stats.coalesced} 个请求")
+        assert backend.prompts == 20 and backend.calls == 3 and stats.coalesced == 5
+        assert worlds[0].render() == worlds[20].render() and worlds[0] is not worlds[20]
+        assert worlds[1].render() != worlds[0].render()
+
+        print("2. 缓存命中:")
+        world = await pipeline.generate("主题3")
+        assert pipeline.stats.cache_hits == 1 and backend.calls == 3
+        assert world.render() == worlds[3].render()
+        world.player.move(1, 0, world)  # 修改返回的世界不影响缓存
+        assert (await pipeline.generate("主题3")).render() == worlds[3].render()
+
+    print("3. 磁盘缓存与模型区分:")
+    backend = StubBackend()
+    async with LevelPipeline(backend, LevelCache(directory)) as pipeline:
+        assert (await pipeline.generate("主题7")).render() == worlds[7].render()
+        assert backend.calls == 0
+    async with LevelPipeline(StubBackend(model="stub-2"), LevelCache(directory)) as pipeline:
+        await pipeline.generate("主题7")
+        assert pipeline.stats.cache_hits == 0
+
+    print("4. 无效输出重试与失败:")
+    async with LevelPipeline(FlakyBackend(broken=1), retries=1) as pipeline:
+        assert (await pipeline.generate("沙漠")).player.position.x == 1
+        assert pipeline.stats.invalid == 1
+    async with LevelPipeline(FlakyBackend(broken=2), retries=1) as pipeline:
+        try:
+            await pipeline.generate("沙漠")
+            assert False, "连续无效输出应失败"
+        except GenerationError as e:
+            print(f"   {e}")
+        assert pipeline.stats.failed == 1
+
+    print("5. 同批中的异常输出:")
+    async with LevelPipeline(MixedBackend(), retries=0) as pipeline:
+        results = await asyncio.wait_for(asyncio.gather(
+            *(pipeline.generate(theme) for theme in ("森林", "坏关卡", "雪山")), return_exceptions=True), 5)
+        assert isinstance(results[1], GenerationError)
+        assert results[0].game_map.width >= 8 and results[2].game_map.width >= 8
+
+
+def test_generation():
+    """相同主题只调用一次模型，输出按 Schema 校验"""
+    print("=== 测试关卡生成流水线 ===\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run_pipeline_checks(directory))
+
+    print("6. Schema 校验:")
+    text = StubBackend().render("草原")
+    world = parse_world("```json\n" + text + "\n```")
+    assert world.game_map.width >= 8
+    for bad in ('{"player": {}}', '{"game_map": {"width": "宽", "height": 3}, "player": {"position": {"x": 1, "y": 1}}}',
+                '{"game_map": {"width": 3, "height": 3}, "player": {"position": {"x": 5, "y": 1}}}',
+                '{"game_map": {"width": 3, "height": 3, "objects": 5}, "player": {"position": {"x": 1, "y": 1}}}',
+                '{"game_map": {"width": 100000, "height": 100000}, "player": {"position": {"x": 1, "y": 1}}}'):
+        try:
+            parse_world(bad)
+            assert False, bad
+        except ValueError as e:
+            print(f"   {type(e).__name__}: {str(e).splitlines()[0]}")
+
+    print("\n=== 关卡生成流水线测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_generation()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""测试增量日志：撤销、重做、检查点与崩溃恢复"""
+
+import os
+import tempfile
+
+from game.journal import Journal, decode_step, encode_step, OP_CELL, OP_FIELD, OP_POSITION
+from game.types import GameObject, GameObjectType, Position
+from game.world import World
+
+map_text = """
+墙墙墙墙墙墙墙
+墙 我 钥 怪 门
+墙 宝   人 墙
+墙墙墙墙墙墙墙
+"""
+
+
+def test_journal():
+    """每步只记录增量，撤销重做与恢复后的状态应与原状态一致"""
+    print("=== 测试增量日志 ===\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "world.journal")
+        world = World.from_text(map_text)
+        journal = Journal(world, path, checkpoint_every=0)
+        start = world.render()
+
+        print("1. 每步的日志大小:")
+        size = os.path.getsize(path)
+        world.player.move(1, 0, world)
+        print(f"   移动: {os.path.getsize(path) - size} 字节")
+        assert os.path.getsize(path) - size < 32
+        size = os.path.getsize(path)
+        print(f"   {world.interact_forward()}")
+        print(f"   交互: {os.path.getsize(path) - size} 字节")
+        assert world.player.has_key
+        after_key = world.render()
+
+        print("2. 撤销与重做:")
+        assert journal.undo() and not world.player.has_key
+        assert "钥" in world.render()
+        assert journal.undo() and world.render() == start
+        assert world.player.position == Position(x=2, y=1)
+        assert not journal.undo()
+        assert journal.redo() and journal.redo() and not journal.redo()
+        assert world.render() == after_key and world.player.has_key
+
+        print("3. 地图修改与新原型:")
+        world.game_map.add_object(GameObject(type=GameObjectType.ITEM, name="剑", symbol="剑",
+                                             position=Position(x=3, y=2), interactive=True))
+        world.player.move(0, 1, world)  # 先提交地图修改，再记录移动
+        assert world.game_map.get_object_at(Position(x=3, y=2)).name == "剑"
+        assert journal.undo() and journal.undo()
+        assert world.game_map.get_object_at(Position(x=3, y=2)) is None
+        assert journal.redo()
+        with journal.step():  # 步骤内的地图修改立即写入，不必等到 flush
+            with journal.step():  # 嵌套的步骤并入外层
+                assert world.game_map.move_object(Position(x=6, y=1), Position(x=5, y=1))
+        assert not journal._pending
+
+        print("4. 崩溃恢复:")
+        expected = world.render()
+        state = world.get_game_state()
+        journal._file.close()  # 模拟进程崩溃：不调用 close()
+        with open(path, "ab") as f:
+            f.write(b"\x10\x00\x00\x00torn")  # 写到一半的帧
+        recovered = Journal.recover(path)
+        assert recovered.world.render() == expected
+        assert recovered.world.get_game_state() == state
+        assert recovered.world.game_map.get_object_at(Position(x=5, y=1)).name == "monster"
+        assert recovered.undo() and recovered.world.game_map.get_object_at(Position(x=6, y=1)) is not None
+        assert recovered.undo() and recovered.world.game_map.get_object_at(Position(x=3, y=2)) is None
+        assert recovered.redo() and recovered.redo()
+        recovered.world.player.move(0, 1, recovered.world)
+        recovered.close()
+        assert Journal.recover(path).world.player.position == recovered.world.player.position
+
+        print("5. 检查点压缩:")
+        world = World.from_text(map_text)
+        journal = Journal(world, path, checkpoint_every=4)
+        for _ in range(5):
+            world.player.move(-1, 0, world)
+            world.player.move(1, 0, world)
+        journal.close()
+        recovered = Journal.recover(path)
+        print(f"   日志 {os.path.getsize(path)} 字节")
+        assert recovered.world.player.position == world.player.position
+        undone = 0
+        while recovered.undo():
+            undone += 1
+        assert undone == 10 and recovered.world.render() == World.from_text(map_text).render()
+        recovered.close()
+
+    print("6. 编码往返:")
+    step = ((OP_CELL, 1, 2, 3, 0), (OP_POSITION, 1, 1, 2, 1), (OP_FIELD, 4, [], ["地图"]))
+    assert decode_step(encode_step(step)) == step
+
+    print("\n=== 增量日志测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_journal()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""测试关卡包的写入、元数据索引和内存映射读取"""
+
+import os
+import tempfile
+
+from game.level_pack import LevelPack, LevelPackWriter, build_pack
+from game.types import Position
+from game.world import World
+
+levels = {
+    "房间": """
+墙墙墙墙墙墙墙
+墙 我 钥 怪 门
+墙 宝   人 墙
+墙墙墙墙墙墙墙
+""",
+    "走廊": """
+#######
+#@ K D T#
+#######
+""",
+    "死路": """
+#####
+#@#T#
+#####
+""",
+}
+
+
+def test_level_pack():
+    """关卡包中的关卡应与直接解析文本得到的世界一致"""
+    print("=== 测试关卡包 ===\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "levels.pack")
+
+        print("1. 写入关卡包:")
+        with LevelPackWriter(path) as writer:
+            for name, text in levels.items():
+                writer.add_text(name, text, solve=True)
+            writer.add("无玩家", World.from_text(levels["房间"]).game_map)
+        print(f"   {os.path.getsize(path)} 字节")
+
+        print("2. 读取元数据:")
+        with LevelPack(path) as pack:
+            assert len(pack) == 4
+            for info in pack:
+                print(f"   {info}")
+            room = pack.info(0)
+            assert (room.name, room.width, room.height) == ("房间", 9, 4)
+            assert (room.keys, room.doors, room.treasures, room.monsters) == (1, 1, 1, 1)
+            assert room.solvable is True and room.path_length is not None
+            assert pack.info(2).solvable is False
+            assert pack.info(3).solvable is None and pack.info(3).path_length is None
+            assert pack.find("走廊") == 1
+
+            print("3. 按编号和名称加载:")
+            for index, (name, text) in enumerate(levels.items()):
+                expected = World.from_text(text)
+                world = pack.load(name)
+                assert world.render() == expected.render()
+                assert world.player == expected.player
+                assert dict(world.game_map.objects) == dict(expected.game_map.objects)
+                assert pack.load(index).render() == expected.render()
+            assert pack.load(3).player.position == Position(x=1, y=1)
+
+            world = pack.load("房间")
+            world.player.move(1, 0, world)
+            print(f"   {world.interact_forward()}")
+            assert pack.load("房间").game_map.get_object_at(Position(x=4, y=1)) is not None
+
+            for bad in (4, -1):
+                try:
+                    pack.info(bad)
+                    assert False, "应当拒绝越界编号"
+                except IndexError:
+                    pass
+            try:
+                pack.find("不存在")
+                assert False, "应当报告关卡不存在"
+            except KeyError as e:
+                print(f"   {e}")
+
+        print("4. 从目录打包:")
+        paths = []
+        for name, text in levels.items():
+            paths.append(os.path.join(directory, f"{name}.txt"))
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                f.write(text)
+        assert build_pack(path, paths) == 3
+        with LevelPack(path) as pack:
+            assert [info.name for info in pack] == list(levels)
+
+        print("5. 非法文件:")
+        bad_path = os.path.join(directory, "bad.pack")
+        for data in (b"", b"XXXX" + bytes(40)):
+            with open(bad_path, "wb") as f:
+                f.write(data)
+            try:
+                LevelPack(bad_path)
+                assert False, "应当拒绝非法文件"
+            except ValueError as e:
+                print(f"   {e}")
+
+        print("6. 超过 65535 个同类对象:")
+        with LevelPackWriter(path) as writer:
+            writer.add_text("宝库", "\n".join(["T" * 300] * 220))
+        with LevelPack(path) as pack:
+            assert pack.info(0).treasures == 66000 and pack.info(0).objects == 66000
+
+    print("\n=== 关卡包测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_level_pack()
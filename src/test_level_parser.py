@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""测试关卡文本解析器"""
+
+import io
+
+from game.game_map import GameMap
+from game.level_parser import LevelParser
+from game.types import Position, GameObjectType
+
+map_text = """
+墙墙墙墙墙墙墙
+墙 我 钥 怪 门
+墙 宝   人 墙
+墙墙墙墙墙墙墙
+"""
+
+
+def test_level_parser():
+    """测试批量解析与流式输入"""
+    print("=== 测试关卡解析 ===\n")
+
+    game_map, player = GameMap.from_text(map_text)
+    print("1. 字符串输入:")
+    print(f"   尺寸: {game_map.width}x{game_map.height}, 玩家: ({player.position.x}, {player.position.y})")
+    assert (game_map.width, game_map.height) == (9, 4)
+    assert (player.position.x, player.position.y) == (2, 1)
+
+    print("2. 只为非静态格子创建对象:")
+    print(f"   稀疏对象: {sorted(game_map.grid.entities)}")
+    assert sorted(game_map.grid.entities) == [(2, 2), (4, 1), (6, 1), (6, 2), (8, 1)]
+    key = game_map.get_object_at(Position(x=4, y=1))
+    assert key.type == GameObjectType.KEY and key.interactive and not key.passable
+    assert game_map.get_object_at(Position(x=0, y=0)).symbol == "墙"
+    assert game_map.get_object_at(Position(x=2, y=1)) is None
+
+    print("3. 文件对象流式输入:")
+    stream_map, stream_player = GameMap.from_text(io.StringIO(map_text))
+    assert stream_map.get_render_data() == game_map.get_render_data()
+    assert stream_player.position == player.position
+
+    print("4. 逐行喂入:")
+    parser = LevelParser()
+    for line in ["#####", "#@ K#", "", "#####"]:
+        parser.feed_line(line)
+    assert parser.row_count == 3
+    line_map, line_player = parser.finish()
+    assert line_map.get_object_at(Position(x=3, y=1)).type == GameObjectType.KEY
+    assert line_player.position == Position(x=1, y=1)
+
+    print("5. 空文本报错:")
+    try:
+        GameMap.from_text("  \n \n")
+    except ValueError as e:
+        print(f"   错误: {e}")
+    else:
+        raise AssertionError("空文本应当报错")
+
+    print("\n=== 关卡解析测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_level_parser()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""测试数组存储的游戏地图"""
+
+from game.game_map import GameMap
+from game.types import Position, GameObject, GameObjectType
+
+
+def make_object(obj_type: GameObjectType, x: int, y: int, interactive: bool = False) -> GameObject:
+    """创建测试对象"""
+    return GameObject(
+        type=obj_type,
+        name=obj_type.value,
+        symbol=obj_type.value[0],
+        position=Position(x=x, y=y),
+        interactive=interactive
+    )
+
+
+def test_map_storage():
+    """测试格子数组与稀疏对象表"""
+    print("=== 测试地图存储 ===\n")
+
+    game_map = GameMap(width=6, height=4)
+    game_map.add_object(make_object(GameObjectType.WALL, 0, 0))
+    key = make_object(GameObjectType.KEY, 2, 1, interactive=True)
+    game_map.add_object(key)
+
+    print("1. 静态格子不进入稀疏对象表:")
+    print(f"   稀疏对象: {list(game_map.grid.entities)}")
+    assert list(game_map.grid.entities) == [(2, 1)]
+    assert game_map.get_object_at(Position(x=0, y=0)).type == GameObjectType.WALL
+    assert game_map.get_object_at(Position(x=2, y=1)) is key
+    assert game_map.object_count() == 2
+
+    print("2. 通行检查:")
+    assert not game_map.is_passable(Position(x=0, y=0))
+    assert game_map.is_passable(Position(x=1, y=1))
+    assert not game_map.is_passable(Position(x=6, y=0))
+
+    print("3. 修改对象字段后重新登记原型:")
+    key.symbol, key.passable = "匙", True
+    assert not game_map.is_passable(Position(x=2, y=1)), "未调用 update_object 前仍按添加时的原型"
+    assert game_map.update_object(key)
+    assert game_map.is_passable(Position(x=2, y=1)) and game_map.get_row_text(1)[2] == "匙"
+    assert game_map.get_object_at(Position(x=2, y=1)) is key
+    assert not game_map.update_object(make_object(GameObjectType.KEY, 4, 1))
+    key.passable = False
+    game_map.update_object(key)
+
+    print("4. 移动与移除对象:")
+    assert game_map.move_object(Position(x=2, y=1), Position(x=3, y=2))
+    assert key.position == Position(x=3, y=2)
+    assert game_map.get_object_at(Position(x=2, y=1)) is None
+    assert game_map.remove_object_at(Position(x=3, y=2))
+    assert not game_map.remove_object_at(Position(x=3, y=2))
+
+    print("5. 按需生成 cells 视图:")
+    assert game_map.grid.cells_cache is None
+    cells = game_map.cells
+    assert cells[0][0].game_object.type == GameObjectType.WALL
+    assert cells[2][3].game_object is None
+    game_map.add_object(make_object(GameObjectType.WALL, 5, 3))
+    assert game_map.grid.cells_cache is None
+    assert Position(x=5, y=3) in game_map.objects
+
+    print("6. 原型超过单字节时自动升级数组:")
+    for i in range(300):
+        game_map.add_object(GameObject(
+            type=GameObjectType.WALL,
+            name=f"wall{i}",
+            symbol="#",
+            position=Position(x=i % 6, y=(i // 6) % 4)
+        ))
+    assert game_map.grid.tiles.typecode == 'H'
+    assert game_map.get_object_at(Position(x=5, y=1)).name == "wall299"
+
+    print("\n=== 地图存储测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_map_storage()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""测试通行性位图与邻接索引"""
+
+import pickle
+
+from game.game_map import GameMap
+from game.tile_grid import NEIGHBOR_UP, NEIGHBOR_DOWN, NEIGHBOR_LEFT, NEIGHBOR_RIGHT
+from game.types import Position, GameObject, GameObjectType
+
+map_text = """
+#####
+#@ K#
+# # #
+#####
+"""
+
+
+def rebuilt_neighbors(game_map: GameMap) -> bytes:
+    """重新整体生成邻接掩码用于比对"""
+    clone = pickle.loads(pickle.dumps(game_map))
+    return bytes(clone.grid.build_neighbors())
+
+
+def test_passability():
+    """位图和邻接索引应随地图变化增量更新"""
+    print("=== 测试通行性位图 ===\n")
+
+    game_map, _ = GameMap.from_text(map_text)
+    passable = game_map.passability_view()
+    neighbors = game_map.neighbor_index()
+
+    print("1. 初始位图:")
+    for y in range(game_map.height):
+        print("   " + "".join(str(passable[y * game_map.width + x]) for x in range(game_map.width)))
+    assert game_map.is_passable_xy(1, 1) and not game_map.is_passable_xy(3, 1)
+    assert not game_map.is_passable_xy(-1, 0)
+    assert neighbors[1 * 5 + 1] == NEIGHBOR_DOWN | NEIGHBOR_RIGHT
+    assert sorted(game_map.passable_neighbors(2, 1)) == [(1, 1)]
+
+    print("2. 只读视图:")
+    try:
+        passable[0] = 1
+    except TypeError:
+        print("   位图不可写")
+    else:
+        raise AssertionError("位图视图应当只读")
+
+    print("3. 移除钥匙后增量更新:")
+    version = game_map.passability_version
+    game_map.remove_object_at(Position(x=3, y=1))
+    assert game_map.passability_version == version + 1
+    assert passable[1 * 5 + 3] == 1
+    assert neighbors[1 * 5 + 2] & NEIGHBOR_RIGHT
+    assert neighbors[2 * 5 + 3] & NEIGHBOR_UP
+
+    print("4. 添加与移动对象:")
+    game_map.add_object(GameObject(type=GameObjectType.MONSTER, name="monster", symbol="M",
+                                   position=Position(x=2, y=1)))
+    assert not neighbors[1 * 5 + 1] & NEIGHBOR_RIGHT
+    game_map.move_object(Position(x=2, y=1), Position(x=1, y=2))
+    assert neighbors[1 * 5 + 1] & NEIGHBOR_RIGHT and not neighbors[1 * 5 + 1] & NEIGHBOR_DOWN
+    assert not neighbors[2 * 5 + 2] & NEIGHBOR_LEFT
+    assert bytes(neighbors) == rebuilt_neighbors(game_map)
+
+    print("5. 不改变通行性的写入不增加通行性版本:")
+    version = game_map.passability_version
+    game_map.add_object(GameObject(type=GameObjectType.WALL, name="wall", symbol="墙",
+                                   position=Position(x=0, y=0)))
+    assert game_map.passability_version == version
+
+    print("\n=== 通行性位图测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_passability()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""测试寻路与怪物调度"""
+
+from game.game_map import GameMap
+from game.pathfinding import astar, jps, PathCache, MonsterScheduler
+from game.types import Position
+from game.world import World
+
+map_text = """
+##########
+#@   #   #
+#    D   #
+#### #####
+#        #
+##########
+"""
+
+
+def test_pathfinding():
+    """测试 A*、JPS、路径缓存和怪物调度"""
+    print("=== 测试寻路 ===\n")
+
+    game_map, _ = GameMap.from_text(map_text)
+
+    print("1. A* 与 JPS 结果等长:")
+    path = astar(game_map, (1, 1), (1, 4))
+    jump_path = jps(game_map, (1, 1), (1, 4))
+    print(f"   A*: {path}")
+    assert path[0] == (1, 1) and path[-1] == (1, 4)
+    assert len(path) == len(jump_path) == 10
+    assert astar(game_map, (1, 1), (7, 1)) is None
+    assert jps(game_map, (1, 1), (7, 1)) is None
+    assert astar(game_map, (1, 1), (0, 0)) is None
+
+    print("2. 路径缓存的后缀命中与失效:")
+    cache = PathCache(game_map)
+    assert cache.get_path((1, 1), (7, 1)) is None
+    assert cache.get_path((1, 1), (1, 4)) == path
+    assert cache.next_step((3, 2), (1, 4)) == (4, 2)
+    assert cache.hits == 1 and cache.misses == 2
+
+    # 开门改变地形版本，缓存失效并重新寻路
+    version = game_map.terrain_version
+    game_map.remove_object_at(Position(x=5, y=2))
+    assert game_map.terrain_version == version + 1
+    assert cache.get_path((1, 1), (7, 1)) is not None
+    assert len(cache) > 0
+
+    print("3. 怪物移动不改变地形版本:")
+    world = World.from_text("""
+#######
+#@    #
+#  #  #
+#    M#
+#######
+""")
+    version = world.game_map.terrain_version
+    scheduler = MonsterScheduler(world, budget_ms=50)
+    for _ in range(3):
+        stats = scheduler.tick()
+        print(f"   {stats}")
+    assert world.game_map.terrain_version == version
+    monsters = [obj for obj in world.game_map.iter_entities() if obj.type == "monster"]
+    assert len(monsters) == 1
+    m = monsters[0].position
+    assert abs(m.x - 1) + abs(m.y - 1) == 3
+
+    print("4. 贴近玩家后停止:")
+    for _ in range(5):
+        scheduler.tick()
+    m = monsters[0].position
+    assert abs(m.x - 1) + abs(m.y - 1) == 1
+    print(world.render())
+
+    print("\n=== 寻路测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_pathfinding()
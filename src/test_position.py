@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""测试轻量坐标 Point 与 Position 的转换和驻留"""
+
+import pickle
+
+from game.types import Point, Position, point, POINT_INTERN_LIMIT
+from game.world import World
+
+map_text = """
+######
+#@ K #
+#    #
+######
+"""
+
+
+def test_position():
+    """Point 驻留、与 Position 的转换以及移动结果应保持一致"""
+    print("=== 测试轻量坐标 ===\n")
+
+    print("1. Point 驻留:")
+    p = point(3, 4)
+    print(f"   {p}")
+    assert p is point(3, 4)
+    assert p == (3, 4) and p.x == 3 and p.y == 4
+    assert p + (1, -1) == (4, 3) and p.offset(-3, 0) == Point(0, 4)
+    far = point(POINT_INTERN_LIMIT, 0)
+    assert far == point(POINT_INTERN_LIMIT, 0) and far is not point(POINT_INTERN_LIMIT, 0)
+    assert {p: "a"}[(3, 4)] == "a"
+
+    print("2. 与 Position 互相转换:")
+    position = p.to_position()
+    print(f"   {position!r}")
+    assert position == Position(x=3, y=4) and position.to_point() is p
+    assert Position.from_xy(3, 4) is position
+    assert Position.from_xy(-1, 2) == Position(x=-1, y=2)
+    assert Position(x=1, y=1) + Position(x=2, y=3) == Position(x=3, y=4)
+    assert position.model_dump() == {"x": 3, "y": 4}
+    assert pickle.loads(pickle.dumps(position)) == position
+
+    print("3. Position 不可修改:")
+    try:
+        position.x = 5
+        assert False, "共享实例不应被修改"
+    except ValueError:
+        print("   赋值被拒绝")
+    assert Position.from_xy(3, 4).x == 3
+
+    print("4. 移动与交互:")
+    world = World.from_text(map_text)
+    old = world.player.position
+    print(f"   {world.player.move(1, 0, world)}")
+    assert old == Position(x=1, y=1) and world.player.position == Position(x=2, y=1)
+    assert isinstance(world.player.position, Position)
+    assert world.player.move(0, -1, world) == "前方有障碍物。"
+    assert world.move_player_to(Position(x=1, y=2)) == "移动成功。"
+    assert world.move_player_to(point(2, 1)) == "移动成功。"
+    assert world.forward_point() == (3, 1) and world.get_forward_position() == Position(x=3, y=1)
+    print(f"   {world.interact_forward()}")
+    assert world.player.has_key
+    assert world.model_dump()["player"]["position"] == {"x": 2, "y": 1}
+
+    print("\n=== 轻量坐标测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_position()
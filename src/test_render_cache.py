@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""测试增量渲染"""
+
+from game.world import World
+from game.types import Position
+
+map_text = """
+墙墙墙墙墙墙墙
+墙 我 钥 怪 门
+墙 宝   人 墙
+墙墙墙墙墙墙墙
+"""
+
+
+def test_render_cache():
+    """测试行缓冲与差异输出"""
+    print("=== 测试增量渲染 ===\n")
+
+    world = World.from_text(map_text)
+    player = world.player
+
+    print("1. 首帧包含所有行:")
+    first = world.render_diff()
+    assert sorted(first) == [0, 1, 2, 3]
+    assert world.render() == "\n".join(first[y] for y in range(4))
+    assert world.render_diff() == {}
+
+    print("2. 移动玩家只更新相关行:")
+    player.move(-1, 0, world)
+    assert list(world.render_diff()) == [1]
+    player.move(0, 1, world)
+    diff = world.render_diff()
+    print(f"   变化的行: {diff}")
+    assert sorted(diff) == [1, 2]
+    assert diff[2][1] == "我"
+
+    print("3. 地图变化只更新所在行:")
+    version = world.game_map.version
+    world.game_map.remove_object_at(Position(x=6, y=1))
+    assert world.game_map.version > version
+    diff = world.render_diff()
+    assert list(diff) == [1]
+    assert diff[1][6] == " "
+
+    print("4. 完整帧与差异保持一致:")
+    player.move(0, -1, world)
+    world.render_diff()
+    full = world.render()
+    print(full)
+    assert full.split("\n")[1][1] == "我"
+
+    print("\n=== 增量渲染测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_render_cache()
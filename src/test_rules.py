@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""测试交互规则引擎：默认规则与原有交互一致、剧本规则、热重载与错误处理"""
+
+import copy
+import json
+import os
+import pickle
+import tempfile
+
+from game.events import EventType
+from game.rules import DEFAULT_RULESET, RuleError, RuleSet
+from game.types import GameObject, GameObjectType, Position, point
+from game.world import World
+
+SCRIPT = {
+    "title": "魔法泉",
+    "rules": [
+        {"type": "item", "name": "魔法泉", "when": {"gold": {">=": 5}},
+         "effects": [{"gold": -5}, {"health": 20}, {"give_item": "圣水"}],
+         "message": "你向{name}投了5个金币，感觉精神焕发。", "event": "fountain_used"},
+        {"type": "item", "name": "魔法泉", "message": "{name}需要5个金币。"},
+        {"type": "item", "message": "一件普通的物品。"},
+        {"type": "npc", "name": "商人", "when": {"has_item": "圣水"},
+         "effects": {"take_item": "圣水", "gold": 50}, "message": "商人买下了你的圣水。", "event": "sold"},
+    ],
+}
+
+
+def place(world: World, obj_type: GameObjectType, name: str, symbol: str) -> None:
+    """在玩家右侧放置一个可交互对象"""
+    position = world.forward_point()
+    world.game_map.remove_object_at(position)
+    world.game_map.add_object(GameObject(type=obj_type, name=name, symbol=symbol,
+                                         position=Position(x=position.x, y=position.y), interactive=True))
+
+
+def test_rules():
+    """默认规则复现原有交互，剧本规则按 (类型, 名称) 分发，规则文件可热重载"""
+    print("=== 测试交互规则 ===\n")
+
+    print("1. 默认规则:")
+    world = World.from_text("#######\n#我D   #\n#######")
+    assert world.rules is DEFAULT_RULESET
+    assert world.interact_forward() == "门是锁着的。你需要钥匙。"
+    place(world, GameObjectType.KEY, "key", "K")
+    assert world.interact_forward() == "你获得了一把钥匙。" and world.player.has_key
+    place(world, GameObjectType.DOOR, "door", "D")
+    assert world.interact_forward() == "你用钥匙打开了门。" and not world.player.has_key
+    assert world.game_map.get_object_at(point(2, 1)) is None
+    place(world, GameObjectType.TREASURE, "treasure", "T")
+    assert world.interact_forward() == "你获得了10个金币。" and world.player.gold == 10
+    place(world, GameObjectType.NPC, "老人", "N")
+    assert world.interact_forward() == "老人 说：你好，冒险者！"
+    place(world, GameObjectType.ITEM, "石头", "石")
+    assert world.interact_forward() == "无法与 石头 交互。"
+    place(world, GameObjectType.MONSTER, "monster", "M")
+    assert world.interact_forward() == "你被怪物击败了！游戏结束。" and world.game_over
+
+    print("\n2. 剧本规则:")
+    world = World.from_text("#######\n#我    #\n#######")
+    world.use_rules(RuleSet.from_script(json.dumps(SCRIPT, ensure_ascii=False)))
+    events = []
+    world.events.subscribe(None, events.append)
+    place(world, GameObjectType.ITEM, "魔法泉", "泉")
+    assert world.interact_forward() == "魔法泉需要5个金币。"
+    world.player.gold, world.player.health = 5, 70
+    assert world.interact_forward() == "你向魔法泉投了5个金币，感觉精神焕发。"
+    assert (world.player.gold, world.player.health, world.player.inventory) == (0, 90, ["圣水"])
+    assert events[-1].type == "fountain_used" and events[-1].data == {"gold": -5, "health": 20}
+    place(world, GameObjectType.ITEM, "木箱", "箱")
+    assert world.interact_forward() == "一件普通的物品。"
+    place(world, GameObjectType.NPC, "商人", "商")
+    assert world.interact_forward() == "商人买下了你的圣水。" and world.player.inventory == []
+    assert world.victory, "金币变化触发胜利检查"
+    assert [event.type for event in events[-2:]] == ["sold", EventType.VICTORY]
+    place(world, GameObjectType.NPC, "商人", "商")
+    world.game_over = False
+    assert world.interact_forward() == "商人 说：你好，冒险者！", "条件不成立时落到默认规则"
+
+    print("\n3. 热重载:")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "script.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(SCRIPT, f, ensure_ascii=False)
+        rules = RuleSet.from_file(path)
+        world = World.from_text("#######\n#我    #\n#######")
+        world.use_rules(rules)
+        place(world, GameObjectType.ITEM, "魔法泉", "泉")
+        assert world.interact_forward() == "魔法泉需要5个金币。"
+        assert not rules.reload_if_changed()
+
+        script = copy.deepcopy(SCRIPT)
+        script["rules"][1]["message"] = "{name}干涸了。"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(script, f, ensure_ascii=False)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        version = rules.version
+        assert rules.reload_if_changed() and rules.version == version + 1
+        assert world.interact_forward() == "魔法泉干涸了。"
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"rules": [{"type": "dragon"}]}')
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+        try:
+            rules.reload_if_changed()
+            raise AssertionError("不合法的规则应当被拒绝")
+        except RuleError as e:
+            print(f"   拒绝: {e}")
+        assert world.interact_forward() == "魔法泉干涸了。", "加载失败时保留原有规则"
+
+    print("\n4. 错误与复制:")
+    for bad in ([{"message": "缺少类型"}], [{"type": "key", "effects": [{"fly": True}]}],
+                [{"type": "key", "when": {"gold": {"~": 1}}}], [{"type": "key", "effects": {"gold": "多"}}],
+                [{"type": "key", "when": {"gold": {">=": "5"}}}], [{"type": "key", "when": {"has_key": 1}}],
+                [{"type": "key", "effects": {"remove_object": "no"}}], [{"type": "key", "effects": {"victory": 1}}],
+                [{"type": "treasure", "message": "你现在有 {gold} 金币"}], [{"type": "key", "message": "{name"}],
+                [{"type": "key", "effects": ["remove_object"]}], [{"type": "key", "effects": 5}],
+                [{"type": "key", "event": 5}], [{"type": "key", "name": 7}],
+                '{"rules": 3}', "不是 JSON"):
+        try:
+            RuleSet.from_script(bad)
+            raise AssertionError(f"应当被拒绝: {bad}")
+        except RuleError:
+            pass
+    rules = RuleSet.from_script([{"type": "treasure", "message": "{{{name}}} 闪闪发光"}])
+    world = World.from_text("#####\n#我T #\n#####")
+    world.use_rules(rules)
+    assert world.interact_forward() == "{treasure} 闪闪发光"
+    clone = copy.deepcopy(world)
+    assert clone.rules is world.rules
+    restored = pickle.loads(pickle.dumps(world.rules))
+    assert restored.specs == world.rules.specs and restored is not world.rules
+
+    print("\n=== 交互规则测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_rules()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""测试回合调度器与事件总线：执行顺序、取消、重复、交互事件与事件驱动的胜利检查"""
+
+import copy
+import os
+import tempfile
+
+from game.events import EventBus, Event, EventType
+from game.journal import Journal
+from game.scheduler import STOP, Scheduler, patrol
+from game.types import Position, point
+from game.world import World
+
+LEVEL = """
+#######
+#我 T  #
+#     #
+#  M  #
+#######
+"""
+
+
+def test_scheduler():
+    """行动按到期回合和调度顺序执行，交互发布事件，胜利只在金币变化时检查"""
+    print("=== 测试调度器与事件 ===\n")
+
+    print("1. 时间轮调度:")
+    scheduler = Scheduler(wheel_size=8)
+    log = []
+    scheduler.schedule(2, lambda world: log.append(("a", scheduler.now)))
+    scheduler.schedule(2, lambda world: log.append(("b", scheduler.now)))
+    scheduler.schedule(1, lambda world: log.append(("c", scheduler.now)))
+    scheduler.schedule(20, lambda world: log.append(("far", scheduler.now)))
+    repeat = scheduler.schedule(3, lambda world: log.append(("r", scheduler.now)), interval=5)
+    cancelled = scheduler.schedule(4, lambda world: log.append(("x", scheduler.now)))
+    scheduler.cancel(cancelled)
+    assert len(scheduler) == 5
+    scheduler.run(None, 25)
+    assert log == [("c", 1), ("a", 2), ("b", 2), ("r", 3), ("r", 8), ("r", 13), ("r", 18),
+                   ("far", 20), ("r", 23)], log
+    scheduler.cancel(repeat)
+    assert len(scheduler) == 0
+
+    countdown = [3]
+
+    def back_off(world):
+        countdown[0] -= 1
+        log.append(("back", scheduler.now))
+        return 10 if countdown[0] else None
+
+    log.clear()
+    scheduler.schedule(1, back_off)
+    scheduler.run(None, 40)
+    assert log == [("back", 26), ("back", 36), ("back", 46)] and len(scheduler) == 0
+    try:
+        scheduler.schedule(0, back_off)
+        raise AssertionError("delay 为 0 应当被拒绝")
+    except ValueError:
+        pass
+
+    print("\n   行动抛出异常:")
+    scheduler = Scheduler(wheel_size=8)
+    log.clear()
+
+    def boom(world):
+        raise RuntimeError("boom")
+
+    scheduler.schedule(1, boom)
+    scheduler.schedule(1, lambda world: log.append(("s", scheduler.now)), interval=1)
+    try:
+        scheduler.tick(None)
+        raise AssertionError("异常应当传给调用者")
+    except RuntimeError:
+        pass
+    assert len(scheduler) == 1, "出错的一次性行动结束，同槽的行动保留"
+    scheduler.run(None, 5)
+    assert log == [("s", n) for n in range(2, 7)], log
+
+    print("\n   STOP 结束重复行动:")
+    scheduler = Scheduler(wheel_size=8)
+    runs = []
+    scheduler.schedule(1, lambda world: runs.append(scheduler.now) or (STOP if len(runs) == 2 else None), interval=3)
+    scheduler.run(None, 20)
+    assert runs == [1, 4] and len(scheduler) == 0
+
+    print("\n2. 事件总线:")
+    bus = EventBus()
+    seen = []
+    unsubscribe = bus.subscribe("custom", lambda event: seen.append(event.message))
+    bus.subscribe(None, lambda event: seen.append("*" + event.type))
+    bus.publish(Event("custom", "你好"))
+    unsubscribe()
+    bus.publish(Event("custom", "没人听"))
+    assert seen == ["你好", "*custom", "*custom"] and bus.published == 2
+
+    print("\n3. 交互事件与胜利:")
+    world = World.from_text(LEVEL)
+    events = []
+    world.events.subscribe(None, events.append)
+    world.player.gold = 40
+    world.player.position = Position(x=2, y=1)
+    assert world.interact_forward() == "你获得了10个金币。"
+    assert [event.type for event in events] == [EventType.TREASURE_PICKED, EventType.VICTORY]
+    assert world.victory and world.game_over and world.check_victory()
+    print(f"   事件: {[event.type for event in events]}")
+
+    print("\n4. 怪物巡逻:")
+    world = World.from_text(LEVEL)
+    monster = world.game_map.get_object_at(point(3, 3))
+    route = [Position(x=x, y=3) for x in range(2, 6)] + [Position(x=x, y=2) for x in range(5, 1, -1)]
+    world.scheduler.schedule(1, patrol(monster, route))
+    moves = []
+    world.events.subscribe(EventType.ENTITY_MOVED,
+                           lambda event: moves.append((event.position.x, event.position.y)))
+    world.tick(3)
+    assert moves == [(4, 3), (5, 3), (5, 2)] and world.game_map.get_object_at(point(5, 2)) is monster
+    clone = copy.deepcopy(world)
+    assert clone._scheduler is None and clone.tick() == 0
+
+    world.player.position = Position(x=3, y=2)
+    defeated = []
+    world.events.subscribe(EventType.PLAYER_DEFEATED, defeated.append)
+    world.tick(5)
+    assert world.game_over and not world.victory and len(defeated) == 1
+    assert len(world.scheduler) == 0
+    print(f"   怪物走了 {len(moves)} 步后抓住了玩家")
+
+    print("\n5. 回合推进写入日志:")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "world.journal")
+        world = World.from_text(LEVEL)
+        journal = Journal(world, path, checkpoint_every=0)
+        monster = world.game_map.get_object_at(point(3, 3))
+        world.scheduler.schedule(1, patrol(monster, route), interval=1)
+        world.tick(3)
+        expected = world.render()
+        journal._file.close()  # 模拟进程崩溃：不调用 close()
+        recovered = Journal.recover(path)
+        assert recovered.world.render() == expected
+        assert recovered.world.game_map.get_object_at(point(5, 2)) is not None
+        assert recovered.undo() and recovered.world.game_map.get_object_at(point(5, 3)) is not None
+        recovered.close()
+
+        world = World.from_text(LEVEL)
+        monster = world.game_map.get_object_at(point(3, 3))
+        world.player.position = Position(x=5, y=3)
+        world.scheduler.schedule(1, patrol(monster, route), interval=1)
+        world.tick(5)
+        assert world.game_over and len(world.scheduler) == 0, "游戏结束后设置了 interval 的巡逻也停止"
+
+    print("\n=== 调度器与事件测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_scheduler()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""测试可插拔 JSON 序列化层"""
+
+import json
+
+from game import serialization
+from game.serialization import SERIALIZERS, get_serializer, position_key
+from game.types import point
+from game.world import World
+
+map_text = """
+墙墙墙墙墙墙墙
+墙 我 钥 怪 门
+墙 宝   人 墙
+墙墙墙墙墙墙墙
+"""
+
+
+def test_serialization():
+    """各序列化器输出的内容一致，位置键统一编码为 "x,y" """
+    print("=== 测试序列化层 ===\n")
+
+    world = World.from_text(map_text)
+    world.player.move(1, 0, world)
+    objects = dict(world.game_map.objects)
+    payloads = {
+        "状态": world.get_game_state(),
+        "增量画面": {"seq": 1, "rows": {1: "墙  我钥 怪 门"}, "game_over": False},
+        "对象表": objects,
+        "点键": {point(3, 1): "钥"},
+        "世界": world,
+    }
+    expected = {
+        "状态": world.get_game_state(),
+        "增量画面": {"seq": 1, "rows": {"1": "墙  我钥 怪 门"}, "game_over": False},
+        "对象表": {position_key(position): game_object.model_dump(mode="json")
+                  for position, game_object in objects.items()},
+        "点键": {"3,1": "钥"},
+        "世界": json.loads(world.model_dump_json()),
+    }
+
+    print(f"1. 可用的序列化器: {list(SERIALIZERS)}，默认 {get_serializer().name}")
+    assert list(SERIALIZERS)[-1] == "json"
+
+    print("2. 输出一致:")
+    for name in SERIALIZERS:
+        serializer = get_serializer(name)
+        for label, payload in payloads.items():
+            data = serializer.dumps(payload)
+            assert isinstance(data, bytes) and b"\n" not in data, (name, label)
+            assert json.loads(data) == expected[label], (name, label)
+        print(f"   {name}: {len(serializer.dumps(objects))} 字节")
+    assert "\"6,1\"" in serialization.dumps(objects).decode("utf-8")
+
+    print("3. 原生 model_dump_json:")
+    assert json.loads(world.model_dump_json(None)) == world.model_dump(mode="json")
+    assert world.model_dump_json() == json.dumps(world.model_dump(), indent=2, ensure_ascii=False)
+
+    try:
+        get_serializer("yaml")
+        assert False, "未知的序列化器应报错"
+    except ValueError:
+        pass
+
+    print("\n=== 序列化层测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_serialization()
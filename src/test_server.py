@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""测试多会话游戏服务器"""
+
+import asyncio
+import json
+
+from game.world import World
+from server.loadgen import run_load
+from server.session import Session
+from server.tcp import DEMO_LEVEL, GameServer
+
+
+async def exchange(reader, writer, command: str) -> dict:
+    """发送一条指令并读取响应"""
+    writer.write(command.encode("utf-8") + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+class BrokenWorld(World):
+    """整帧重绘时出错的世界"""
+
+    def render(self) -> str:
+        raise RuntimeError("无法绘制")
+
+
+async def run_server_checks() -> None:
+    server = GameServer(port=0, max_sessions=3)
+    port = await server.start()
+    try:
+        print("2. 两个会话互不影响:")
+        first = await asyncio.open_connection("127.0.0.1", port)
+        second = await asyncio.open_connection("127.0.0.1", port)
+        hello = json.loads(await first[0].readline())
+        json.loads(await second[0].readline())
+        assert len(hello["rows"]) == hello["height"] == 4
+        moved = await exchange(*first, "右")
+        print(f"   {moved}")
+        assert moved["ok"] and moved["rows"] == {"1": "墙  我钥 怪 门"}
+        status = await exchange(*second, "状态")
+        assert status["rows"] == {} and "金币: 0" in status["message"]
+        assert len(server.sessions) == 2
+
+        print("3. 退出与满员:")
+        third = await asyncio.open_connection("127.0.0.1", port)
+        await third[0].readline()
+        fourth = await asyncio.open_connection("127.0.0.1", port)
+        rejected = json.loads(await fourth[0].readline())
+        assert not rejected["ok"] and await fourth[0].read() == b""
+        assert (await exchange(*first, "退出"))["message"] == "游戏结束。"
+        assert await first[0].read() == b""
+        for reader, writer in (first, second, third, fourth):
+            writer.close()
+        for _ in range(100):
+            if not server.sessions:
+                break
+            await asyncio.sleep(0.01)
+        assert not server.sessions and server.stats.rejected == 1
+
+        print("4. 指令出错时会话继续:")
+        server.world_factory = lambda: BrokenWorld.from_text(DEMO_LEVEL)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        await reader.readline()
+        for _ in range(3):
+            writer.write("看\n".encode("utf-8"))
+        failed = [json.loads(await reader.readline()) for _ in range(3)]
+        assert [response["ok"] for response in failed] == [False] * 3 and failed[-1]["seq"] == 3
+        assert (await exchange(reader, writer, "右"))["ok"]
+        writer.close()
+
+        def broken_factory():
+            raise RuntimeError("关卡包损坏")
+
+        server.world_factory = broken_factory
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        failed = json.loads(await reader.readline())
+        assert not failed["ok"] and "RuntimeError" in failed["message"]
+        assert await reader.read() == b"", "创建世界失败时关闭连接"
+        writer.close()
+        server.world_factory = lambda: World.from_text(DEMO_LEVEL)
+
+        print("5. 压测客户端:")
+        server.max_sessions = 100
+        result = await run_load("127.0.0.1", port, sessions=20, commands=10)
+        print(f"   {result.commands_per_sec:.0f} 条/秒，p99 {result.p99_ms:.2f}ms")
+        assert result.errors == 0 and result.commands == 200
+    finally:
+        await server.close()
+
+
+def test_server():
+    """会话指令解析与服务器的端到端行为"""
+    print("=== 测试游戏服务器 ===\n")
+
+    print("1. 会话指令解析:")
+    session = Session(World.from_text(DEMO_LEVEL))
+    assert len(session.hello()["rows"]) == 4
+    response = session.handle("右")
+    assert response["message"] == "移动成功。" and response["rows"] == {1: "墙  我钥 怪 门"}
+    assert session.handle("互动")["message"] == "你获得了一把钥匙。"
+    assert session.handle("看")["rows"][1] == "墙  我  怪 门"
+    assert not session.handle("跳")["ok"]
+    assert session.handle("q")["message"] == "游戏结束。" and session.closed
+    assert session.seq == 5
+
+    asyncio.run(run_server_checks())
+
+    print("\n=== 游戏服务器测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_server()
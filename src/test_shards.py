@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""测试跨进程分片：会话亲和、批量执行与会话迁移"""
+
+from server.shards import OP_IMPORT, ShardError, ShardPool
+from server.tcp import DEMO_LEVEL
+
+
+def test_shards():
+    """会话固定在所属分片执行，迁移后世界状态与指令序号保持不变"""
+    print("=== 测试跨进程分片 ===\n")
+
+    with ShardPool(workers=2) as pool:
+        print("1. 创建会话:")
+        for session_id in range(4):
+            hello = pool.open_session(session_id, DEMO_LEVEL)
+            assert hello["session"] == session_id and hello["height"] == 4
+        assert [pool.shard_for(i) for i in range(4)] == [0, 1, 0, 1]
+        assert pool.stats() == [(2, 0), (2, 0)]
+
+        print("2. 批量执行:")
+        results = pool.run_batch({0: ["右", "互动"], 1: ["状态"], 3: ["左"]})
+        print(f"   {results[0][1]['message']}")
+        assert results[0][0]["rows"] == {1: "墙  我钥 怪 门"}
+        assert "钥匙" in results[0][1]["message"]
+        assert "金币: 0" in results[1][0]["message"]
+        assert [response["seq"] for response in results[3]] == [1]
+        assert sum(commands for _, commands in pool.stats()) == 4
+
+        print("3. 会话迁移:")
+        size = pool.migrate(0, 1)
+        print(f"   快照 {size} 字节")
+        assert size > 0 and pool.shard_for(0) == 1
+        assert pool.stats()[0][0] == 1 and pool.stats()[1][0] == 3
+        status = pool.execute(0, "状态")
+        assert status["seq"] == 3 and "钥匙" in status["message"]
+        assert pool.migrate(0, 0) > 0 and pool.shard_for(0) == 0
+
+        print("4. 错误处理:")
+        try:
+            pool.execute(99, "右")
+            assert False, "不存在的会话应报错"
+        except ShardError as e:
+            print(f"   {e}")
+        results = pool.run_batch({3: ["右"], 98: ["右"], 2: ["状态"], 99: ["左"]})
+        assert results[98] == [{"ok": False, "error": "会话不存在: 98", "message": "会话不存在: 98"}]
+        assert "error" in results[99][0] and results[3][0]["ok"] and "金币" in results[2][0]["message"]
+
+        call = pool._call
+
+        def failing_import(shard, op, payload):
+            if op == OP_IMPORT:
+                raise ShardError(f"分片 {shard}: 导入失败")
+            return call(shard, op, payload)
+
+        pool._call = failing_import
+        try:
+            pool.migrate(2, 1)
+            assert False, "导入失败应报错"
+        except ShardError:
+            pass
+        pool._call = call
+        assert pool.shard_for(2) == 0 and pool.execute(2, "状态")["ok"], "导入失败时会话留在原分片"
+        assert pool.stats()[1][0] == 2
+        assert pool.execute(1, "退出")["message"] == "游戏结束。"
+        assert not pool.close_session(1) and pool.close_session(2)
+        assert pool.stats() == [(1, 4), (1, 5)]
+
+    print("\n=== 跨进程分片测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_shards()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""测试二进制快照与玩家存档"""
+
+import os
+import tempfile
+
+from game import snapshot
+from game.rules import DEFAULT_RULESET, RuleSet
+from game.saves import SaveManager
+from game.types import Position
+from game.world import World
+
+map_text = """
+墙墙墙墙墙墙墙
+墙 我 钥 怪 门
+墙 宝   人 墙
+墙墙墙墙墙墙墙
+"""
+
+
+def test_snapshot():
+    """快照应完整还原地图、对象和玩家状态"""
+    print("=== 测试二进制快照 ===\n")
+
+    world = World.from_text(map_text)
+    world.player.move(1, 0, world)
+    world.interact_forward()
+    world.player.inventory.append("地图")
+
+    print("1. 内存中往返:")
+    data = snapshot.dumps(world)
+    print(f"   快照 {len(data)} 字节，JSON {len(world.model_dump_json().encode('utf-8'))} 字节")
+    restored = snapshot.loads(data)
+    assert restored.render() == world.render()
+    assert restored.player == world.player
+    assert restored.game_map.palette == world.game_map.palette
+    assert dict(restored.game_map.objects) == dict(world.game_map.objects)
+    assert bytes(restored.game_map.passability_view()) == bytes(world.game_map.passability_view())
+
+    print("2. 文件往返:")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "world.sav")
+        size = world.save(path)
+        assert size == os.path.getsize(path) == len(data)
+        loaded = World.load(path)
+        assert loaded.get_game_state() == world.get_game_state()
+        print(f"   {snapshot.read_header(path)}")
+
+        print("3. 损坏与非法文件:")
+        for bad in (b"", b"AIWS", data[:-1] + bytes([data[-1] ^ 1]), b"X" + data[1:]):
+            try:
+                snapshot.loads(bad)
+                assert False, "应当拒绝损坏的数据"
+            except ValueError as e:
+                print(f"   {e}")
+        open(path, "wb").close()
+        try:
+            World.load(path)
+            assert False, "应当拒绝空文件"
+        except ValueError as e:
+            print(f"   {e}")
+
+        print("4. 存档槽位:")
+        saves = SaveManager(os.path.join(directory, "saves"))
+        assert saves.list_slots() == []
+        saves.save(world, "第一关")
+        world.game_over = True
+        saves.save(world, "结局")
+        slots = saves.list_slots()
+        print(f"   {[(slot.name, slot.size, slot.game_over) for slot in slots]}")
+        assert {slot.name for slot in slots} == {"第一关", "结局"}
+        assert not saves.load("第一关").game_over and saves.load("结局").game_over
+        assert saves.load("第一关").player.position == Position(x=3, y=1) == world.player.position
+        assert saves.delete("结局") and not saves.exists("结局")
+        for name in ("../x", "", " a"):
+            try:
+                saves.path_for(name)
+                assert False, "应当拒绝非法存档名"
+            except ValueError:
+                pass
+        try:
+            saves.load("不存在")
+            assert False, "应当报告存档不存在"
+        except FileNotFoundError as e:
+            print(f"   {e}")
+
+    print("\n5. 自定义规则:")
+    assert snapshot.loads(data).rules is DEFAULT_RULESET
+    scripted = World.from_text(map_text)
+    scripted.use_rules(RuleSet.from_script([{"type": "key", "message": "{name} 生锈了。", "event": "rusty"}]))
+    restored = snapshot.loads(snapshot.dumps(scripted))
+    assert restored.rules.specs == scripted.rules.specs
+    restored.player.move(1, 0, restored)
+    assert restored.interact_forward() == "key 生锈了。"
+
+    print("\n=== 二进制快照测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_snapshot()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""测试关卡可解性检查"""
+
+import os
+import random
+import tempfile
+
+from game.solver import MAX_STATES, solve_text, solve_many, solve_directory
+
+demo_text = """
+墙墙墙墙墙墙墙
+墙 我 钥 怪 门
+墙 宝   人 墙
+墙墙墙墙墙墙墙
+"""
+
+# 宝物在门后，必须先拿钥匙
+door_text = """
+########
+#@ K D T#
+########
+"""
+
+# 大量钥匙、门和宝物：精确搜索的状态数是对象数的指数级
+def many_objects_text(size: int, seed: int) -> str:
+    rng = random.Random(seed)
+    rows = []
+    for y in range(size):
+        if y in (0, size - 1):
+            rows.append("#" * size)
+            continue
+        # 第 1 列留空：对象只能从左侧交互
+        cells = ["#", "@" if y == 1 else " "]
+        cells += rng.choices(" KTD", weights=(80, 6, 6, 1), k=size - 3)
+        rows.append("".join(cells) + "#")
+    return "\n".join(rows)
+
+
+# 宝物被怪物挡住
+blocked_text = """
+#######
+#@ M T#
+#######
+"""
+
+
+def test_solver():
+    """测试单个关卡与进程池检查"""
+    print("=== 测试关卡检查 ===\n")
+
+    print("1. 示例关卡:")
+    result = solve_text(demo_text, "demo")
+    print(f"   {result}")
+    assert result.solvable and result.path_length == 3
+
+    print("2. 需要钥匙开门的关卡:")
+    result = solve_text(door_text, "door")
+    print(f"   {result}")
+    # 右、拿钥匙、右、右、开门、右、右、拿宝物
+    assert result.solvable and result.path_length == 8
+    assert result.key_reached and result.door_reached and result.treasure_reached
+
+    print("3. 被怪物挡住的关卡:")
+    result = solve_text(blocked_text, "blocked")
+    print(f"   {result}")
+    assert not result.solvable and not result.treasure_reached
+
+    print("4. 没有宝物或空文本:")
+    assert solve_text("###\n#@#\n###").error == "地图上没有宝物"
+    assert solve_text("\n\n").error == "地图文本为空"
+
+    print("5. 对象很多的关卡:")
+    text = many_objects_text(24, 1)
+    assert text.count("T") >= 15 and text.count("K") >= 10
+    result = solve_text(text, "many")
+    print(f"   {result._replace(name='many')}")
+    # 可解性由可达区域得出；最短步数的精确搜索超出预算时放弃
+    assert result.solvable is True and result.states <= MAX_STATES * 2
+    assert result.path_length is None and result.seconds < 30
+    unknown = solve_text(text, max_states=10)
+    assert unknown.solvable is None and unknown.error == "超出搜索预算"
+    # 小关卡的可解性在预算内就能得出，最短步数则放弃
+    result = solve_text(door_text, max_states=10)
+    assert result.solvable is True and result.path_length is None
+
+    print("6. 进程池并行检查:")
+    entries = [("demo", demo_text), ("door", door_text), ("blocked", blocked_text)]
+    results = list(solve_many(entries, max_workers=2))
+    assert [r.solvable for r in results] == [True, True, False]
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, text in entries:
+            with open(os.path.join(directory, f"{name}.txt"), "w", encoding="utf-8") as f:
+                f.write(text)
+        results = solve_directory(directory, max_workers=2)
+        assert [os.path.basename(r.name) for r in results] == ["blocked.txt", "demo.txt", "door.txt"]
+        assert [r.solvable for r in results] == [False, True, True]
+
+    print("\n=== 关卡检查测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_solver()
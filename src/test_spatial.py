@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""测试空间索引：范围查询与暴力扫描一致，并随地图修改同步"""
+
+import copy
+import random
+
+from game.game_map import GameMap
+from game.types import GameObject, GameObjectType, Position, point
+
+TYPES = [GameObjectType.MONSTER, GameObjectType.TREASURE, GameObjectType.KEY, GameObjectType.NPC]
+
+
+def brute_force(game_map: GameMap, x: int, y: int, obj_type=None):
+    """按 (距离, y, x) 排序的全部稀疏对象"""
+    objects = [obj for obj in game_map.iter_entities() if obj_type is None or obj.type == obj_type]
+    return sorted(objects, key=lambda obj: ((obj.position.x - x) ** 2 + (obj.position.y - y) ** 2,
+                                            obj.position.y, obj.position.x))
+
+
+def random_object(rng: random.Random, x: int, y: int) -> GameObject:
+    obj_type = rng.choice(TYPES)
+    return GameObject(type=obj_type, name=obj_type.value, symbol=obj_type.value[0],
+                      position=Position(x=x, y=y), interactive=True)
+
+
+def check(game_map: GameMap, rng: random.Random) -> None:
+    width, height = game_map.width, game_map.height
+    for _ in range(30):
+        x, y = rng.randrange(-5, width + 5), rng.randrange(-5, height + 5)
+        obj_type = rng.choice(TYPES + [None])
+        expected = brute_force(game_map, x, y, obj_type)
+        radius = rng.uniform(0, 20)
+        assert game_map.objects_in_radius(point(x, y), radius, obj_type) == \
+            [obj for obj in expected if (obj.position.x - x) ** 2 + (obj.position.y - y) ** 2 <= radius * radius]
+        k = rng.randint(1, 6)
+        assert game_map.nearest_objects(point(x, y), obj_type, k) == expected[:k]
+        x1, y1 = x + rng.randint(0, 30), y + rng.randint(0, 20)
+        assert game_map.objects_in_rect(x, y, x1, y1, obj_type) == sorted(
+            (obj for obj in expected if x <= obj.position.x < x1 and y <= obj.position.y < y1),
+            key=lambda obj: (obj.position.y, obj.position.x))
+
+
+def test_spatial():
+    """查询结果与暴力扫描一致，增删移动后索引保持同步"""
+    print("=== 测试空间索引 ===\n")
+    rng = random.Random(7)
+    game_map = GameMap(width=120, height=80)
+    for _ in range(600):
+        game_map.add_object(random_object(rng, rng.randrange(120), rng.randrange(80)))
+
+    print(f"1. 初始查询（{len(game_map.grid.entities)} 个对象）:")
+    check(game_map, rng)
+    monsters = game_map.objects_of_type(GameObjectType.MONSTER)
+    print(f"   怪物 {len(monsters)} 个")
+    assert len(monsters) == sum(obj.type == GameObjectType.MONSTER for obj in game_map.iter_entities())
+
+    print("2. 增删移动后同步:")
+    for _ in range(500):
+        x, y = rng.randrange(120), rng.randrange(80)
+        action = rng.random()
+        if action < 0.3:
+            game_map.add_object(random_object(rng, x, y))
+        elif action < 0.6:
+            game_map.remove_object_at(Position(x=x, y=y))
+        else:
+            game_map.move_object(Position(x=x, y=y), Position(x=rng.randrange(120), y=rng.randrange(80)))
+    check(game_map, rng)
+    for obj_type in TYPES:
+        assert {id(obj) for obj in game_map.objects_of_type(obj_type)} == {
+            id(obj) for obj in game_map.iter_entities() if obj.type == obj_type}
+
+    print("3. 最大半径与复制:")
+    assert game_map.nearest_objects(point(-100, -100), max_radius=10) == []
+    clone = copy.deepcopy(game_map)
+    assert clone.grid.index is None
+    assert [obj.position for obj in clone.objects_in_rect(0, 0, 20, 20)] == \
+        [obj.position for obj in game_map.objects_in_rect(0, 0, 20, 20)]
+    empty = GameMap(width=5, height=5)
+    assert empty.nearest_objects(point(1, 1)) == [] and empty.objects_in_radius(point(1, 1), 3) == []
+
+    print("\n=== 空间索引测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_spatial()
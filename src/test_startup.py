@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""测试按需加载：导入包与关卡校验都不加载 pydantic"""
+
+import subprocess
+import sys
+
+import game
+from game.game_map import GameMap
+from game.solver import solve_level, solve_text
+
+map_text = """
+墙墙墙墙墙墙墙
+墙 我 钥 门 宝
+墙 宝   人 墙
+墙墙墙墙墙墙墙
+"""
+
+
+def loaded_modules(statement: str) -> set:
+    """在新解释器中执行语句，返回加载过的模块名"""
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return set(output.stdout.split())
+
+
+def test_startup():
+    """导出名按需加载，校验路径与完整地图路径结果一致"""
+    print("=== 测试按需加载 ===\n")
+
+    print("1. 导入包不加载模型:")
+    for statement in ("import game", "from game import GameObjectType",
+                      "from game.solver import solve_text; solve_text('墙我宝墙')"):
+        modules = loaded_modules(statement)
+        print(f"   {statement}: {len(modules)} 个模块")
+        assert "pydantic" not in modules and "game.world" not in modules, statement
+    assert "pydantic" in loaded_modules("from game import World")
+
+    print("2. 导出名:")
+    assert set(game.__all__) <= set(dir(game))
+    assert game.World.__name__ == "World" and game.GameObjectType.WALL.value == "wall"
+    try:
+        game.Missing
+        assert False, "未导出的名字应报错"
+    except AttributeError:
+        pass
+
+    print("3. 原始解析与完整地图的校验结果一致:")
+    fast = solve_text(map_text)
+    full = solve_level(*GameMap.from_text(map_text))
+    print(f"   {fast.solvable}，{fast.path_length} 步，{fast.states} 个状态")
+    assert fast._replace(seconds=0) == full._replace(seconds=0)
+
+    print("\n=== 按需加载测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_startup()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""测试流式关卡解析：边生成边出行，非法输出提前中止"""
+
+import asyncio
+
+from agent import LevelStreamError, StreamingLevelBuilder, StubBackend, stream_level
+from agent.backends import stub_level
+from game.world import World
+
+
+async def broken_stream(text: str, chunk_size: int, consumed: list):
+    """前两行正常、之后变成闲聊的假 token 流"""
+    for start in range(0, len(text), chunk_size):
+        consumed.append(start)
+        yield text[start:start + chunk_size]
+
+
+async def run_stream_checks() -> None:
+    print("1. 边生成边出行:")
+    backend = StubBackend()
+    events = []
+
+    def on_rows(builder, rows):
+        events.append((backend.tokens, rows, builder.player_start))
+
+    world = await stream_level(backend.stream("森林", chunk_size=2), on_rows=on_rows)
+    expected = World.from_text(backend.render_text("森林").strip("`\n"))
+    assert world.render() == expected.render()
+    assert world.player.position == expected.player.position
+    first_tokens, first_rows, _ = events[0]
+    print(f"   共 {backend.tokens} 个 token，第 {first_tokens} 个 token 时第一行完成")
+    assert first_rows == [0] and first_tokens < backend.tokens // 4
+    start_event = next(event for event in events if event[2] is not None)
+    assert start_event[2] == (1, 1) and start_event[0] < backend.tokens // 2
+
+    print("2. 非法输出提前中止:")
+    rows = stub_level(b"seed").split("\n")
+    chatter = "好的，下面我来解释一下这个关卡的设计思路。"
+    text = "\n".join(rows[:2] + [chatter] + rows[2:] + [chatter * 5]) + "\n"
+    end_of_chatter = text.index(chatter) + len(chatter) + 1
+    consumed = []
+    try:
+        await stream_level(broken_stream(text, 4, consumed))
+        assert False, "闲聊行应中止解析"
+    except LevelStreamError as e:
+        print(f"   {e}，读取 {len(consumed)}/{len(text) // 4 + 1} 块后中止")
+    assert consumed[-1] <= end_of_chatter
+
+    print("3. 没有换行的闲聊提前中止:")
+    consumed = []
+    try:
+        await stream_level(broken_stream("好的" * 50000, 16, consumed))
+        assert False, "一整行的闲聊应中止解析"
+    except LevelStreamError as e:
+        print(f"   {e}，读取 {len(consumed)} 块后中止")
+    assert len(consumed) * 16 <= StreamingLevelBuilder().max_preamble + 16
+    consumed = []
+    text = "```\n" + rows[0] + "\n" + "墙" * 100 + "别" * 100000
+    try:
+        await stream_level(broken_stream(text, 16, consumed))
+        assert False, "关卡中没有换行的长行应中止解析"
+    except LevelStreamError as e:
+        print(f"   {e}，读取 {len(consumed)} 块后中止")
+    assert len(consumed) * 16 <= len(rows[0]) + 256 + 32
+
+    print("4. 跳过开头的说明文字:")
+    text = "好的，这是为你设计的关卡：\n" + backend.render_text("森林") + "希望你喜欢！\n"
+    world = await stream_level(broken_stream(text, 5, []))
+    assert world.render() == expected.render()
+    world = await stream_level(broken_stream("好的，这是关卡：\n" + stub_level(b"seed"), 5, []))
+    assert world.render() == World.from_text(stub_level(b"seed")).render()
+    builder = StreamingLevelBuilder()
+    level = "墙" * 200 + "\n墙我" + " " * 197 + "墙\n" + "墙" * 200
+    text = "说明" * 200 + "\n" + level
+    for start in range(0, len(text), 7):
+        builder.feed(text[start:start + 7])
+    assert builder.finish().game_map.width == 200, "长说明之后的长关卡行不应被当作说明文字"
+
+
+def test_streaming():
+    """分块输入与整体解析结果一致，错误在出现的那一行被发现"""
+    print("=== 测试流式关卡解析 ===\n")
+
+    asyncio.run(run_stream_checks())
+
+    print("5. 行校验:")
+    for text, reason in (("墙墙墙\n墙我我\n", "第二个玩家"), ("墙墙\n" + "墙" * 10 + "\n", "超过"), ("墙墙\n", "没有玩家")):
+        builder = StreamingLevelBuilder(max_width=8)
+        try:
+            builder.feed(text)
+            builder.finish()
+            assert False, text
+        except LevelStreamError as e:
+            assert reason in str(e), e
+
+    print("6. 预览:")
+    builder = StreamingLevelBuilder()
+    assert builder.feed("墙墙墙墙\n墙我 钥") == [0]
+    assert builder.player_start is None and builder.preview().height == 1
+    assert builder.feed("\n墙墙墙墙") == [1] and builder.player_start == (1, 1)
+    world = builder.finish()
+    assert (world.game_map.width, world.game_map.height) == (4, 3)
+
+    print("\n=== 流式关卡解析测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_streaming()
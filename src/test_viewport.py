@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""测试视口渲染"""
+
+from game.world import World, FOG_SYMBOL
+from game.types import Position
+
+map_text = """
+##########
+#我      #
+#  K     #
+#     T  #
+#        #
+##########
+"""
+
+
+def test_viewport():
+    """测试视口裁剪与迷雾遮罩"""
+    print("=== 测试视口渲染 ===\n")
+
+    world = World.from_text(map_text)
+
+    print("1. 视口在地图边缘被夹住:")
+    view = world.render_viewport(4, 3)
+    print(view)
+    assert world.get_viewport(4, 3) == (0, 0, 4, 3)
+    assert view.split("\n") == ["####", "#我  ", "#  K"]
+
+    print("2. 指定中心:")
+    view = world.render_viewport(3, 3, center=Position(x=6, y=3))
+    print(view)
+    assert view.split("\n") == ["   ", " T ", "   "]
+
+    print("3. 视口大于地图时渲染整张地图:")
+    assert world.render_viewport(50, 50) == world.render()
+
+    print("4. 迷雾遮罩:")
+    visible = {(1, 1), (2, 1), (1, 2)}
+    view = world.render_viewport(3, 3, center=Position(x=1, y=1), fog=visible)
+    print(view)
+    assert view.split("\n")[1] == FOG_SYMBOL + "我 "
+    mask = bytearray(world.game_map.width * world.game_map.height)
+    for x, y in visible:
+        mask[y * world.game_map.width + x] = 1
+    assert world.render_viewport(3, 3, center=Position(x=1, y=1), fog=mask) == view
+
+    print("\n=== 视口渲染测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_viewport()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""测试视野：阴影投射、视线、开门后的增量失效与迷雾渲染"""
+
+import random
+
+from game.game_map import GameMap
+from game.types import GameObject, GameObjectType, Position, point
+from game.visibility import field_of_view
+from game.world import World
+
+LEVEL = """
+##########
+#    #   #
+#  我 D M #
+#    #   #
+#K   ######
+##########
+"""
+
+
+def wall(x: int, y: int) -> GameObject:
+    return GameObject(type=GameObjectType.WALL, name="Wall", symbol="#", position=Position(x=x, y=y))
+
+
+def test_visibility():
+    """墙和门遮挡视线，开门后只重算看得到门的视野，结果与重新计算一致"""
+    print("=== 测试视野 ===\n")
+
+    print("1. 阴影投射:")
+    world = World.from_text(LEVEL)
+    game_map = world.game_map
+    visible = world.visible_cells(8)
+    assert (3, 2) in visible and (1, 4) in visible
+    assert (5, 2) in visible, "门本身可见"
+    assert (7, 2) not in visible, "门后的怪物不可见"
+    assert all((x - 3) ** 2 + (y - 2) ** 2 <= 64 for x, y in visible)
+    assert field_of_view(game_map.grid, 3, 2, 0) == {(3, 2)}
+    assert world.monsters_seeing_player() == []
+    print(f"   玩家看到 {len(visible)} 个格子")
+
+    print("\n2. 视线:")
+    assert game_map.has_line_of_sight(point(3, 2), point(1, 4))
+    assert not game_map.has_line_of_sight(point(3, 2), point(7, 2))
+    assert game_map.has_line_of_sight(point(3, 2), point(5, 2)), "终点的遮挡物不挡自己"
+
+    print("\n3. 开门后的增量失效:")
+    cache = game_map.grid.fov_cache()
+    far = game_map.field_of_view(point(1, 4), 2)
+    assert (5, 2) not in far
+    world.player.has_key = True
+    world.player.position = Position(x=4, y=2)
+    assert world.interact_forward() == "你用钥匙打开了门。"
+    misses = cache.misses
+    assert game_map.field_of_view(point(1, 4), 2) is far, "看不到门的视野保留"
+    assert cache.misses == misses
+    after = game_map.field_of_view(point(3, 2), 8)
+    assert after == field_of_view(game_map.grid, 3, 2, 8) and (7, 2) in after
+    assert [monster.position for monster in world.monsters_seeing_player()] == [Position(x=7, y=2)]
+
+    print("\n4. 随机修改后与重新计算一致:")
+    rng = random.Random(3)
+    game_map = GameMap(width=40, height=30)
+    for _ in range(250):
+        game_map.add_object(wall(rng.randrange(40), rng.randrange(30)))
+    cache = game_map.grid.fov_cache()
+    origins = [(rng.randrange(40), rng.randrange(30)) for _ in range(40)]
+    for step in range(150):
+        x, y = rng.randrange(40), rng.randrange(30)
+        if game_map.is_opaque_xy(x, y):
+            game_map.remove_object_at(point(x, y))
+        else:
+            game_map.add_object(wall(x, y))
+        for ox, oy in rng.sample(origins, 10):
+            radius = rng.choice((4, 8))
+            assert game_map.field_of_view(point(ox, oy), radius) == field_of_view(game_map.grid, ox, oy, radius)
+    print(f"   缓存命中 {cache.hits} 次，计算 {cache.misses} 次")
+    assert cache.hits > 0
+
+    print("\n5. 迷雾渲染:")
+    world = World.from_text(LEVEL)
+    text = world.render_viewport(10, 6, sight=8)
+    assert "M" not in text and "░" in text and "我" in text
+    print(text)
+
+    print("\n=== 视野测试完成 ===")
+
+
+if __name__ == "__main__":
+    test_visibility()